@@ -10,8 +10,75 @@
     ##      "Port" : 5500,
     ##    "HttpPort" : 8800
     ##},
+    ## configuration of the web api; requests are refused with 503 once
+    ## a worker pool has QueueLimit requests outstanding, and responses
+    ## that can no longer change are cached up to ResponseCacheSize bytes;
+    ## submissions are validated on the write threads, at most
+    ## MaxInFlightValidations at once, which defaults to one less than the
+    ## maximum number of WriteThreads and cannot exceed it; submission
+    ## rates of 0 are unlimited and bursts of 0 default to twice the rate
+    ##"WebApi" : {
+    ##    "ReadThreads" : [2, 10],
+    ##    "ReadQueueLimit" : 200,
+    ##    "WriteThreads" : [1, 4],
+    ##    "WriteQueueLimit" : 100,
+    ##    "RetryAfter" : 1,
+    ##    "ResponseCacheSize" : 16777216,
+    ##    "BlockStoreCacheSize" : 100,
+    ##    "SortedKeyCacheSize" : 1000000,
+    ##    "DefaultPageSize" : 1000,
+    ##    "MaximumPageSize" : 10000,
+    ##    "MaximumBatchSize" : 10000,
+    ##    "MaximumStatusWait" : 30,
+    ##    "MetricsMaxAge" : 1.0,
+    ##    "CompressionThreshold" : 1024,
+    ##    "CompressionLevel" : 6,
+    ##    "IdleTimeout" : 60,
+    ##    "HealthInterval" : 1.0,
+    ##    "HealthBusyLag" : 1.0,
+    ##    "ClientRate" : 0,
+    ##    "ClientBurst" : 0,
+    ##    "SignerRate" : 0,
+    ##    "SignerBurst" : 0,
+    ##    "MaxInFlightValidations" : 3,
+    ##    "AdmissionTimeout" : 0.5,
+    ##    "VerifyProcesses" : 0,
+    ##    "VerifyTimeout" : 30,
+    ##    "MaximumBodySize" : 10485760
+    ##},
+    ## measure the lag of the reactor every Interval seconds, which is
+    ## also reported by /healthz, and log the reactor thread stack whenever
+    ## a callback blocks the reactor for more than Threshold seconds; a
+    ## Threshold of 0 only measures the lag
+    ##"ReactorMonitor" : {
+    ##    "Interval" : 0.1,
+    ##    "Threshold" : 0.5
+    ##},
+    ## with "Profile" : "sampling" the stacks of all threads are sampled
+    ## and written to the DataDirectory every FlushInterval seconds in the
+    ## collapsed format of flamegraph.pl; "Profile" : "cprofile" profiles
+    ## the whole run with cProfile instead
+    ##"SamplingProfiler" : {
+    ##    "Interval" : 0.01,
+    ##    "FlushInterval" : 60
+    ##},
+    ## host names of nodes are cached for TTL seconds, names that cannot
+    ## be resolved for NegativeTTL seconds
+    ##"Resolver" : {
+    ##    "TTL" : 300,
+    ##    "NegativeTTL" : 30
+    ##},
     "NodeName" : "base000",
     "LedgerURL" : "http://localhost:8800/",
+    ## all the LedgerURLs are queried for peers at once; discovery ends
+    ## when DiscoveryQuorum of them returned endpoints or every url has
+    ## answered or timed out, and the result is reused for DiscoveryCacheTTL
+    ## seconds; the queries run on a pool of at most DiscoveryThreads
+    ## threads and each request gives up after DiscoveryTimeout seconds
+    ##"DiscoveryQuorum" : 1,
+    ##"DiscoveryTimeout" : 10,
+    ##"DiscoveryCacheTTL" : 30,
+    ##"DiscoveryThreads" : 4,
 
     ## pick the ledger type
     "LedgerType" : "lottery",
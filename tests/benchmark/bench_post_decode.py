@@ -0,0 +1,103 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+Compare the cost of the copy of a submitted message used for validation:
+a deepcopy of the decoded message (the previous web api behavior) with
+building a second message from the decoded request.
+
+Run from the top of the source tree:
+    PYTHONPATH=. python tests/benchmark/bench_post_decode.py
+"""
+
+import argparse
+import copy
+import tempfile
+import time
+
+import gossip.signed_object as SigObj
+from gossip.common import dict2cbor
+from gossip.node import Node
+from journal.journal_core import Journal
+from ledger.transaction import integer_key
+
+
+def create_ledger():
+    signingkey = SigObj.generate_signing_key()
+    ident = SigObj.generate_identifier(signingkey)
+    node = Node(identifier=ident, signingkey=signingkey,
+                address=("localhost", 8898))
+    ledger = Journal(node, DataDirectory=tempfile.mkdtemp(),
+                     GenesisLedger=True)
+    integer_key.register_transaction_types(ledger)
+    return ledger
+
+
+def create_request(ledger, updates):
+    """
+    Build the decoded form of a POSTed integer key transaction message
+    with the given number of updates.
+    """
+    txn = integer_key.IntegerKeyTransaction()
+    for i in range(updates):
+        update = integer_key.Update()
+        update.Verb = 'set'
+        update.Name = 'key{0}'.format(i)
+        update.Value = i
+        txn.Updates.append(update)
+    txn.sign_from_node(ledger.LocalNode)
+
+    msgtype = integer_key.IntegerKeyTransaction.MessageType
+    msg = ledger.MessageHandlerMap[msgtype][0]()
+    msg.Transaction = txn
+    msg.sign_from_node(ledger.LocalNode)
+    return msg.dump()
+
+
+def time_per_request(func, requests):
+    start = time.time()
+    for _ in range(requests):
+        func()
+    return (time.time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--updates', type=int, nargs='+',
+                        default=[1, 10, 100, 1000])
+    parser.add_argument('--requests', type=int, default=200)
+    options = parser.parse_args()
+
+    ledger = create_ledger()
+    msgtype = integer_key.IntegerKeyTransaction.MessageType
+    decode = ledger.MessageHandlerMap[msgtype][0]
+
+    print "{0:>8} {1:>10} {2:>20} {3:>20}".format(
+        'updates', 'size (KB)', 'deepcopy (us/KB)', 'decode (us/KB)')
+
+    for updates in options.updates:
+        minfo = create_request(ledger, updates)
+        msg = decode(minfo)
+        size = len(dict2cbor(minfo)) / 1024.0
+
+        deep = time_per_request(lambda: copy.deepcopy(msg), options.requests)
+        fresh = time_per_request(lambda: decode(minfo), options.requests)
+
+        print "{0:>8} {1:>10.2f} {2:>20.1f} {3:>20.1f}".format(
+            updates, size, deep * 1e6 / size, fresh * 1e6 / size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+Compare the per-request cost of pre-validating a submitted transaction by
+replaying the whole pending backlog (the previous web api behavior) with
+validating it against the incrementally maintained SpeculativeHead.
+
+Run from the top of the source tree:
+    PYTHONPATH=. python tests/benchmark/bench_speculative_head.py
+"""
+
+import argparse
+import copy
+import tempfile
+import time
+
+import gossip.signed_object as SigObj
+from gossip.node import Node
+from journal import global_store_manager
+from journal.journal_core import Journal
+from ledger.transaction import integer_key
+
+from sawtooth.exceptions import InvalidTransactionError
+from txnserver.speculative_head import SpeculativeHead
+
+
+def create_ledger():
+    signingkey = SigObj.generate_signing_key()
+    ident = SigObj.generate_identifier(signingkey)
+    node = Node(identifier=ident, signingkey=signingkey,
+                address=("localhost", 8899))
+    ledger = Journal(node, DataDirectory=tempfile.mkdtemp(),
+                     GenesisLedger=True)
+    integer_key.register_transaction_types(ledger)
+    return ledger
+
+
+def create_txn(node, verb, name, value):
+    txn = integer_key.IntegerKeyTransaction()
+    update = integer_key.Update()
+    update.Verb = verb
+    update.Name = name
+    update.Value = value
+    txn.Updates.append(update)
+    txn.sign_from_node(node)
+    return txn
+
+
+def add_pending(ledger, count):
+    for i in range(count):
+        txn = create_txn(ledger.LocalNode, 'set', 'key{0}'.format(i), i)
+        ledger.TransactionStore[txn.Identifier] = txn
+        ledger.PendingTransactions[txn.Identifier] = True
+
+
+def replay_check_valid(ledger, txn):
+    """
+    The pre-validation performed by the web api before the speculative
+    head was introduced.
+    """
+    real_store_map = ledger.GlobalStoreMap.get_block_store(
+        ledger.MostRecentCommittedBlockID)
+    temp_store_map = global_store_manager.BlockStore(real_store_map)
+    for txn_id in ledger.PendingTransactions.iterkeys():
+        pend_txn = ledger.TransactionStore[txn_id]
+        store = temp_store_map.get_transaction_store(
+            pend_txn.TransactionTypeName)
+        if pend_txn.is_valid(store):
+            copy.copy(pend_txn).apply(store)
+
+    store = temp_store_map.get_transaction_store(txn.TransactionTypeName)
+    txn.check_valid(store)
+
+
+def time_per_request(func, ledger, requests):
+    txn = create_txn(ledger.LocalNode, 'inc', 'key0', 1)
+    start = time.time()
+    for _ in range(requests):
+        try:
+            func(txn)
+        except InvalidTransactionError:
+            # with an empty backlog key0 does not exist, the cost of the
+            # check is what matters here
+            pass
+    return (time.time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backlog', type=int, nargs='+',
+                        default=[0, 100, 1000, 10000])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--replay-requests', type=int, default=5)
+    options = parser.parse_args()
+
+    print "{0:>10} {1:>16} {2:>16}".format(
+        'backlog', 'replay (ms/req)', 'overlay (ms/req)')
+
+    for backlog in options.backlog:
+        ledger = create_ledger()
+        add_pending(ledger, backlog)
+
+        replay = time_per_request(
+            lambda txn: replay_check_valid(ledger, txn),
+            ledger, options.replay_requests)
+
+        # the first request builds the overlay, subsequent requests only
+        # pay for the incremental refresh
+        head = SpeculativeHead(ledger)
+        time_per_request(head.check_valid, ledger, 1)
+        overlay = time_per_request(head.check_valid, ledger,
+                                   options.requests)
+
+        print "{0:>10} {1:>16.3f} {2:>16.3f}".format(
+            backlog, replay * 1000.0, overlay * 1000.0)
+
+
+if __name__ == '__main__':
+    main()
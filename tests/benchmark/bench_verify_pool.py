@@ -0,0 +1,113 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+Measure the rate at which submitted messages are decoded and their
+signatures verified, in the validator process and in verification pools
+of increasing size.
+
+Run from the top of the source tree:
+    PYTHONPATH=. python tests/benchmark/bench_verify_pool.py
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+import gossip.signed_object as SigObj
+from gossip.node import Node
+from journal.journal_core import Journal
+from ledger.transaction import integer_key
+from txnserver.verify_pool import verify_message
+from txnserver.verify_pool import VerifyPool
+
+
+def create_ledger():
+    signingkey = SigObj.generate_signing_key()
+    ident = SigObj.generate_identifier(signingkey)
+    node = Node(identifier=ident, signingkey=signingkey,
+                address=("localhost", 8898))
+    ledger = Journal(node, DataDirectory=tempfile.mkdtemp(),
+                     GenesisLedger=True)
+    integer_key.register_transaction_types(ledger)
+    return ledger
+
+
+def create_requests(ledger, count):
+    """
+    Build the decoded forms of POSTed integer key transaction messages.
+    """
+    msgtype = integer_key.IntegerKeyTransaction.MessageType
+    msg_class = ledger.MessageHandlerMap[msgtype][0]
+
+    requests = []
+    for i in range(count):
+        update = integer_key.Update()
+        update.Verb = 'set'
+        update.Name = 'key{0}'.format(i)
+        update.Value = i
+
+        txn = integer_key.IntegerKeyTransaction()
+        txn.Updates.append(update)
+        txn.sign_from_node(ledger.LocalNode)
+
+        msg = msg_class()
+        msg.Transaction = txn
+        msg.sign_from_node(ledger.LocalNode)
+        requests.append((msg_class, msg.dump()))
+
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=sorted(set([1, 2, 4,
+                                            multiprocessing.cpu_count()])))
+    options = parser.parse_args()
+
+    ledger = create_ledger()
+    requests = create_requests(ledger, options.messages)
+
+    print "{0:>12} {1:>16} {2:>10}".format('processes', 'messages/s',
+                                           'speedup')
+
+    start = time.time()
+    for (msg_class, minfo) in requests:
+        verify_message(msg_class, minfo)
+    baseline = options.messages / (time.time() - start)
+    print "{0:>12} {1:>16.1f} {2:>10.2f}".format('in process', baseline, 1.0)
+
+    for processes in options.processes:
+        pool = VerifyPool(processes)
+        pool.start()
+        try:
+            # warm the processes up before timing them
+            pool.verify_many(requests[:processes])
+
+            start = time.time()
+            pool.verify_many(requests)
+            rate = options.messages / (time.time() - start)
+        finally:
+            pool.stop()
+
+        print "{0:>12} {1:>16.1f} {2:>10.2f}".format(processes, rate,
+                                                     rate / baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import defer
+from twisted.internet import task
+
+from txnserver.chain_index import ChainIndex
+
+
+class TestBlock(object):
+    def __init__(self, previous, txnids):
+        self.PreviousBlockID = previous
+        self.TransactionIDs = txnids
+        self.CommitTime = 1000.0 + len(txnids)
+
+
+class TestLedger(object):
+    def __init__(self):
+        self.BlockStore = {}
+        self.MostRecentCommittedBlockID = None
+
+    def commit(self, blkid, previous, txnids):
+        self.BlockStore[blkid] = TestBlock(previous, txnids)
+        self.MostRecentCommittedBlockID = blkid
+
+
+class TestChainIndex(unittest.TestCase):
+    def _create_chain(self):
+        ledger = TestLedger()
+        ledger.commit('a', None, ['t1'])
+        ledger.commit('b', 'a', ['t2', 't3'])
+        ledger.commit('c', 'b', ['t4', 't5'])
+        return ledger
+
+    def test_block_ids(self):
+        index = ChainIndex(self._create_chain())
+        self.assertEquals(index.get_block_ids(), ['c', 'b', 'a'])
+        self.assertEquals(index.get_block_ids(2), ['c', 'b'])
+        self.assertEquals(index.height, 3)
+        self.assertEquals(index.get_block_height('b'), 1)
+        self.assertIsNone(index.get_block_height('x'))
+
+    def test_transaction_ids(self):
+        index = ChainIndex(self._create_chain())
+        self.assertEquals(index.get_transaction_ids(),
+                          ['t1', 't2', 't3', 't4', 't5'])
+        self.assertEquals(index.get_transaction_ids(1, 2), ['t2', 't3'])
+        self.assertEquals(index.get_transaction_ids(since_block=2),
+                          ['t4', 't5'])
+        self.assertEquals(index.get_transaction_ids(since_block=3), [])
+
+    def test_headers(self):
+        index = ChainIndex(self._create_chain())
+        headers = index.get_headers()
+        self.assertEquals([h['Identifier'] for h in headers],
+                          ['a', 'b', 'c'])
+        self.assertEquals(headers[1], {'Identifier': 'b',
+                                       'BlockNum': 1,
+                                       'PreviousBlockID': 'a',
+                                       'TransactionCount': 2,
+                                       'CommitTime': 1002.0})
+
+        self.assertEquals(index.get_headers(1, 1, ['Identifier']),
+                          [{'Identifier': 'b'}])
+        self.assertEquals(index.get_headers(2, 10, ['BlockNum']),
+                          [{'BlockNum': 2}])
+        self.assertEquals(index.get_headers(5), [])
+        with self.assertRaises(ValueError):
+            index.get_headers(fields=['Nonce'])
+
+    def test_header_snapshot(self):
+        ledger = self._create_chain()
+        index = ChainIndex(ledger)
+        headers = index.iter_headers(fields=['Identifier'])
+
+        ledger.commit('c2', 'b', ['t7'])
+        self.assertEquals([h['Identifier'] for h in headers],
+                          ['a', 'b', 'c'])
+        self.assertEquals(index.get_headers(2, fields=['Identifier']),
+                          [{'Identifier': 'c2'}])
+
+    def test_follows_ledger(self):
+        ledger = self._create_chain()
+        index = ChainIndex(ledger)
+        events = []
+        index.add_listener(lambda r, c: events.append((r, c)))
+        index.update()
+
+        ledger.commit('d', 'c', ['t6'])
+        self.assertEquals(index.get_transaction_ids(since_block=3), ['t6'])
+
+        # switch to a fork that replaces c and d
+        ledger.commit('c2', 'b', ['t7'])
+        self.assertEquals(index.get_block_ids(), ['c2', 'b', 'a'])
+        self.assertEquals(index.get_transaction_ids(),
+                          ['t1', 't2', 't3', 't7'])
+        self.assertEquals(events, [([], ['a', 'b', 'c']),
+                                   ([], ['d']),
+                                   (['c', 'd'], ['c2'])])
+        self.assertEquals(index.get_stats()['Transactions'], 4)
+
+    def test_background_updates(self):
+        ledger = self._create_chain()
+        clock = task.Clock()
+        updates = []
+
+        def run_in_thread(func):
+            updates.append(func)
+            return defer.maybeDeferred(func)
+
+        index = ChainIndex(ledger, interval=1.0, clock=clock,
+                           run_in_thread=run_in_thread)
+        index.start()
+        self.assertEquals(len(updates), 1)
+        self.assertEquals(index.get_stats()['Blocks'], 3)
+
+        # nothing to do while the head is unchanged
+        clock.advance(1.0)
+        self.assertEquals(len(updates), 1)
+
+        ledger.commit('d', 'c', ['t6'])
+        clock.advance(1.0)
+        self.assertEquals(len(updates), 2)
+        self.assertEquals(index.get_stats()['HeadBlockID'], 'd')
+        index.stop()
@@ -0,0 +1,134 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from txnserver.chain_index import ChainIndex
+from txnserver.endpoint_index import ENDPOINT_STORE
+from txnserver.endpoint_index import EndpointIndex
+
+
+class TestBlock(object):
+    def __init__(self, previous, txnids):
+        self.PreviousBlockID = previous
+        self.TransactionIDs = txnids
+
+
+class TestUpdate(object):
+    def __init__(self, identifier):
+        self.NodeIdentifier = identifier
+
+
+class TestTransaction(object):
+    def __init__(self, identifier, type_name=ENDPOINT_STORE):
+        self.TransactionTypeName = type_name
+        self.Update = TestUpdate(identifier)
+
+
+class TestBlockStore(object):
+    def __init__(self, endpoints):
+        self.TransactionStores = {ENDPOINT_STORE: endpoints}
+
+    def get_transaction_store(self, name):
+        return self.TransactionStores[name]
+
+
+class TestGlobalStoreMap(object):
+    def __init__(self):
+        self.BlockStores = {}
+
+    def get_block_store(self, blkid):
+        return self.BlockStores.get(blkid)
+
+
+class TestLedger(object):
+    def __init__(self):
+        self.BlockStore = {}
+        self.TransactionStore = {}
+        self.GlobalStoreMap = TestGlobalStoreMap()
+        self.MostRecentCommittedBlockID = None
+
+    def commit(self, blkid, previous, txns, endpoints):
+        """
+        Commit a block with transactions given as a dictionary of txnids
+        to transactions, and the complete registry after the block.
+        """
+        self.TransactionStore.update(txns)
+        self.BlockStore[blkid] = TestBlock(previous, sorted(txns.keys()))
+        self.GlobalStoreMap.BlockStores[blkid] = TestBlockStore(endpoints)
+        self.MostRecentCommittedBlockID = blkid
+
+
+def endpoint(name, domain):
+    return {'NodeIdentifier': name, 'Name': name, 'Host': '10.0.0.1',
+            'Port': 5500, 'HttpPort': 8800, 'Domain': domain}
+
+
+class TestEndpointIndex(unittest.TestCase):
+    def setUp(self):
+        self.ledger = TestLedger()
+        self.registry = {'a': endpoint('a', '/'),
+                         'b': endpoint('b', '/Lottery'),
+                         'c': endpoint('c', '/Lottery/West')}
+        self.ledger.commit('1', None, {'t1': TestTransaction('a'),
+                                       't2': TestTransaction('b'),
+                                       't3': TestTransaction('c')},
+                           dict(self.registry))
+        self.index = EndpointIndex(self.ledger, ChainIndex(self.ledger))
+
+    def _names(self, domain='/'):
+        return sorted(ep['Name'] for ep in self.index.get_endpoints(domain))
+
+    def test_prefix(self):
+        self.assertEquals(self._names(), ['a', 'b', 'c'])
+        self.assertEquals(self._names('/Lottery'), ['b', 'c'])
+        self.assertEquals(self._names('/Lottery/West'), ['c'])
+        self.assertEquals(self._names('/Quorum'), [])
+
+        record = self.index.get_endpoints('/Lottery/West')[0]
+        self.assertEquals(record, {'NodeIdentifier': 'c', 'Name': 'c',
+                                   'Host': '10.0.0.1', 'Port': 5500,
+                                   'HttpPort': 8800})
+
+    def test_incremental_update(self):
+        self.assertEquals(self._names('/Lottery'), ['b', 'c'])
+
+        # b moves domain, c unregisters and d registers
+        self.registry['b'] = endpoint('b', '/Quorum')
+        del self.registry['c']
+        self.registry['d'] = endpoint('d', '/Lottery')
+        self.ledger.commit('2', '1', {'t4': TestTransaction('b'),
+                                      't5': TestTransaction('c'),
+                                      't6': TestTransaction('d'),
+                                      't7': TestTransaction('x', '/Other')},
+                           dict(self.registry))
+
+        self.assertEquals(self._names('/Lottery'), ['d'])
+        self.assertEquals(self._names('/Quorum'), ['b'])
+        stats = self.index.get_stats()
+        self.assertEquals(stats['Endpoints'], 3)
+        self.assertEquals(stats['Rebuilds'], 1)
+        self.assertEquals(stats['Updates'], 1)
+
+    def test_fork_switch(self):
+        self.assertEquals(self._names('/Lottery'), ['b', 'c'])
+        self.ledger.commit('2', '1', {'t4': TestTransaction('d')},
+                           dict(self.registry, d=endpoint('d', '/Lottery')))
+        self.assertEquals(self._names('/Lottery'), ['b', 'c', 'd'])
+
+        # a competing fork replaces block 2
+        self.ledger.commit('2b', '1', {}, dict(self.registry))
+        self.assertEquals(self._names('/Lottery'), ['b', 'c'])
+        self.assertEquals(self.index.get_stats()['Rebuilds'], 2)
@@ -0,0 +1,64 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from txnserver.memory_debug import count_objects
+from txnserver.memory_debug import MemoryInspector
+
+
+class Leaky(object):
+    pass
+
+
+class OldStyle:
+    pass
+
+
+# the names count_objects gives the types, which depend on how the runner
+# imported this module
+LEAKY = Leaky.__module__ + '.Leaky'
+OLD_STYLE = OldStyle.__module__ + '.OldStyle'
+
+
+class TestMemoryDebug(unittest.TestCase):
+    def test_count_objects(self):
+        objects = [Leaky() for _ in range(5)] + [OldStyle()]
+        counts = count_objects()
+        self.assertGreaterEqual(counts[LEAKY], 5)
+        self.assertGreaterEqual(counts[OLD_STYLE], 1)
+        del objects
+
+    def test_report(self):
+        store = {'a': 1}
+
+        def broken():
+            raise ValueError()
+
+        inspector = MemoryInspector({'Store': lambda: len(store),
+                                     'Broken': broken})
+        report = inspector.report(limit=5, snapshot=True)
+        self.assertEquals(report['Collections'], {'Store': 1})
+        self.assertEquals(len(report['Objects']), 5)
+        self.assertNotIn('Diff', report)
+
+        leaked = [Leaky() for _ in range(100)]
+        report = inspector.report(limit=1000)
+        self.assertEquals(report['Diff']['Objects'][LEAKY], 100)
+
+        # without a new snapshot the baseline stays the same
+        report = inspector.report(limit=1000)
+        self.assertEquals(report['Diff']['Objects'][LEAKY], 100)
+        del leaked
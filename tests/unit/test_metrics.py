@@ -0,0 +1,63 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from txnserver.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render(self):
+        registry = MetricsRegistry(max_age=0)
+        registry.register('sawtooth_platform',
+                          lambda: {'scpu': {'percent': 12.5},
+                                   'Name': 'ignored'})
+        registry.register('sawtooth_peer',
+                          lambda: {'node"1': {'MessagesSent': 3L,
+                                              'IsPeer': True}},
+                          label='peer')
+
+        lines = registry.render().splitlines()
+        self.assertIn('# TYPE sawtooth_platform_scpu_percent unknown', lines)
+        self.assertIn('sawtooth_platform_scpu_percent 12.5', lines)
+        self.assertIn('sawtooth_peer_messages_sent{peer="node\\"1"} 3', lines)
+        self.assertIn('sawtooth_peer_is_peer{peer="node\\"1"} 1', lines)
+        self.assertEquals(lines[-1], '# EOF')
+        self.assertFalse([x for x in lines if 'ignored' in x])
+
+        lines = registry.render(openmetrics=False).splitlines()
+        self.assertIn('# TYPE sawtooth_platform_scpu_percent untyped', lines)
+        self.assertNotIn('# EOF', lines)
+
+    def test_families_are_grouped(self):
+        registry = MetricsRegistry(max_age=0)
+        registry.register('sawtooth',
+                          lambda: {'a': {'Count': 1}, 'b': {'Count': 2}},
+                          label='domain')
+
+        lines = registry.render().splitlines()
+        self.assertEquals(lines[0], '# TYPE sawtooth_count unknown')
+        self.assertEquals(sorted(lines[1:3]),
+                          ['sawtooth_count{domain="a"} 1',
+                           'sawtooth_count{domain="b"} 2'])
+
+    def test_max_age(self):
+        stats = {'Count': 1}
+        registry = MetricsRegistry(max_age=60)
+        registry.register('sawtooth', lambda: stats)
+
+        rendered = registry.render()
+        stats['Count'] = 2
+        self.assertEquals(registry.render(), rendered)
@@ -0,0 +1,130 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import defer
+from twisted.internet import task
+
+from txnserver.peer_discovery import create_peer_discovery
+from txnserver.peer_discovery import PeerDiscovery
+
+
+class FakeNode(object):
+    def __init__(self, name):
+        self.Name = name
+
+
+class TestPeerDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.clock = task.Clock()
+        self.pending = {}
+
+    def _run_in_thread(self, fetch, url, timeout):
+        self.assertEquals(fetch, self._fetch)
+        self.assertEquals(timeout, self.timeout)
+        self.pending[url] = defer.Deferred()
+        return self.pending[url]
+
+    def _fetch(self, url, timeout):
+        raise AssertionError('fetch must run through run_in_thread')
+
+    def _discovery(self, urls, **kwargs):
+        self.timeout = kwargs.get('timeout', 10.0)
+        return PeerDiscovery(urls, self._fetch, clock=self.clock,
+                             run_in_thread=self._run_in_thread, **kwargs)
+
+    def _collect(self, d):
+        result = []
+        d.addCallback(result.append)
+        return result
+
+    def test_quorum(self):
+        discovery = self._discovery(['a', 'b', 'c'], quorum=2)
+        result = self._collect(discovery.refresh())
+        self.assertEquals(sorted(self.pending), ['a', 'b', 'c'])
+
+        # an empty registry does not count towards the quorum
+        self.pending['a'].callback([])
+        self.pending['b'].callback([FakeNode('n1'), FakeNode('n2')])
+        self.assertEquals(result, [])
+
+        self.pending['c'].callback([FakeNode('n2'), FakeNode('n3')])
+        self.assertEquals(len(result), 1)
+        self.assertEquals(sorted(n.Name for n in result[0]),
+                          ['n1', 'n2', 'n3'])
+        self.assertEquals(discovery.get_stats()['Rounds'], 1)
+
+    def test_late_response_ignored(self):
+        discovery = self._discovery(['a', 'b'], quorum=1)
+        result = self._collect(discovery.refresh())
+        self.pending['a'].callback([FakeNode('n1')])
+        self.assertEquals(len(result), 1)
+
+        # the round is over, and the timer of b was cancelled
+        self.pending['b'].callback([FakeNode('n2')])
+        self.assertEquals(self.clock.getDelayedCalls(), [])
+        self.assertEquals([n.Name for n in discovery.nodes], ['n1'])
+
+    def test_timeout_and_failure(self):
+        discovery = self._discovery(['a', 'b'], quorum=2, timeout=5.0)
+        result = self._collect(discovery.refresh())
+
+        self.pending['a'].errback(Exception('unreachable'))
+        self.assertEquals(result, [])
+        self.clock.advance(5.0)
+        self.assertEquals(result, [[]])
+
+        stats = discovery.get_stats()
+        self.assertEquals(stats['Failures'], 1)
+        self.assertEquals(stats['Timeouts'], 1)
+        self.assertEquals(stats['LastDuration'], 5.0)
+
+    def test_cache(self):
+        discovery = self._discovery(['a'], ttl=30.0)
+        first = self._collect(discovery.refresh())
+        # a second caller joins the round in progress
+        second = self._collect(discovery.refresh())
+        self.assertEquals(len(self.pending), 1)
+
+        self.pending.pop('a').callback([FakeNode('n1')])
+        self.assertEquals(len(first), 1)
+        self.assertEquals(len(second), 1)
+
+        self.clock.advance(10.0)
+        self.assertEquals(len(self._collect(discovery.refresh())), 1)
+        self.assertEquals(self.pending, {})
+
+        # the cached nodes expire
+        self.clock.advance(30.0)
+        result = self._collect(discovery.refresh())
+        self.assertEquals(result, [])
+        self.assertEquals(sorted(self.pending), ['a'])
+
+    def test_no_urls(self):
+        discovery = self._discovery([])
+        self.assertEquals(self._collect(discovery.refresh()), [[]])
+
+    def test_create(self):
+        discovery = create_peer_discovery(
+            {'LedgerURL': 'http://localhost:8800', 'DiscoveryQuorum': 3,
+             'DiscoveryThreads': 2},
+            self._fetch)
+        self.assertEquals(discovery.URLs, ['http://localhost:8800'])
+        self.assertEquals(discovery.Quorum, 1)
+
+        # the fetches run on a pool of their own
+        self.assertEquals(discovery._pool.Name, 'PeerDiscovery')
+        self.assertEquals(discovery._pool.ThreadPool.max, 2)
@@ -0,0 +1,102 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from txnserver.rate_limit import AdmissionControl
+from txnserver.rate_limit import create_admission_control
+from txnserver.rate_limit import RateLimited
+from txnserver.rate_limit import RateLimiter
+from txnserver.rate_limit import TokenBucket
+from txnserver.rate_limit import TOO_MANY_REQUESTS
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_consume(self):
+        bucket = TokenBucket(10, 20)
+        now = bucket.LastDrip
+        self.assertEquals(bucket.consume(20, now), 0.0)
+        self.assertAlmostEquals(bucket.consume(5, now), 0.5)
+        self.assertEquals(bucket.consume(5, now + 0.5), 0.0)
+
+    def test_oversized_request(self):
+        bucket = TokenBucket(10, 20)
+        now = bucket.LastDrip
+        self.assertEquals(bucket.consume(30, now), 0.0)
+        self.assertAlmostEquals(bucket.consume(1, now), 1.1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_keys(self):
+        limiter = RateLimiter(1, 2, max_keys=2)
+        self.assertEquals(limiter.check('a', 2), 0.0)
+        self.assertGreater(limiter.check('a'), 0.0)
+        self.assertEquals(limiter.check('b', 2), 0.0)
+
+        # a is forgotten once a third key is seen
+        self.assertEquals(limiter.check('c'), 0.0)
+        self.assertEquals(limiter.check('a'), 0.0)
+
+    def test_disabled(self):
+        limiter = RateLimiter(0)
+        for _ in range(100):
+            self.assertEquals(limiter.check('a'), 0.0)
+
+
+class TestAdmissionControl(unittest.TestCase):
+    def test_rates(self):
+        admission = AdmissionControl(client_rate=1, signer_rate=1)
+        admission.admit_client('127.0.0.1', 2)
+        with self.assertRaises(RateLimited) as cm:
+            admission.admit_client('127.0.0.1')
+        self.assertEquals(cm.exception.Status, TOO_MANY_REQUESTS)
+        self.assertGreater(cm.exception.RetryAfter, 0)
+
+        admission.admit_signer('signer', 2)
+        with self.assertRaises(RateLimited):
+            admission.admit_signer('signer')
+
+        stats = admission.get_stats()
+        self.assertEquals(stats['Rejected']['ClientRate'], 1)
+        self.assertEquals(stats['Rejected']['SignerRate'], 1)
+
+    def test_in_flight(self):
+        admission = AdmissionControl(max_in_flight=1, timeout=0.01)
+        with admission.validation():
+            with self.assertRaises(RateLimited):
+                with admission.validation():
+                    pass
+        with admission.validation():
+            pass
+
+        stats = admission.get_stats()
+        self.assertEquals(stats['Admitted'], 2)
+        self.assertEquals(stats['Queued'], 1)
+        self.assertEquals(stats['Rejected']['InFlight'], 1)
+        self.assertEquals(stats['InFlight'], 0)
+
+
+class TestCreateAdmissionControl(unittest.TestCase):
+    def test_in_flight_bounded_by_write_threads(self):
+        # one write thread is left for other requests by default
+        self.assertEquals(create_admission_control({}, 4).MaxInFlight, 3)
+        self.assertEquals(create_admission_control({}, 1).MaxInFlight, 1)
+
+        admission = create_admission_control(
+            {'MaxInFlightValidations': 8}, 4)
+        self.assertEquals(admission.MaxInFlight, 4)
+        admission = create_admission_control(
+            {'MaxInFlightValidations': 2}, 4)
+        self.assertEquals(admission.MaxInFlight, 2)
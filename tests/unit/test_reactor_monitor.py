@@ -0,0 +1,82 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import task
+
+from txnserver.reactor_monitor import create_reactor_monitor
+from txnserver.reactor_monitor import ReactorMonitor
+
+
+class TestReactorMonitor(unittest.TestCase):
+    def setUp(self):
+        self.clock = task.Clock()
+        # a threshold long enough that the watchdog thread never fires
+        # on its own during the test
+        self.monitor = ReactorMonitor(interval=0.1, threshold=1000.0,
+                                      clock=self.clock)
+        self.monitor.start()
+
+    def tearDown(self):
+        self.monitor.stop()
+
+    def test_lag(self):
+        self.clock.advance(0.1)
+        self.clock.pump([0.1] * 3)
+        # the timer fires half a second late
+        self.clock.advance(0.6)
+
+        stats = self.monitor.get_stats()
+        self.assertEquals(stats['Lag']['Count'], 6)
+        self.assertAlmostEquals(stats['Lag']['Maximum'], 0.5)
+        self.assertAlmostEquals(self.monitor.Lag, 0.5)
+        self.assertEquals(stats['SlowCallbacks'], 0)
+
+    def test_blocked(self):
+        now = self.clock.seconds()
+        self.assertFalse(self.monitor.check(now + 500.0))
+
+        # blocked past the threshold, reported once
+        self.assertTrue(self.monitor.check(now + 1001.0))
+        self.assertFalse(self.monitor.check(now + 1002.0))
+        self.assertTrue(self.monitor.get_stats()['Blocked'])
+
+        # the reactor runs the timer again
+        self.clock.advance(1002.0)
+        stats = self.monitor.get_stats()
+        self.assertFalse(stats['Blocked'])
+        self.assertEquals(stats['SlowCallbacks'], 1)
+
+        self.monitor.reset_stats()
+        self.assertEquals(self.monitor.get_stats()['SlowCallbacks'], 0)
+
+
+class TestCreateReactorMonitor(unittest.TestCase):
+    def test_create(self):
+        monitor = create_reactor_monitor({'Threshold': 2.0})
+        self.assertEquals(monitor.Threshold, 2.0)
+        self.assertEquals(monitor.Interval, 0.1)
+
+        # without a threshold only the lag is measured
+        clock = task.Clock()
+        monitor = create_reactor_monitor({'Threshold': 0})
+        monitor._clock = clock
+        monitor.start()
+        clock.advance(0.1)
+        clock.advance(0.3)
+        self.assertIsNone(monitor._watchdog)
+        self.assertAlmostEquals(monitor.Lag, 0.2)
+        monitor.stop()
@@ -0,0 +1,132 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import socket
+import unittest
+
+from twisted.internet import defer
+from twisted.internet import task
+from twisted.internet.error import DNSLookupError
+
+from txnserver.resolver import create_resolver
+from txnserver.resolver import Resolver
+
+ADDRESSES = {'alpha': '10.0.0.1', 'beta': '10.0.0.2'}
+
+
+class TestResolver(unittest.TestCase):
+    def setUp(self):
+        self.clock = task.Clock()
+        self.lookups = []
+        self.pending = {}
+        self.resolver = Resolver(ttl=60.0, negative_ttl=10.0,
+                                 clock=self.clock, resolve=self._resolve,
+                                 lookup=self._lookup)
+
+    def _lookup(self, host):
+        self.lookups.append(host)
+        if host not in ADDRESSES:
+            raise socket.gaierror(socket.EAI_NONAME, 'unknown host')
+        return ADDRESSES[host]
+
+    def _resolve(self, host):
+        self.lookups.append(host)
+        self.pending[host] = defer.Deferred()
+        return self.pending[host]
+
+    def _collect(self, d):
+        result = []
+        d.addBoth(result.append)
+        return result
+
+    def test_gethostbyname_cache(self):
+        self.assertEquals(self.resolver.gethostbyname('alpha'), '10.0.0.1')
+        self.assertEquals(self.resolver.gethostbyname('alpha'), '10.0.0.1')
+        self.assertEquals(self.resolver.gethostbyname('10.1.1.1'),
+                          '10.1.1.1')
+        self.assertEquals(self.lookups, ['alpha'])
+
+        self.clock.advance(60.0)
+        self.resolver.gethostbyname('alpha')
+        self.assertEquals(self.lookups, ['alpha', 'alpha'])
+
+        stats = self.resolver.get_stats()
+        self.assertEquals(stats['Hits'], 1)
+        self.assertEquals(stats['Misses'], 2)
+
+    def test_negative_cache(self):
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                self.resolver.gethostbyname('gamma')
+        self.assertEquals(self.lookups, ['gamma'])
+
+        # the failure is forgotten after the negative ttl
+        self.clock.advance(10.0)
+        with self.assertRaises(socket.gaierror):
+            self.resolver.gethostbyname('gamma')
+        self.assertEquals(self.lookups, ['gamma', 'gamma'])
+
+        stats = self.resolver.get_stats()
+        self.assertEquals(stats['NegativeHits'], 1)
+        self.assertEquals(stats['Failures'], 2)
+
+    def test_resolve(self):
+        first = self._collect(self.resolver.resolve('alpha'))
+        second = self._collect(self.resolver.resolve('alpha'))
+        # concurrent requests share the lookup
+        self.assertEquals(self.lookups, ['alpha'])
+
+        self.pending['alpha'].callback('10.0.0.1')
+        self.assertEquals(first, ['10.0.0.1'])
+        self.assertEquals(second, ['10.0.0.1'])
+
+        # answered from the cache, including for blocking lookups
+        self.assertEquals(self._collect(self.resolver.resolve('alpha')),
+                          ['10.0.0.1'])
+        self.assertEquals(self.resolver.gethostbyname('alpha'), '10.0.0.1')
+        self.assertEquals(self.lookups, ['alpha'])
+
+    def test_resolve_failure(self):
+        result = self._collect(self.resolver.resolve('gamma'))
+        self.pending['gamma'].errback(DNSLookupError('gamma'))
+        self.assertTrue(result[0].check(DNSLookupError))
+
+        result = self._collect(self.resolver.resolve('gamma'))
+        self.assertTrue(result[0].check(DNSLookupError))
+        self.assertEquals(self.lookups, ['gamma'])
+
+    def test_resolve_many(self):
+        result = self._collect(self.resolver.resolve_many(
+            ['alpha', 'gamma', 'alpha', '10.1.1.1']))
+        self.assertEquals(sorted(self.lookups), ['alpha', 'gamma'])
+
+        self.pending['alpha'].callback('10.0.0.1')
+        self.assertEquals(result, [])
+        self.pending['gamma'].errback(DNSLookupError('gamma'))
+        self.assertEquals(result, [{'alpha': '10.0.0.1', 'gamma': None,
+                                    '10.1.1.1': '10.1.1.1'}])
+
+    def test_resolve_all(self):
+        addresses = self.resolver.resolve_all(['alpha', 'beta', 'gamma'])
+        self.assertEquals(addresses, {'alpha': '10.0.0.1',
+                                      'beta': '10.0.0.2',
+                                      'gamma': None})
+        self.assertEquals(self.resolver.get_stats()['Entries'], 3)
+        self.assertEquals(self.resolver.resolve_all([]), {})
+
+    def test_create(self):
+        resolver = create_resolver({'TTL': 5})
+        self.assertEquals(resolver.TTL, 5)
+        self.assertEquals(resolver.NegativeTTL, 30.0)
@@ -0,0 +1,98 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+from txnserver.sampling_profiler import collapse_stack
+from txnserver.sampling_profiler import create_sampling_profiler
+from txnserver.sampling_profiler import SamplingProfiler
+
+
+def wait_for(started, event):
+    started.set()
+    event.wait()
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_collapse_stack(self):
+        stack = collapse_stack(sys._getframe(), 'Main Thread')
+        self.assertTrue(stack.startswith('Main_Thread;'))
+        self.assertTrue(stack.endswith(
+            ';test_sampling_profiler:test_collapse_stack'))
+
+    def test_sample_and_flush(self):
+        profiler = SamplingProfiler(self.directory, 'node')
+        self.assertIsNone(profiler.flush())
+
+        started = threading.Event()
+        event = threading.Event()
+        thread = threading.Thread(target=wait_for, args=(started, event),
+                                  name='Waiter')
+        thread.start()
+        started.wait()
+        try:
+            profiler.sample()
+            profiler.sample()
+        finally:
+            event.set()
+            thread.join()
+
+        filename = profiler.flush()
+        with open(filename) as f:
+            lines = f.read().splitlines()
+
+        waiter = [l for l in lines if l.startswith('Waiter;')]
+        self.assertEquals(len(waiter), 1)
+        (stack, count) = waiter[0].rsplit(' ', 1)
+        self.assertIn('test_sampling_profiler:wait_for', stack)
+        self.assertEquals(count, '2')
+
+        # the sampling thread does not sample itself
+        self.assertEquals(
+            [l for l in lines if 'test_sample_and_flush' in l], [])
+
+        stats = profiler.get_stats()
+        self.assertEquals(stats['Samples'], 2)
+        self.assertEquals(stats['LastFile'], filename)
+
+    def test_start_stop(self):
+        profiler = SamplingProfiler(self.directory, 'node', interval=0.001)
+        profiler.start()
+        self.assertTrue(profiler.running)
+        while profiler.get_stats()['Samples'] < 3:
+            pass
+        profiler.stop()
+
+        stats = profiler.get_stats()
+        self.assertFalse(stats['Running'])
+        self.assertEquals(stats['Files'], 1)
+
+    def test_create(self):
+        profiler = create_sampling_profiler(
+            {'DataDirectory': self.directory, 'NodeName': 'base000',
+             'SamplingProfiler': {'Interval': 0.05}})
+        self.assertEquals(profiler.Directory, self.directory)
+        self.assertEquals(profiler.Name, 'base000')
+        self.assertEquals(profiler.Interval, 0.05)
@@ -0,0 +1,109 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+import tempfile
+
+import gossip.signed_object as SigObj
+from gossip.node import Node
+from journal.journal_core import Journal
+from ledger.transaction import integer_key
+from sawtooth.exceptions import InvalidTransactionError
+
+from txnserver.speculative_head import SpeculativeHead
+
+
+class TestSpeculativeHead(unittest.TestCase):
+    def _create_ledger(self, port):
+        signingkey = SigObj.generate_signing_key()
+        ident = SigObj.generate_identifier(signingkey)
+        node = Node(identifier=ident, signingkey=signingkey,
+                    address=("localhost", port))
+        ledger = Journal(node, DataDirectory=tempfile.mkdtemp(),
+                         GenesisLedger=True)
+        integer_key.register_transaction_types(ledger)
+        return ledger
+
+    def _create_txn(self, ledger, verb, name, value):
+        txn = integer_key.IntegerKeyTransaction()
+        update = integer_key.Update()
+        update.Verb = verb
+        update.Name = name
+        update.Value = value
+        txn.Updates.append(update)
+        txn.sign_from_node(ledger.LocalNode)
+        return txn
+
+    def test_pending_transactions_applied(self):
+        ledger = self._create_ledger(8810)
+        head = SpeculativeHead(ledger)
+
+        inc = self._create_txn(ledger, 'inc', 'a', 1)
+        with self.assertRaises(InvalidTransactionError):
+            head.check_valid(inc)
+
+        txn = self._create_txn(ledger, 'set', 'a', 1)
+        ledger.TransactionStore[txn.Identifier] = txn
+        ledger.PendingTransactions[txn.Identifier] = True
+
+        self.assertTrue(head.check_valid(inc))
+        self.assertEquals(head.get_stats()['AppliedTransactions'], 1)
+
+    def test_pending_transaction_replaced(self):
+        ledger = self._create_ledger(8813)
+        head = SpeculativeHead(ledger)
+
+        first = self._create_txn(ledger, 'set', 'd', 1)
+        ledger.TransactionStore[first.Identifier] = first
+        ledger.PendingTransactions[first.Identifier] = True
+        self.assertTrue(head.check_valid(
+            self._create_txn(ledger, 'inc', 'd', 1)))
+
+        # one pending transaction is dropped and another added, the count
+        # does not change but the overlay must follow
+        second = self._create_txn(ledger, 'set', 'e', 1)
+        ledger.TransactionStore[second.Identifier] = second
+        del ledger.PendingTransactions[first.Identifier]
+        ledger.PendingTransactions[second.Identifier] = True
+
+        with self.assertRaises(InvalidTransactionError):
+            head.check_valid(self._create_txn(ledger, 'inc', 'd', 1))
+        self.assertTrue(head.check_valid(
+            self._create_txn(ledger, 'inc', 'e', 1)))
+
+    def test_submitted_transactions_applied(self):
+        ledger = self._create_ledger(8811)
+        head = SpeculativeHead(ledger)
+
+        head.apply(self._create_txn(ledger, 'set', 'b', 1))
+        self.assertTrue(head.check_valid(
+            self._create_txn(ledger, 'inc', 'b', 1)))
+
+        # transactions that have not reached the ledger yet survive a
+        # rebuild of the overlay
+        generation = head.get_stats()['Generation']
+        head.invalidate()
+        self.assertTrue(head.check_valid(
+            self._create_txn(ledger, 'inc', 'b', 1)))
+        self.assertEquals(head.get_stats()['Generation'], generation + 1)
+
+    def test_unknown_store(self):
+        ledger = self._create_ledger(8812)
+        head = SpeculativeHead(ledger)
+
+        txn = self._create_txn(ledger, 'set', 'c', 1)
+        ledger.GlobalStore.TransactionStores.pop(txn.TransactionTypeName)
+        head.invalidate()
+        self.assertFalse(head.check_valid(txn))
@@ -0,0 +1,105 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import task
+
+from journal.transaction import Status
+
+from txnserver.txn_status import get_transaction_status
+from txnserver.txn_status import StatusPoll
+from txnserver.txn_status import StatusWatcher
+
+
+class TestTransaction(object):
+    def __init__(self, status, inblock=None):
+        self.Status = status
+        self.InBlock = inblock
+
+
+class TestLedger(object):
+    def __init__(self):
+        self.TransactionStore = {}
+        self.PendingTransactions = {}
+        self.MostRecentCommittedBlockID = 'a'
+
+    def add(self, txnid):
+        self.TransactionStore[txnid] = TestTransaction(Status.pending)
+        self.PendingTransactions[txnid] = True
+
+    def commit(self, blkid, txnid):
+        self.TransactionStore[txnid] = TestTransaction(Status.committed,
+                                                       blkid)
+        self.PendingTransactions.pop(txnid, None)
+        self.MostRecentCommittedBlockID = blkid
+
+
+class TestTxnStatus(unittest.TestCase):
+    def test_get_transaction_status(self):
+        ledger = TestLedger()
+        ledger.add('t1')
+        ledger.commit('b', 't2')
+
+        self.assertEquals(
+            get_transaction_status(ledger, ['t1', 't2', 't3']),
+            {'t1': {'Status': Status.pending},
+             't2': {'Status': Status.committed, 'InBlock': 'b'},
+             't3': {'Status': Status.unknown}})
+
+    def test_watch_commit(self):
+        ledger = TestLedger()
+        ledger.add('t1')
+        clock = task.Clock()
+        watcher = StatusWatcher(ledger, clock=clock)
+
+        statuses = get_transaction_status(ledger, ['t1'])
+        results = []
+        d = watcher.watch(StatusPoll(['t1'], statuses, 30, False))
+        d.addCallback(results.append)
+
+        clock.advance(1)
+        self.assertEquals(results, [])
+
+        ledger.commit('b', 't1')
+        clock.advance(0.25)
+        self.assertEquals(results[0]['t1']['InBlock'], 'b')
+        self.assertFalse(clock.getDelayedCalls())
+
+    def test_watch_timeout(self):
+        ledger = TestLedger()
+        ledger.add('t1')
+        clock = task.Clock()
+        watcher = StatusWatcher(ledger, clock=clock)
+
+        statuses = get_transaction_status(ledger, ['t1'])
+        results = []
+        poll = StatusPoll(['t1'], statuses, 5, False)
+        watcher.watch(poll).addCallback(results.append)
+
+        clock.advance(5)
+        self.assertEquals(results, [statuses])
+        self.assertFalse(clock.getDelayedCalls())
+
+    def test_cancel(self):
+        ledger = TestLedger()
+        clock = task.Clock()
+        watcher = StatusWatcher(ledger, clock=clock)
+
+        poll = StatusPoll(['t1'], {}, 5, False)
+        d = watcher.watch(poll)
+        d.addErrback(lambda _: None)
+        watcher.cancel(poll)
+        self.assertFalse(clock.getDelayedCalls())
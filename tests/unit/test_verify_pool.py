@@ -0,0 +1,112 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import os
+import pickle
+import unittest
+
+from txnserver.verify_pool import create_verify_pool
+from txnserver.verify_pool import verify_message
+from txnserver.verify_pool import VerifyPool
+
+
+class Transaction(object):
+    def __init__(self, minfo):
+        self.Signature = minfo['Signature']
+        self.VerifiedBy = None
+
+    @property
+    def OriginatorID(self):
+        if self.Signature == 'bad':
+            raise ValueError('invalid signature')
+        # remember which process did the work
+        self.VerifiedBy = os.getpid()
+        return 'originator'
+
+    @property
+    def Identifier(self):
+        return 'txn-' + self.Signature
+
+
+class Message(object):
+    def __init__(self, minfo):
+        self.Transaction = Transaction(minfo['Transaction'])
+
+    @property
+    def OriginatorID(self):
+        return 'node'
+
+    @property
+    def Identifier(self):
+        return 'msg-' + self.Transaction.Signature
+
+
+def create_request(signature):
+    return (Message, {'Transaction': {'Signature': signature}})
+
+
+class TestVerifyMessage(unittest.TestCase):
+    def test_verify(self):
+        msg = pickle.loads(verify_message(*create_request('a')))
+        self.assertEquals(msg.Transaction.Identifier, 'txn-a')
+        self.assertEquals(msg.Transaction.VerifiedBy, os.getpid())
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            verify_message(*create_request('bad'))
+
+
+class TestVerifyPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = VerifyPool(2)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def test_verify_many(self):
+        results = self.pool.verify_many(
+            [create_request('a'), create_request('bad'),
+             create_request('b')])
+
+        self.assertEquals(len(results), 3)
+        self.assertIsInstance(results[1], ValueError)
+
+        msg = pickle.loads(results[0])
+        self.assertEquals(msg.Identifier, 'msg-a')
+        # verified in a pool process, not in this one
+        self.assertNotEquals(msg.Transaction.VerifiedBy, os.getpid())
+        self.assertEquals(pickle.loads(results[2]).Identifier, 'msg-b')
+
+        stats = self.pool.get_stats()
+        self.assertEquals(stats['Verified'], 2)
+        self.assertEquals(stats['Failed'], 1)
+        self.assertEquals(stats['VerifyTime']['Count'], 1)
+
+    def test_verify(self):
+        msg = pickle.loads(self.pool.verify(*create_request('a')))
+        self.assertEquals(msg.Identifier, 'msg-a')
+
+        with self.assertRaises(ValueError):
+            self.pool.verify(*create_request('bad'))
+
+
+class TestCreateVerifyPool(unittest.TestCase):
+    def test_disabled(self):
+        self.assertIsNone(create_verify_pool({}))
+
+    def test_enabled(self):
+        pool = create_verify_pool({'VerifyProcesses': 3})
+        self.assertEquals(pool.Processes, 3)
@@ -18,6 +18,7 @@ import json
 import tempfile
 import yaml
 from twisted.web import http
+from twisted.web.error import Error
 from twisted.web.http_headers import Headers
 from twisted.internet import address
 
@@ -38,6 +39,7 @@ from journal.journal_core import Journal
 class TestValidator(object):
     def __init__(self, testLedger):
         self.Ledger = testLedger
+        self.Config = {}
 
 
 class TestWebApi(unittest.TestCase):
@@ -116,6 +118,40 @@ class TestWebApi(unittest.TestCase):
         self.assertIn(msg.Identifier, node1.MessageQ.Messages)
         self.assertIn(msg.Identifier, node2.MessageQ.Messages)
 
+    def test_web_api_batch(self):
+        # Test _msg_batch
+        LocalNode = self._create_node(8808)
+        path = tempfile.mkdtemp()
+        ledger = Journal(LocalNode, DataDirectory=path, GenesisLedger=True)
+        node1 = self._create_node(8883)
+        node1.is_peer = True
+        ledger.add_node(node1)
+        validator = TestValidator(ledger)
+        root = RootPage(validator)
+        msg1 = shutdown_message.ShutdownMessage()
+        msg1.sign_from_node(LocalNode)
+        msg2 = shutdown_message.ShutdownMessage({'__NONCE__': 1.0})
+        msg2.sign_from_node(LocalNode)
+        data = [msg1.dump(), {'__TYPE__': 'NoSuchMessage'}, msg2.dump()]
+        # Post /batch
+        request = self._create_post_request("/batch", data)
+        r = yaml.load(root.do_post(request))
+        self.assertEquals([x['Status'] for x in r],
+                          ['accepted', 'rejected', 'accepted'])
+        self.assertEquals(r[0]['Identifier'], msg1.Identifier)
+        self.assertIn(msg1.Identifier, node1.MessageQ.Messages)
+        self.assertIn(msg2.Identifier, node1.MessageQ.Messages)
+        # a batch must be a list
+        request = self._create_post_request("/batch", msg1.dump())
+        self.assertEquals(root.do_post(request),
+                          "batch request must contain a list of messages\n")
+        # batches larger than MaximumBatchSize are refused undecoded
+        root.MaximumBatchSize = 2
+        request = self._create_post_request("/batch", data)
+        self.assertEquals(root.do_post(request),
+                          "batch request for more than 2 messages\n")
+        self.assertEquals(request.code, http.REQUEST_ENTITY_TOO_LARGE)
+
     def test_web_api_msg_initiate(self):
         # Test _msginitiate
         LocalNode = self._create_node(8806)
@@ -181,11 +217,48 @@ class TestWebApi(unittest.TestCase):
         # GET /store/TestTransaction/*
         request = self._create_get_request("/store/TestTransaction/*", {})
         self.assertEquals(root.do_get(request), '{"TestKey": 0}')
+        # GET /store/TestTransaction/*?limit=1
+        request = self._create_get_request("/store/TestTransaction/*",
+                                           {"limit": ['1']})
+        r = yaml.load(root.do_get(request))
+        self.assertEquals(r["Store"], {"TestKey": 0})
+        self.assertNotIn("Next", r)
+        # GET /store/TestTransaction/*?after=TestKey
+        request = self._create_get_request("/store/TestTransaction/*",
+                                           {"after": ['TestKey']})
+        self.assertEquals(yaml.load(root.do_get(request))["Store"], {})
         # GET /store/TestTransaction/*?delta=1
         request = self._create_get_request("/store/TestTransaction/*",
                                            {"delta": ['1']})
         self.assertEquals(root.do_get(request),
                           '{"DeletedKeys": [], "Store": {"TestKey": 0}}')
+        # GET /store/EndpointTransaction/*?domain=/west
+        epstore = KeyValueStore()
+        epstore.set("a", {"Domain": "/west/1"})
+        epstore.set("b", {"Domain": "/east"})
+        epstore.set("c", {})
+        ledger.GlobalStore.TransactionStores["/EndpointTransaction"] = epstore
+        request = self._create_get_request("/store/EndpointTransaction/*",
+                                           {"domain": ['/west']})
+        self.assertEquals(yaml.load(root.do_get(request)),
+                          {"a": {"Domain": "/west/1"}})
+        request = self._create_get_request("/store/EndpointTransaction/*",
+                                           {"domain": ['/west'],
+                                            "limit": ['1']})
+        r = yaml.load(root.do_get(request))
+        self.assertEquals(r["Store"], {"a": {"Domain": "/west/1"}})
+        self.assertNotIn("Next", r)
+        # entries without a Domain are in the root domain
+        request = self._create_get_request("/store/EndpointTransaction/*",
+                                           {"domain": ['/'], "limit": ['1'],
+                                            "after": ['b']})
+        r = yaml.load(root.do_get(request))
+        self.assertEquals(r["Store"], {"c": {}})
+        self.assertNotIn("Next", r)
+        request = self._create_get_request("/store/EndpointTransaction/*",
+                                           {"domain": ['/'], "delta": ['1']})
+        with self.assertRaises(Error):
+            root.do_get(request)
         # GET /store/TestTransaction/TestKey
         request = self._create_get_request("/store/TestTransaction/TestKey",
                                            {})
@@ -207,6 +280,19 @@ class TestWebApi(unittest.TestCase):
         request = self._create_get_request("/store/TestTransaction/*",
                                            {"blockid": ["123"]})
         self.assertEquals(root.do_get(request), '{"TestKey": 0}')
+        self.assertEquals(root.BlockStoreCache.get_stats()['Entries'], 0)
+
+        # the state of a committed block is cached
+        ledger.BlockStore["123"] = self._create_tblock(
+            LocalNode, 0, common.NullIdentifier, [])
+        for _ in range(2):
+            request = self._create_get_request("/store/TestTransaction/*",
+                                               {"blockid": ["123"]})
+            self.assertEquals(root.do_get(request), '{"TestKey": 0}')
+        stats = root.BlockStoreCache.get_stats()
+        self.assertEquals(stats['Entries'], 1)
+        self.assertEquals(stats['Size'], 1)
+        self.assertEquals(stats['Hits'], 1)
 
     def test_web_api_block(self):
         # Test _handleblkrequest
@@ -237,6 +323,17 @@ class TestWebApi(unittest.TestCase):
         string = '["' + str(transBlock2.Identifier) + '"]'
         request = self._create_get_request("/block", {"blockcount": [1]})
         self.assertEquals(root.do_get(request), string)
+        # GET /block?from=1&fields=Identifier,BlockNum
+        request = self._create_get_request(
+            "/block", {"from": [1], "fields": ["Identifier,BlockNum"]})
+        self.assertEquals(json.loads(root.do_get(request)),
+                          [{"Identifier": transBlock2.Identifier,
+                            "BlockNum": 1}])
+        # GET /block?from=1&fields=BlockNum&stream=0 returns a page
+        request = self._create_get_request(
+            "/block", {"from": [1], "fields": ["BlockNum"], "stream": ['0']})
+        self.assertEquals(json.loads(root.do_get(request)),
+                          [{"BlockNum": 1}])
         # Add identifier to dictionary
         dictB = transBlock.dump()
         dictB["Identifier"] = transBlock.Identifier
@@ -250,6 +347,19 @@ class TestWebApi(unittest.TestCase):
                                            "/Signature", {})
         self.assertEquals(root.do_get(request), '"' +
                           transBlock.Signature + '"')
+        # GET /block/{BlockId} is answered from the response cache once
+        # it has been fetched, and honors If-None-Match
+        request = self._create_get_request("/block/" + transBlock.Identifier,
+                                           {})
+        request.method = 'GET'
+        self.assertEquals(yaml.load(root._render_cached(request)), dictB)
+        etag = request.responseHeaders.getRawHeaders('ETag')[0]
+        request = self._create_get_request("/block/" + transBlock.Identifier,
+                                           {})
+        request.method = 'GET'
+        request.requestHeaders.setRawHeaders('If-None-Match', [etag])
+        self.assertEquals(root._render_cached(request), '')
+        self.assertEquals(request.code, http.NOT_MODIFIED)
 
     def test_web_api_transaction(self):
         # Test _handletxnrequest
@@ -286,6 +396,17 @@ class TestWebApi(unittest.TestCase):
         r = r[1:-1].replace('"', "")
         r = r.replace(" ", "").split(",")
         self.assertEquals(r, txns)
+        # GET /transaction?offset=2&limit=3
+        request = self._create_get_request("/transaction",
+                                           {"offset": [2], "limit": [3]})
+        r = root.do_get(request)
+        r = r[1:-1].replace('"', "")
+        r = r.replace(" ", "").split(",")
+        self.assertEquals(r, txns[2:5])
+        # GET /transaction?since_block=1 is empty with a single block
+        request = self._create_get_request("/transaction",
+                                           {"since_block": [1]})
+        self.assertEquals(root.do_get(request), "[]")
         # Returns None if testing
         # GET /transaction/{TransactionID}
         request = self._create_get_request("/transaction/" + txns[1], {})
@@ -301,6 +422,14 @@ class TestWebApi(unittest.TestCase):
                                            "/InBlock", {})
         self.assertEquals(root.do_get(request).replace('"', ""),
                           txn.InBlock)
+        # POST /transaction/status
+        request = self._create_post_request("/transaction/status",
+                                            [txns[0], "unknown"])
+        r = yaml.load(root.do_post(request))
+        self.assertEquals(r[txns[0]],
+                          {'Status': tStatus.committed,
+                           'InBlock': transBlock.Identifier})
+        self.assertEquals(r["unknown"], {'Status': tStatus.unknown})
 
     def test_web_api_stats(self):
         # Test _handlestatrequest
@@ -0,0 +1,94 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from txnserver.web_cache import LRUCache
+from txnserver.web_cache import ResponseCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_by_size(self):
+        cache = LRUCache(10)
+        cache.put('a', 'aaaa', 4)
+        cache.put('b', 'bbbb', 4)
+        # touch a so that b is the least recently used entry
+        self.assertEquals(cache.get('a'), 'aaaa')
+        cache.put('c', 'cccc', 4)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+        stats = cache.get_stats()
+        self.assertEquals(stats['Size'], 8)
+        self.assertEquals(stats['Evictions'], 1)
+
+    def test_oversized_value(self):
+        cache = LRUCache(10)
+        cache.put('a', 'a' * 11, 11)
+        self.assertEquals(len(cache), 0)
+        self.assertIsNone(cache.get('a'))
+        self.assertEquals(cache.get_stats()['Misses'], 1)
+
+    def test_replace_and_remove(self):
+        cache = LRUCache(10)
+        cache.put('a', 'aaaa', 4)
+        cache.put('a', 'aa', 2)
+        self.assertEquals(cache.get_stats()['Size'], 2)
+        cache.remove('a')
+        self.assertEquals(cache.get_stats()['Size'], 0)
+
+
+class TestRequest(object):
+    def __init__(self, path, args, headers):
+        self.path = path
+        self.args = args
+        self.headers = headers
+
+    def getHeader(self, name):
+        return self.headers.get(name)
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_make_key(self):
+        request = TestRequest('/store/IntegerKeyTransaction/*',
+                              {'blockid': ['123'], 'delta': ['1']},
+                              {'Accept': 'application/cbor'})
+
+        key = ResponseCache.make_key(request)
+        request.args = {'delta': ['1'], 'blockid': ['123']}
+        self.assertEquals(ResponseCache.make_key(request), key)
+        request.args = {'delta': ['1']}
+        self.assertNotEquals(ResponseCache.make_key(request), key)
+
+    def test_add_response(self):
+        cache = ResponseCache(1024)
+        response = cache.add_response('key', '{"a": 1}', 'application/json')
+        self.assertEquals(cache.get('key'), response)
+        self.assertEquals(response.etag, ResponseCache.make_etag('{"a": 1}'))
+        self.assertNotEquals(response.etag,
+                             ResponseCache.make_etag('{"a": 2}'))
+
+    def test_add_variant(self):
+        cache = ResponseCache(1024)
+        response = cache.add_response('key', '{"a": 1}', 'application/json')
+        variant = cache.add_variant('key', response, 'gzip', 'compressed')
+        self.assertEquals(
+            cache.get(ResponseCache.variant_key('key', 'gzip')), variant)
+        self.assertEquals(variant.encoding, 'gzip')
+        self.assertEquals(variant.content_type, 'application/json')
+        self.assertNotEquals(variant.etag, response.etag)
+        self.assertEquals(cache.get('key'), response)
@@ -0,0 +1,48 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import gzip
+import unittest
+import zlib
+
+from StringIO import StringIO
+
+from txnserver.web_encoding import choose_encoding
+from txnserver.web_encoding import compress
+from txnserver.web_encoding import parse_accept_encoding
+
+
+class TestWebEncoding(unittest.TestCase):
+    def test_parse_accept_encoding(self):
+        self.assertEquals(parse_accept_encoding('gzip, deflate;q=0.5'),
+                          {'gzip': 1.0, 'deflate': 0.5})
+        self.assertEquals(parse_accept_encoding(None), {})
+
+    def test_choose_encoding(self):
+        self.assertEquals(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEquals(choose_encoding('gzip;q=0.2, deflate'), 'deflate')
+        self.assertEquals(choose_encoding('*'), 'gzip')
+        self.assertEquals(choose_encoding('gzip;q=0, identity'), None)
+        self.assertEquals(choose_encoding('br'), None)
+        self.assertEquals(choose_encoding(None), None)
+
+    def test_compress(self):
+        body = '{"key": "value"}' * 100
+
+        data = compress(body, 'gzip')
+        self.assertEquals(gzip.GzipFile(fileobj=StringIO(data)).read(), body)
+        self.assertEquals(zlib.decompress(compress(body, 'deflate')), body)
+        with self.assertRaises(ValueError):
+            compress(body, 'br')
@@ -0,0 +1,174 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import defer
+from twisted.internet import task
+
+from txnserver.chain_index import ChainIndex
+from txnserver.web_events import EventFilter
+from txnserver.web_events import EventNotifier
+
+
+class TestBlock(object):
+    def __init__(self, blocknum, previous, txnids):
+        self.BlockNum = blocknum
+        self.PreviousBlockID = previous
+        self.TransactionIDs = txnids
+
+
+class TestTransaction(object):
+    def __init__(self, store):
+        self.TransactionTypeName = store
+
+
+class TestLedger(object):
+    def __init__(self):
+        self.BlockStore = {'a': TestBlock(0, None, [])}
+        self.TransactionStore = {}
+        self.PendingTransactions = {}
+        self.MostRecentCommittedBlockID = 'a'
+
+    def add(self, txnid, store):
+        self.TransactionStore[txnid] = TestTransaction(store)
+        self.PendingTransactions[txnid] = True
+
+    def commit(self, blkid, txnids):
+        previous = self.BlockStore[self.MostRecentCommittedBlockID]
+        self.BlockStore[blkid] = TestBlock(previous.BlockNum + 1,
+                                           self.MostRecentCommittedBlockID,
+                                           txnids)
+        for txnid in txnids:
+            self.PendingTransactions.pop(txnid, None)
+        self.MostRecentCommittedBlockID = blkid
+
+
+class TestRequest(object):
+    def __init__(self):
+        self.written = []
+        self.finished = defer.Deferred()
+
+    def registerProducer(self, producer, streaming):
+        self.producer = producer
+
+    def unregisterProducer(self):
+        self.producer = None
+
+    def write(self, data):
+        self.written.append(data)
+
+    def notifyFinish(self):
+        return self.finished
+
+    def finish(self):
+        self.finished.callback(None)
+
+    def events(self):
+        return [x.split('\n')[0] for x in self.written
+                if x.startswith('event:')]
+
+
+class TestWebEvents(unittest.TestCase):
+    def _create_notifier(self, ledger, clock):
+        # the index is brought up to date by hand where its background
+        # loop would run
+        index = ChainIndex(ledger)
+        index.update()
+        notifier = EventNotifier(ledger, index, queue_limit=2, clock=clock)
+        return (notifier, index)
+
+    def test_commit_and_drop(self):
+        ledger = TestLedger()
+        clock = task.Clock()
+        (notifier, index) = self._create_notifier(ledger, clock)
+
+        request = TestRequest()
+        notifier.subscribe(request, EventFilter())
+        ledger.add('t1', 'IntegerKeyTransaction')
+        ledger.add('t2', 'IntegerKeyTransaction')
+        clock.advance(0.1)
+        self.assertEquals(request.events(), [])
+
+        ledger.commit('b', ['t1'])
+        ledger.PendingTransactions.pop('t2')
+        index.update()
+        clock.advance(0.1)
+        self.assertEquals(request.events(),
+                          ['event: block-commit',
+                           'event: transaction-commit',
+                           'event: transaction-drop'])
+        self.assertIn('"TransactionID": "t2"', request.written[-1])
+
+    def test_waits_for_index(self):
+        ledger = TestLedger()
+        clock = task.Clock()
+        (notifier, index) = self._create_notifier(ledger, clock)
+
+        request = TestRequest()
+        notifier.subscribe(request, EventFilter())
+        ledger.add('t1', 'IntegerKeyTransaction')
+        clock.advance(0.1)
+
+        # the commit is not published, nor taken for a drop, before the
+        # index has seen the block
+        ledger.commit('b', ['t1'])
+        clock.advance(1.0)
+        self.assertEquals(request.events(), [])
+
+        index.update()
+        clock.advance(0.1)
+        self.assertEquals(request.events(),
+                          ['event: block-commit',
+                           'event: transaction-commit'])
+
+    def test_filters(self):
+        ledger = TestLedger()
+        clock = task.Clock()
+        (notifier, index) = self._create_notifier(ledger, clock)
+
+        by_id = TestRequest()
+        notifier.subscribe(by_id, EventFilter(txnids=['t2']))
+        by_store = TestRequest()
+        notifier.subscribe(by_store, EventFilter(stores=['OtherStore']))
+        ledger.add('t1', 'IntegerKeyTransaction')
+        ledger.add('t2', 'OtherStore')
+        clock.advance(0.1)
+
+        ledger.commit('b', ['t1', 't2'])
+        index.update()
+        clock.advance(0.1)
+        self.assertEquals(by_id.events(), ['event: transaction-commit'])
+        self.assertEquals(by_store.events(), ['event: block-commit',
+                                              'event: transaction-commit'])
+
+    def test_slow_subscriber(self):
+        ledger = TestLedger()
+        clock = task.Clock()
+        (notifier, index) = self._create_notifier(ledger, clock)
+
+        request = TestRequest()
+        notifier.subscribe(request, EventFilter())
+        request.producer.pauseProducing()
+
+        ledger.commit('b', ['t1', 't2'])
+        index.update()
+        clock.advance(0.1)
+        self.assertTrue(request.finished.called)
+        self.assertEquals(notifier.get_stats()['Subscribers'], 0)
+
+        # the check loop stops with the last subscriber
+        clock.advance(0.1)
+        self.assertFalse(clock.getDelayedCalls())
@@ -0,0 +1,102 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import task
+
+from txnserver.web_health import HealthMonitor
+
+
+class TestPool(object):
+    def __init__(self, name, queue_limit):
+        self.Name = name
+        self.QueueDepth = 0
+        self.Active = 0
+        self.QueueLimit = queue_limit
+
+    def get_stats(self):
+        return {'QueueDepth': self.QueueDepth, 'Active': self.Active,
+                'QueueLimit': self.QueueLimit}
+
+
+class TestReactorMonitor(object):
+    def __init__(self):
+        self.Lag = 0.0
+
+
+class TestHealthMonitor(unittest.TestCase):
+    def setUp(self):
+        self.clock = task.Clock()
+        self.calls = 0
+        self.pool = TestPool('WebApiRead', 4)
+        self.reactor_monitor = TestReactorMonitor()
+        self.monitor = HealthMonitor(self._status, [self.pool],
+                                     reactor_monitor=self.reactor_monitor,
+                                     interval=1.0, busy_lag=0.5,
+                                     clock=self.clock)
+
+    def _status(self):
+        self.calls += 1
+        if self.calls == 3:
+            raise ValueError('ledger unavailable')
+        return {'Status': 'started', 'Calls': self.calls}
+
+    def test_snapshot(self):
+        self.monitor.start()
+        self.assertEquals(self.monitor.get_status()['Calls'], 1)
+
+        # the snapshot only changes when it is refreshed
+        self.assertEquals(self.monitor.get_status()['Calls'], 1)
+        self.clock.advance(1.0)
+        self.assertEquals(self.monitor.get_status()['Calls'], 2)
+
+        # a failure keeps the previous snapshot
+        self.clock.advance(1.0)
+        status = self.monitor.get_status()
+        self.assertEquals(status['Calls'], 2)
+        self.assertEquals(status['Health']['Status'], 'ok')
+        self.monitor.stop()
+
+    def test_busy(self):
+        self.monitor.start()
+        self.pool.QueueDepth = 3
+        self.pool.Active = 1
+        self.clock.advance(1.0)
+
+        health = self.monitor.get_health()
+        self.assertEquals(health['Status'], 'busy')
+        self.assertEquals(health['Pools']['WebApiRead']['Saturation'], 1.0)
+        self.assertTrue(health['Pools']['WebApiRead']['Saturated'])
+        self.monitor.stop()
+
+    def test_reactor_lag(self):
+        self.monitor.refresh()
+        self.assertEquals(self.monitor.get_health()['Status'], 'ok')
+
+        # the lag is the one measured by the reactor monitor
+        self.reactor_monitor.Lag = 1.0
+        health = self.monitor.get_health()
+        self.assertEquals(health['ReactorLag'], 1.0)
+        self.assertEquals(health['Status'], 'busy')
+        self.assertEquals(health['SnapshotAge'], 0.0)
+        self.assertEquals(self.monitor.get_stats()['ReactorLag'], 1.0)
+
+    def test_no_reactor_monitor(self):
+        monitor = HealthMonitor(self._status, [self.pool], clock=self.clock)
+        monitor.refresh()
+        health = monitor.get_health()
+        self.assertIsNone(health['ReactorLag'])
+        self.assertEquals(health['Status'], 'ok')
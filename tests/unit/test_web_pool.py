@@ -0,0 +1,59 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from txnserver.web_pool import WorkerPool
+from txnserver.web_pool import create_worker_pools
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_saturation(self):
+        pool = WorkerPool('test', min_threads=1, max_threads=1,
+                          queue_limit=2)
+        results = []
+
+        # the pool is not started, so submitted work stays queued
+        pool.submit(results.append, 1)
+        self.assertFalse(pool.saturated())
+        pool.submit(results.append, 2)
+        self.assertTrue(pool.saturated())
+        pool.reject()
+
+        stats = pool.get_stats()
+        self.assertEquals(stats['QueueDepth'], 2)
+        self.assertEquals(stats['Rejected'], 1)
+
+        pool.ThreadPool.start()
+        pool.ThreadPool.stop()
+
+        self.assertEquals(results, [1, 2])
+        self.assertFalse(pool.saturated())
+
+        stats = pool.get_stats()
+        self.assertEquals(stats['QueueDepth'], 0)
+        self.assertEquals(stats['Active'], 0)
+        self.assertEquals(stats['Completed'], 2)
+
+        pool.reset_stats()
+        self.assertEquals(pool.get_stats()['Completed'], 0)
+
+    def test_create_worker_pools(self):
+        read_pool, write_pool = create_worker_pools(
+            {'ReadThreads': [3, 7], 'WriteQueueLimit': 5})
+
+        self.assertEquals(read_pool.get_stats()['MinThreads'], 3)
+        self.assertEquals(read_pool.get_stats()['MaxThreads'], 7)
+        self.assertEquals(write_pool.QueueLimit, 5)
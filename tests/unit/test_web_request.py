@@ -0,0 +1,119 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import address
+from twisted.test.proto_helpers import StringTransport
+from twisted.web.resource import Resource
+from twisted.web.server import Site
+
+from txnserver.web_request import ApiRequest
+from txnserver.web_request import BodyBuffer
+from txnserver.web_request import describe_body
+from txnserver.web_request import INITIAL_BODY_SIZE
+
+
+class EchoPage(Resource):
+    isLeaf = True
+
+    def render_POST(self, request):
+        return request.content.getvalue()
+
+
+class TestBodyBuffer(unittest.TestCase):
+    def test_preallocated(self):
+        body = BodyBuffer(6)
+        body.write('abc')
+        body.write('def')
+        self.assertEquals(len(body), 6)
+        self.assertEquals(body.getvalue(), 'abcdef')
+        self.assertEquals(body.view()[1:3].tobytes(), 'bc')
+
+    def test_bounded_allocation(self):
+        length = 4 * INITIAL_BODY_SIZE + 1
+        body = BodyBuffer(length)
+        # nothing beyond the initial size is allocated until data arrives
+        self.assertEquals(len(body._buffer), INITIAL_BODY_SIZE)
+
+        chunk = 'x' * (INITIAL_BODY_SIZE / 2)
+        for _ in range(8):
+            body.write(chunk)
+        body.write('y')
+        self.assertEquals(len(body), length)
+        self.assertEquals(len(body._buffer), length)
+        self.assertEquals(body.getvalue()[-2:], 'xy')
+
+    def test_growing(self):
+        body = BodyBuffer()
+        body.write('abc')
+        body.write('def')
+        self.assertEquals(body.getvalue(), 'abcdef')
+
+    def test_file_interface(self):
+        body = BodyBuffer(6)
+        body.write('abcdef')
+        body.seek(0, 0)
+        self.assertEquals(body.read(2), 'ab')
+        self.assertEquals(body.tell(), 2)
+        self.assertEquals(body.read(), 'cdef')
+        body.seek(-1, 2)
+        self.assertEquals(body.read(), 'f')
+
+
+class TestApiRequest(unittest.TestCase):
+    def _connect(self, maximum_body_size):
+        site = Site(EchoPage(), requestFactory=ApiRequest)
+        site.MaximumBodySize = maximum_body_size
+        channel = site.buildProtocol(
+            address.IPv4Address('TCP', '127.0.0.1', 8800))
+        transport = StringTransport(
+            peerAddress=address.IPv4Address('TCP', '127.0.0.1', 5000))
+        channel.makeConnection(transport)
+        return (channel, transport)
+
+    def test_within_limit(self):
+        (channel, transport) = self._connect(10)
+        channel.dataReceived('POST / HTTP/1.1\r\nHost: a\r\n'
+                             'Content-Length: 5\r\n\r\nhello')
+        self.assertIn('200 OK', transport.value())
+        self.assertTrue(transport.value().endswith('hello'))
+
+    def test_declared_too_large(self):
+        (channel, transport) = self._connect(10)
+        channel.dataReceived('POST / HTTP/1.1\r\nHost: a\r\n'
+                             'Content-Length: 11\r\n\r\n')
+        self.assertTrue(transport.value().startswith('HTTP/1.1 413'))
+        self.assertTrue(transport.disconnecting)
+
+        # the rest of the body is ignored
+        channel.dataReceived('hello world')
+        self.assertNotIn('200 OK', transport.value())
+
+    def test_chunked_too_large(self):
+        (channel, transport) = self._connect(10)
+        channel.dataReceived('POST / HTTP/1.1\r\nHost: a\r\n'
+                             'Transfer-Encoding: chunked\r\n\r\n'
+                             '6\r\nhello \r\n'
+                             '5\r\nworld\r\n0\r\n\r\n')
+        self.assertTrue(transport.value().startswith('HTTP/1.1 413'))
+        self.assertNotIn('200 OK', transport.value())
+
+
+class TestDescribeBody(unittest.TestCase):
+    def test_bounded(self):
+        description = describe_body('x' * 100000)
+        self.assertIn('100000 bytes', description)
+        self.assertLess(len(description), 120)
@@ -0,0 +1,83 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import unittest
+
+from twisted.internet import defer
+
+from txnserver.web_stats import HttpStats
+from txnserver.web_stats import LatencyHistogram
+
+
+class TestRequest(object):
+    def __init__(self, length):
+        self.code = 200
+        self.sentLength = 0
+        self.finished = defer.Deferred()
+        self.headers = {'Content-Length': str(length)}
+
+    def getHeader(self, name):
+        return self.headers.get(name)
+
+    def notifyFinish(self):
+        return self.finished
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.add(i / 1000.0)
+
+        stats = histogram.get_stats()
+        self.assertEquals(stats['Count'], 1000)
+        self.assertEquals(stats['Maximum'], 1.0)
+        self.assertAlmostEquals(stats['Average'], 0.5005)
+        for (key, value) in [('P50', 0.5), ('P90', 0.9), ('P99', 0.99)]:
+            self.assertGreaterEqual(stats[key], value)
+            self.assertLessEqual(stats[key], value * 1.07)
+
+    def test_empty(self):
+        stats = LatencyHistogram().get_stats()
+        self.assertEquals(stats['Count'], 0)
+        self.assertEquals(stats['P99'], 0.0)
+
+
+class TestHttpStats(unittest.TestCase):
+    def test_routes(self):
+        stats = HttpStats()
+
+        request = TestRequest(100)
+        timer = stats.start_request(request, 'POST /default')
+        timer.Queued = timer.Started
+        self.assertEquals(timer.run(lambda x: x * 2, 21), 42)
+        request.sentLength = 10
+        request.finished.callback(None)
+
+        request = TestRequest(0)
+        stats.start_request(request, 'GET /block')
+        request.code = 404
+        request.finished.callback(None)
+
+        result = stats.get_stats()
+        self.assertEquals(result['POST /default']['Requests'], 1)
+        self.assertEquals(result['POST /default']['BytesIn'], 100)
+        self.assertEquals(result['POST /default']['BytesOut'], 10)
+        self.assertEquals(result['POST /default']['HandlerTime']['Count'], 1)
+        self.assertEquals(result['GET /block']['Errors'], 1)
+        self.assertEquals(result['GET /block']['QueueWait']['Count'], 0)
+
+        stats.reset_stats()
+        self.assertEquals(stats.get_stats(), {})
@@ -0,0 +1,77 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+import json
+import unittest
+
+import cbor
+
+from txnserver.web_stream import get_page
+from txnserver.web_stream import ListStream
+from txnserver.web_stream import StoreStream
+
+
+class TestWebStream(unittest.TestCase):
+    def setUp(self):
+        self.store = dict(('key{0:02d}'.format(i), i) for i in range(25))
+        self.keys = sorted(self.store.keys())
+
+    def test_get_page(self):
+        page = get_page(self.store, self.keys, 10)
+        self.assertEquals(len(page['Store']), 10)
+        self.assertEquals(page['Next'], 'key09')
+
+        page = get_page(self.store, self.keys, 10, page['Next'])
+        self.assertEquals(sorted(page['Store'].keys())[0], 'key10')
+
+        page = get_page(self.store, self.keys, 10, 'key19')
+        self.assertEquals(len(page['Store']), 5)
+        self.assertNotIn('Next', page)
+
+        page = get_page(self.store, self.keys, 10, 'key99')
+        self.assertEquals(page['Store'], {})
+        self.assertNotIn('Next', page)
+
+    def test_stream_json(self):
+        stream = StoreStream(self.store, self.keys, chunk_size=7)
+        chunks = list(stream.chunks(False))
+        self.assertEquals(len(chunks), 6)
+        self.assertEquals(json.loads(''.join(chunks)), self.store)
+
+    def test_stream_cbor(self):
+        stream = StoreStream(self.store, self.keys, chunk_size=7)
+        self.assertEquals(cbor.loads(''.join(stream.chunks(True))),
+                          self.store)
+
+    def test_stream_empty(self):
+        stream = StoreStream({}, [])
+        self.assertEquals(json.loads(''.join(stream.chunks(False))), {})
+        self.assertEquals(cbor.loads(''.join(stream.chunks(True))), {})
+
+    def test_list_stream(self):
+        items = [{'BlockNum': i} for i in range(25)]
+        stream = ListStream(iter(items), chunk_size=7)
+        chunks = list(stream.chunks(False))
+        self.assertEquals(len(chunks), 6)
+        self.assertEquals(json.loads(''.join(chunks)), items)
+
+        stream = ListStream(iter(items), chunk_size=7)
+        self.assertEquals(cbor.loads(''.join(stream.chunks(True))), items)
+
+    def test_list_stream_empty(self):
+        self.assertEquals(json.loads(''.join(ListStream([]).chunks(False))),
+                          [])
+        self.assertEquals(cbor.loads(''.join(ListStream([]).chunks(True))),
+                          [])
@@ -112,7 +112,20 @@ class IntegerKeyCommunication(object):
         else:
             return content
 
-    def postmsg(self, msgtype, info):
+    def get_transaction_status(self, txnids, wait=0):
+        """
+        Retrieve the status of a list of transactions with a single request.
+        If wait is non-zero the validator holds the request for up to wait
+        seconds until one of the transactions changes state.
+
+        Returns a dictionary that maps each transaction id to a dictionary
+        with its 'Status' and, if it is committed, 'InBlock'.
+        """
+        return self.postmsg('/transaction/status',
+                            {'TransactionIDs': txnids, 'Wait': wait},
+                            timeout=wait + 10)
+
+    def postmsg(self, msgtype, info, timeout=10):
         """
         Post a transaction message to the validator, parse the returning CBOR
         and return the corresponding dictionary.
@@ -130,7 +143,7 @@ class IntegerKeyCommunication(object):
                                       {'Content-Type': 'application/cbor',
                                        'Content-Length': datalen})
             opener = urllib2.build_opener(self.ProxyHandler)
-            response = opener.open(request, timeout=10)
+            response = opener.open(request, timeout=timeout)
 
         except urllib2.HTTPError as err:
             logger.warn('operation failed with response: %s', err.code)
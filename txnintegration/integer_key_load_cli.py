@@ -15,17 +15,19 @@
 
 import random
 import time
-from twisted.web import http
 
 from txnintegration.utils import generate_private_key
 from txnintegration.utils import Progress
 from txnintegration.utils import TimeOut
 from txnintegration.integer_key_client import IntegerKeyClient
+from txnintegration.integer_key_communication import IntegerKeyCommunication
 from txnintegration.integer_key_state import IntegerKeyState
 
 import argparse
 import sys
 
+from journal import transaction
+
 
 class IntKeyLoadTest(object):
     def __init__(self):
@@ -33,28 +35,29 @@ class IntKeyLoadTest(object):
         self.localState = {}
         self.transactions = []
         self.clients = []
+        self.status_clients = []
         self.state = None
 
     def _get_client(self):
         return self.clients[random.randint(0, len(self.clients) - 1)]
 
-    def _update_uncommitted_transactions(self):
-        remaining = []
+    def _update_uncommitted_transactions(self, batch_size=1000):
+        remaining = set()
 
         # For each client, we want to verify that its corresponding validator
         # has the transaction.  For a transaction to be considered committed,
         # all validators must have it in its blockchain as a committed
-        # transaction.
-        for c in self.clients:
-            for t in self.transactions:
-                status = c.get_transaction_status(t)
-                # If the transaction has not been committed and we don't
-                # already have it in our list of uncommitted transactions
-                # then add it.
-                if (status != http.OK) and (t not in remaining):
-                    remaining.append(t)
-
-        self.transactions = remaining
+        # transaction. The statuses are fetched in batches rather than with
+        # a request per transaction.
+        for c in self.status_clients:
+            for i in range(0, len(self.transactions), batch_size):
+                batch = self.transactions[i:i + batch_size]
+                statuses = c.get_transaction_status(batch)
+                for t, status in statuses.iteritems():
+                    if status['Status'] != transaction.Status.committed:
+                        remaining.add(t)
+
+        self.transactions = [t for t in self.transactions if t in remaining]
         return len(self.transactions)
 
     def _wait_for_transaction_commits(self):
@@ -97,12 +100,14 @@ class IntKeyLoadTest(object):
         self.localState = {}
         self.transactions = []
         self.clients = []
+        self.status_clients = []
         self.state = IntegerKeyState(urls[0])
 
         with Progress("Creating clients") as p:
             for u in urls:
                 key = generate_private_key()
                 self.clients.append(IntegerKeyClient(u, keystring=key))
+                self.status_clients.append(IntegerKeyCommunication(u))
                 p.step()
 
         print "Checking for pre-existing state"
@@ -14,6 +14,7 @@
 # ------------------------------------------------------------------------------
 
 import logging
+import urllib
 
 from txnintegration.integer_key_communication import IntegerKeyCommunication
 
@@ -27,15 +28,27 @@ class IntegerKeyState(IntegerKeyCommunication):
         self.CreatorID = creator
         self.State = {}
 
-    def fetch(self, store='IntegerKeyTransaction'):
+    def fetch(self, store='IntegerKeyTransaction', page_size=1000):
         """
         Retrieve the current state from the validator. Rebuild
         the name, type, and id maps for the resulting objects.
 
         :param str store: optional, the name of the marketplace store to
             retrieve
+        :param int page_size: optional, the number of keys to retrieve
+            per request
         """
 
         logger.debug('fetch state from %s/%s/*', self.BaseURL, store)
 
-        self.State = self.getmsg("/store/{0}/*".format(store))
+        path = "/store/{0}/*?limit={1}".format(store, page_size)
+        page = self.getmsg(path)
+        state = page['Store']
+
+        # read the remaining pages from the same block as the first one
+        while 'Next' in page:
+            page = self.getmsg("{0}&blockid={1}&after={2}".format(
+                path, page['BlockID'], urllib.quote(page['Next'])))
+            state.update(page['Store'])
+
+        self.State = state
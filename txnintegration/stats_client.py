@@ -18,6 +18,7 @@ import collections
 import json
 import sys
 import time
+import urllib
 
 from twisted.internet import task
 from twisted.internet import reactor
@@ -456,10 +457,11 @@ class StatsManager(object):
 
 
 class EndpointManager(object):
-    def __init__(self):
+    def __init__(self, page_size=1000):
         self.error_count = 0
         self.no_endpoint_responders = False
         self.endpoint_urls = []
+        self.page_size = page_size
         self.vc = ValidatorCommunications()
 
     def initialize_endpoint_urls(self, url, init_cb):
@@ -467,9 +469,40 @@ class EndpointManager(object):
         self.endpoint_completion_cb = init_cb
         path = url + "/store/{0}/*".format('EndpointRegistryTransaction')
         self.init_path = path
+        self._request_endpoints(url, self._init_terminate)
+
+    def _request_endpoints(self, url, ecb):
+        # validators with an endpoint index return all the endpoints in one
+        # request; the registry of older ones is read one page at a time,
+        # each page request is issued from the completion of the previous
+        # one
+        self.endpoint_base_url = url
+        self.endpoint_error_cb = ecb
+        self.endpoints = {}
+        self.vc.get_request(url + "/endpoints",
+                            self._endpoint_index_completion,
+                            self._request_endpoint_page)
+
+    def _endpoint_index_completion(self, results):
+        self.endpoint_urls_completion(
+            dict((ep['NodeIdentifier'], ep) for ep in results))
+
+    def _request_endpoint_page(self, blockid=None, after=None):
+        path = self.endpoint_base_url + "/store/{0}/*?limit={1}".format(
+            'EndpointRegistryTransaction', self.page_size)
+        if after is not None:
+            path += "&blockid={0}&after={1}".format(blockid,
+                                                    urllib.quote(after))
         self.vc.get_request(path,
-                            self.endpoint_urls_completion,
-                            self._init_terminate)
+                            self._endpoint_page_completion,
+                            self.endpoint_error_cb)
+
+    def _endpoint_page_completion(self, results):
+        self.endpoints.update(results['Store'])
+        if 'Next' in results:
+            self._request_endpoint_page(results['BlockID'], results['Next'])
+        else:
+            self.endpoint_urls_completion(self.endpoints)
 
     def endpoint_urls_completion(self, results):
         # response has been received
@@ -486,20 +519,14 @@ class EndpointManager(object):
         self.endpoint_completion_cb = update_cb
         self.contact_list = list(self.endpoint_urls)
         url = self.contact_list.pop()
-        path = url + "/store/{0}/*".format('EndpointRegistryTransaction')
-        self.vc.get_request(path,
-                            self.endpoint_urls_completion,
-                            self._update_endpoint_continue)
+        self._request_endpoints(url, self._update_endpoint_continue)
 
     def _update_endpoint_continue(self):
         # update response not received, try another url
         # if all urls have been tried, set "no update" flag and be done
         if len(self.contact_list) > 0:
             url = self.contact_list.pop()
-            path = url + "/store/{0}/*".format('EndpointRegistryTransaction')
-            self.vc.get_request(path,
-                                self.endpoint_urls_completion,
-                                self._update_endpoint_continue)
+            self._request_endpoints(url, self._update_endpoint_continue)
         else:
             self.no_endpoint_responders = True
 
@@ -333,7 +333,7 @@ class StatsCollector(object):
 
         for stat in self.statslist:
             statname = type(stat).__name__
-            p_stats[statname] = self.cpu_stats._asdict()
+            p_stats[statname] = stat._asdict()
 
         return p_stats
 
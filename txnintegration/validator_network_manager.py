@@ -45,7 +45,7 @@ defaultValidatorConfig = {u'CertificateSampleLength': 5,
                           u'TransactionFamilies': [
                               u'ledger.transaction.integer_key'],
                           u'UseFixedDelay': True,
-                          u'Profile': True,
+                          u'Profile': u'sampling',
                           u'Listen': [u'localhost:0/UDP gossip']}
 
 
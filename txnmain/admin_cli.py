@@ -21,6 +21,7 @@ import os
 import re
 import socket
 import sys
+import urllib2
 import logging.config
 
 from gossip.common import pretty_print_dict
@@ -67,6 +68,7 @@ class ClientController(cmd.Cmd):
         cmd.Cmd.__init__(self)
         self.prompt = 'client> '
         self.CurrentState = {}
+        self.BaseURL = baseurl.rstrip('/')
         self.LedgerWebClient = LedgerWebClient(baseurl)
 
         signingkey = generate_signing_key(
@@ -91,6 +93,20 @@ class ClientController(cmd.Cmd):
         except MessageException as me:
             print me
 
+    def get_json(self, path, data=None):
+        """
+        Send a request to the web api of the validator, a POST if there
+        is data, and return the decoded JSON response.
+        """
+        headers = {'Content-Type': 'application/json'}
+        request = urllib2.Request(url=self.BaseURL + path, headers=headers)
+        response = urllib2.urlopen(
+            request, data=None if data is None else json.dumps(data))
+        try:
+            return json.loads(response.read())
+        finally:
+            response.close()
+
     # =================================================================
     # COMMANDS
     # =================================================================
@@ -377,6 +393,62 @@ class ClientController(cmd.Cmd):
 
         self.sign_and_post(journal_debug.DumpJournalValueMessage(tinfo))
 
+    def do_profile(self, args):
+        """
+        profile -- Command to turn the sampling profiler of the validator
+            on or off, or show its state; the validator must be local
+            profile [on|off]
+        """
+
+        pargs = args.split()
+        cmd = {'action': 'profile'}
+        if pargs:
+            if pargs[0] not in ('on', 'off'):
+                print 'unknown profile command {0}'.format(args)
+                return
+            cmd['state'] = pargs[0]
+
+        try:
+            result = self.get_json('/command', cmd)
+        except (urllib2.URLError, ValueError) as e:
+            print 'an error occured processing {0}: {1}'.format(args, str(e))
+            return
+
+        print pretty_print_dict(result.get('profiler', result))
+
+    def do_memory(self, args):
+        """
+        memory -- Command to report the memory use of the validator; the
+            validator must be local
+            memory [--snapshot] [--limit <count>] [--trace on|off]
+        """
+
+        parser = argparse.ArgumentParser()
+        parser.add_argument('--snapshot', action='store_true',
+                            help='report later differences relative to '
+                                 'this report')
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument('--trace', choices=['on', 'off'],
+                            help='start or stop tracing allocations')
+        try:
+            options = parser.parse_args(args.split())
+        except SystemExit:
+            return
+
+        query = ['limit={0}'.format(options.limit)]
+        if options.snapshot:
+            query.append('snapshot=1')
+        if options.trace:
+            query.append('trace={0}'.format(options.trace))
+
+        try:
+            result = self.get_json('/debug/memory?' + '&'.join(query))
+        except (urllib2.URLError, ValueError) as e:
+            print 'an error occured processing {0}: {1}'.format(args, str(e))
+            return
+
+        print pretty_print_dict(result)
+
     def do_shutdown(self, args):
         """
         shutdown -- Command to send a shutdown message to the validator pool
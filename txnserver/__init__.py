@@ -14,4 +14,9 @@
 # ------------------------------------------------------------------------------
 
 __all__ = ['config', 'log_setup', 'lottery_validator', 'web_api', 'validator',
-           'quorum_validator']
+           'quorum_validator', 'chain_index', 'endpoint_index',
+           'speculative_head', 'web_cache', 'memory_debug', 'metrics',
+           'peer_discovery', 'rate_limit', 'reactor_monitor', 'resolver',
+           'sampling_profiler', 'txn_status', 'web_encoding', 'verify_pool',
+           'web_events', 'web_health', 'web_pool', 'web_request', 'web_stats',
+           'web_stream']
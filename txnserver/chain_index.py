@@ -0,0 +1,279 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements an index of the committed chain for the web api
+"""
+
+import logging
+import threading
+import time
+
+from twisted.internet import reactor
+from twisted.internet import task
+from twisted.internet import threads
+
+logger = logging.getLogger(__name__)
+
+# the fields of the block headers kept by the index, in the order they are
+# stored
+HEADER_FIELDS = ['Identifier', 'BlockNum', 'PreviousBlockID',
+                 'TransactionCount', 'CommitTime']
+
+
+class ChainIndex(object):
+    """
+    An append-only index of the committed blocks, oldest first, of a
+    compact header for each of them and of the identifiers of the
+    transactions they contain.
+
+    The index follows the ledger lazily: whenever the most recently
+    committed block changes, the new blocks are walked back from the head
+    to the newest block already in the index. Blocks after that common
+    ancestor were rolled back by a fork switch and are truncated before
+    the new blocks are appended, so an update costs O(changed blocks).
+
+    Once started, the index also follows the ledger on its own: the head
+    is compared on the reactor every interval seconds and, when it has
+    changed, the update and its listeners run in the reactor thread pool,
+    so walking the chain never happens on the reactor.
+    """
+
+    def __init__(self, ledger, interval=0.25, clock=reactor,
+                 run_in_thread=threads.deferToThread):
+        self.Ledger = ledger
+        self.Interval = interval
+
+        self._lock = threading.RLock()
+        self._head = None
+        self._listeners = []
+
+        self._clock = clock
+        self._run_in_thread = run_in_thread
+        self._loop = None
+        self._updating = False
+
+        self._block_ids = []
+        self._headers = []
+        self._positions = {}
+        self._txn_offsets = []
+        self._txn_ids = []
+
+    def add_listener(self, listener):
+        """
+        Register a function called as listener(rolled_back, committed) with
+        the lists of block ids (oldest first) removed from and added to the
+        chain by each update.
+        """
+        self._listeners.append(listener)
+
+    def start(self):
+        """
+        Follow the ledger from the reactor, starting with an update that
+        builds the index.
+        """
+        self._loop = task.LoopingCall(self._check)
+        self._loop.clock = self._clock
+        self._loop.start(self.Interval, now=True)
+
+    def stop(self):
+        if self._loop is not None and self._loop.running:
+            self._loop.stop()
+        self._loop = None
+
+    def _check(self):
+        # reading the head attributes needs no lock; at most one update is
+        # in flight, a change that arrives during it is seen by the next
+        # check
+        if self._updating or \
+                self.Ledger.MostRecentCommittedBlockID == self._head:
+            return
+
+        self._updating = True
+        d = self._run_in_thread(self.update)
+        d.addErrback(lambda failure: logger.error(
+            'unable to update chain index; %s', failure.getTraceback()))
+        d.addBoth(self._updated)
+
+    def _updated(self, _):
+        self._updating = False
+
+    def update(self):
+        """
+        Bring the index up to date with the ledger.
+        """
+        with self._lock:
+            head = self.Ledger.MostRecentCommittedBlockID
+            if head == self._head:
+                return
+
+            committed = []
+            blkid = head
+            while blkid not in self._positions and \
+                    blkid in self.Ledger.BlockStore:
+                committed.append(blkid)
+                blkid = self.Ledger.BlockStore[blkid].PreviousBlockID
+            committed.reverse()
+
+            keep = 0
+            if blkid in self._positions:
+                keep = self._positions[blkid] + 1
+
+            rolled_back = self._truncate(keep)
+            for blkid in committed:
+                self._append(blkid)
+
+            self._head = head
+
+            if rolled_back:
+                logger.info('chain index rolled back %s blocks',
+                            len(rolled_back))
+
+            for listener in self._listeners:
+                listener(rolled_back, committed)
+
+    def _truncate(self, count):
+        rolled_back = self._block_ids[count:]
+        for blkid in rolled_back:
+            del self._positions[blkid]
+
+        if count < len(self._block_ids):
+            del self._txn_ids[self._txn_offsets[count]:]
+        del self._block_ids[count:]
+        del self._headers[count:]
+        del self._txn_offsets[count:]
+
+        return rolled_back
+
+    def _append(self, blkid):
+        block = self.Ledger.BlockStore[blkid]
+        height = len(self._block_ids)
+
+        # blocks committed before the validator started do not record when
+        # that happened, the time the index learned of them stands in
+        commit_time = getattr(block, 'CommitTime', None) or time.time()
+
+        self._positions[blkid] = height
+        self._block_ids.append(blkid)
+        self._headers.append((blkid, height, block.PreviousBlockID,
+                              len(block.TransactionIDs), commit_time))
+        self._txn_offsets.append(len(self._txn_ids))
+        self._txn_ids.extend(block.TransactionIDs)
+
+    @property
+    def head(self):
+        """
+        The id of the newest block in the index, which trails the ledger
+        until the next update.
+        """
+        return self._head
+
+    @property
+    def height(self):
+        """
+        The number of committed blocks.
+        """
+        with self._lock:
+            self.update()
+            return len(self._block_ids)
+
+    def get_block_height(self, blkid):
+        """
+        Returns:
+            int: the position of a committed block in the chain, counting
+                from 0 for the genesis block, or None if the block is not
+                committed
+        """
+        with self._lock:
+            self.update()
+            return self._positions.get(blkid)
+
+    def get_block_ids(self, count=0):
+        """
+        Returns:
+            list: the ids of the count (all if 0) most recently committed
+                blocks, newest first
+        """
+        with self._lock:
+            self.update()
+            block_ids = self._block_ids[-count:] if count else self._block_ids
+            return list(reversed(block_ids))
+
+    def iter_headers(self, start=0, end=None, fields=None):
+        """
+        Generate the headers of committed blocks, oldest first. The range
+        is taken from the index when the generator is created, later
+        updates do not affect it.
+
+        Args:
+            start (int): the height of the first block
+            end (int): the height of the last block, the head if None
+            fields (list): the header fields to include, all if None
+
+        Returns:
+            generator: a dictionary for each block
+
+        Raises:
+            ValueError: if one of the fields is not a header field
+        """
+        indices = [HEADER_FIELDS.index(f) for f in fields or HEADER_FIELDS]
+        names = [HEADER_FIELDS[i] for i in indices]
+
+        with self._lock:
+            self.update()
+            stop = None if end is None else max(end + 1, 0)
+            headers = self._headers[max(start, 0):stop]
+
+        return (dict(zip(names, [header[i] for i in indices]))
+                for header in headers)
+
+    def get_headers(self, start=0, end=None, fields=None):
+        """
+        Returns:
+            list: the headers of committed blocks, see iter_headers
+        """
+        return list(self.iter_headers(start, end, fields))
+
+    def get_transaction_ids(self, offset=0, limit=None, since_block=0):
+        """
+        Return committed transaction ids, oldest first.
+
+        Args:
+            offset (int): the number of transactions to skip
+            limit (int): the maximum number of ids to return
+            since_block (int): only return transactions committed in the
+                block with this height or later
+
+        Returns:
+            list: the transaction ids
+        """
+        with self._lock:
+            self.update()
+            start = offset
+            if 0 < since_block < len(self._txn_offsets):
+                start += self._txn_offsets[since_block]
+            elif since_block >= len(self._txn_offsets):
+                return []
+
+            end = None if limit is None else start + limit
+            return self._txn_ids[start:end]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'HeadBlockID': self._head,
+                'Blocks': len(self._block_ids),
+                'Transactions': len(self._txn_ids)
+            }
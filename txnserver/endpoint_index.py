@@ -0,0 +1,156 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements an index of the endpoint registry by domain for the
+web api
+"""
+
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT_STORE = '/EndpointRegistryTransaction'
+
+# the fields of the registry entries returned by endpoint queries
+ENDPOINT_FIELDS = ['NodeIdentifier', 'Name', 'Host', 'Port', 'HttpPort']
+
+
+class EndpointIndex(object):
+    """
+    An index of the committed endpoint registry sorted by Domain, so the
+    endpoints of a domain and its subdomains are found with a binary search
+    for the domain prefix instead of a scan of the whole registry.
+
+    The index follows the chain index: the entries of the nodes named by
+    the endpoint registry transactions of newly committed blocks are read
+    again from the state of the head block. The index is rebuilt from that
+    state when blocks are rolled back by a fork switch.
+    """
+
+    def __init__(self, ledger, chain_index):
+        self.Ledger = ledger
+        self.ChainIndex = chain_index
+        self.ChainIndex.add_listener(self._on_chain_update)
+
+        self._lock = threading.Lock()
+        self._built = False
+        self._keys = []
+        self._entries = {}
+
+        self._rebuilds = 0
+        self._updates = 0
+
+    def _get_store(self, blkid):
+        storemap = self.Ledger.GlobalStoreMap.get_block_store(blkid)
+        if not storemap or ENDPOINT_STORE not in storemap.TransactionStores:
+            return None
+        return storemap.get_transaction_store(ENDPOINT_STORE)
+
+    def _on_chain_update(self, rolled_back, committed):
+        with self._lock:
+            if rolled_back:
+                self._built = False
+            if not self._built or not committed:
+                return
+
+            identifiers = set()
+            for blkid in committed:
+                for txnid in self.Ledger.BlockStore[blkid].TransactionIDs:
+                    txn = self.Ledger.TransactionStore[txnid]
+                    if txn.TransactionTypeName != ENDPOINT_STORE:
+                        continue
+                    identifier = getattr(getattr(txn, 'Update', None),
+                                         'NodeIdentifier', None)
+                    if identifier is None:
+                        # the node cannot be told, read the whole registry
+                        self._built = False
+                        return
+                    identifiers.add(identifier)
+
+            if not identifiers:
+                return
+
+            store = self._get_store(committed[-1])
+            for identifier in identifiers:
+                self._remove(identifier)
+                if store is not None and identifier in store:
+                    self._add(identifier, store[identifier])
+            self._updates += 1
+
+    def _rebuild(self):
+        self._keys = []
+        self._entries = {}
+
+        store = self._get_store(self.Ledger.MostRecentCommittedBlockID)
+        if store is not None:
+            for identifier in store.keys():
+                self._add(identifier, store[identifier])
+            self._keys.sort()
+
+        self._built = True
+        self._rebuilds += 1
+        logger.debug('endpoint index rebuilt with %s entries',
+                     len(self._entries))
+
+    def _add(self, identifier, info):
+        domain = info.get('Domain', '/')
+        record = dict((f, info.get(f)) for f in ENDPOINT_FIELDS)
+        record['NodeIdentifier'] = identifier
+
+        self._entries[identifier] = (domain, record)
+        if self._built:
+            bisect.insort(self._keys, (domain, identifier))
+        else:
+            self._keys.append((domain, identifier))
+
+    def _remove(self, identifier):
+        entry = self._entries.pop(identifier, None)
+        if entry is None:
+            return
+        position = bisect.bisect_left(self._keys, (entry[0], identifier))
+        del self._keys[position]
+
+    def get_endpoints(self, domain='/'):
+        """
+        Return the committed endpoints whose Domain starts with domain.
+
+        Returns:
+            list: a record with the ENDPOINT_FIELDS of each endpoint
+        """
+        # bring the chain index, and with it this index, up to date first
+        self.ChainIndex.update()
+
+        with self._lock:
+            if not self._built:
+                self._rebuild()
+
+            result = []
+            position = bisect.bisect_left(self._keys, (domain,))
+            for (key, identifier) in self._keys[position:]:
+                if not key.startswith(domain):
+                    break
+                result.append(dict(self._entries[identifier][1]))
+            return result
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'Endpoints': len(self._entries),
+                'Rebuilds': self._rebuilds,
+                'Updates': self._updates
+            }
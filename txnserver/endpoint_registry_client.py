@@ -13,26 +13,88 @@
 # limitations under the License.
 # ------------------------------------------------------------------------------
 
+import logging
+import socket
+import urllib
+import urllib2
+
+from gossip.common import json2dict
 from ledger.transaction import endpoint_registry
 from sawtooth.client import LedgerWebClient
+from sawtooth.exceptions import MessageException
+
+logger = logging.getLogger(__name__)
 
 
 class EndpointRegistryClient(LedgerWebClient):
-    def __init__(self, url):
+    def __init__(self, url, timeout=30):
         super(EndpointRegistryClient, self).__init__(url)
+        self.Timeout = timeout
+        self.ProxyHandler = urllib2.ProxyHandler({})
 
     def get_endpoint_list(self, domain='/'):
-        endpoints = []
+        """
+        Return the endpoints registered in domain. They are read from the
+        endpoint index of the validator, or with a single dump of the
+        endpoint registry from validators without one.
+
+        Raises:
+            MessageException: if the validator cannot be reached or does
+                not answer within Timeout seconds
+        """
+        eplist = self._get_endpoint_index(domain)
+        if eplist is not None:
+            return eplist
 
-        eplist = self.get_store(
-            endpoint_registry.EndpointRegistryTransaction)
+        url = self.store_url(endpoint_registry.EndpointRegistryTransaction,
+                             key='*')
+        if domain != '/':
+            url += '{0}domain={1}'.format('&' if '?' in url else '?',
+                                          urllib.quote(domain, safe=''))
+
+        eplist = self._geturl(url, timeout=self.Timeout)
         if not eplist:
-            return endpoints
+            return []
+
+        # validators that predate the domain filter return every endpoint
+        return [epinfo for epinfo in eplist.itervalues()
+                if epinfo.get('Domain', '/').startswith(domain)]
+
+    def _get_endpoint_index(self, domain):
+        """
+        Returns:
+            list: the endpoints in domain from the endpoint index, or None
+                if the validator has no endpoint index
+        """
+        url = '{0}/endpoints?domain={1}'.format(
+            self.LedgerURL.rstrip('/'), urllib.quote(domain, safe=''))
+
+        try:
+            request = urllib2.Request(url)
+            opener = urllib2.build_opener(self.ProxyHandler)
+            response = opener.open(request, timeout=self.Timeout)
+
+        except urllib2.HTTPError as err:
+            # validators without the index refuse the unknown request, any
+            # other status is a failure of the validator
+            if err.code in (400, 404):
+                logger.debug('no endpoint index at %s, reading the '
+                             'registry; %s', self.LedgerURL, err.code)
+                return None
+            raise MessageException(
+                'operation failed with response: {0}'.format(err.code))
+
+        except urllib2.URLError as err:
+            raise MessageException('operation failed: {0}'.format(err.reason))
+
+        except (socket.timeout, socket.error) as err:
+            raise MessageException('operation failed: {0}'.format(err))
 
-        for ep in eplist:
-            epinfo = self.get_store(
-                endpoint_registry.EndpointRegistryTransaction, ep)
-            if epinfo.get('Domain', '/').startswith(domain):
-                endpoints.append(epinfo)
+        try:
+            content = response.read()
+        except (socket.timeout, socket.error) as err:
+            raise MessageException('operation failed: {0}'.format(err))
+        finally:
+            response.close()
 
-        return endpoints
+        return json2dict(content)
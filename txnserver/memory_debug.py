@@ -0,0 +1,165 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the memory reports served under /debug/memory
+"""
+
+import gc
+import logging
+import threading
+import time
+import types
+
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc is not part of python 2, it is available from the
+# pytracemalloc backport on a patched interpreter
+tracemalloc_imported = True
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc_imported = False
+
+# the packages whose objects are reported separately as ledger objects
+LEDGER_PACKAGES = ('gossip', 'journal', 'ledger', 'sawtooth', 'txnserver')
+
+
+def count_objects():
+    """
+    Count the objects tracked by the garbage collector by type.
+
+    Returns:
+        Counter: maps qualified type names to counts
+    """
+    counts = Counter()
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls is types.InstanceType:
+            # an instance of an old style class
+            cls = obj.__class__
+        counts['{0}.{1}'.format(cls.__module__, cls.__name__)] += 1
+    return counts
+
+
+class MemoryInspector(object):
+    """
+    Reports where the memory of the validator goes: the sizes of the
+    ledger collections, object counts by type and, if tracemalloc is
+    available and tracing, the source lines that allocated the most
+    memory. Counts are compared with the snapshot taken by the previous
+    report that asked for one, so growth can be attributed over time.
+
+    Nothing is measured until a report is requested; walking the objects
+    is expensive though, so reports should not be requested frequently.
+    """
+
+    def __init__(self, collections):
+        """
+        Args:
+            collections (dict): maps names to functions that return the
+                size of a collection, such as the transaction store
+        """
+        self.Collections = collections
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_time = None
+        self._trace_snapshot = None
+
+    def set_tracing(self, enabled, frames=1):
+        """
+        Start or stop tracing allocations with tracemalloc.
+
+        Returns:
+            bool: False if tracemalloc is not available
+        """
+        if not tracemalloc_imported:
+            return False
+
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._trace_snapshot = None
+        return True
+
+    def report(self, limit=25, snapshot=False):
+        """
+        Build a memory report.
+
+        Args:
+            limit (int): the number of types and allocators to list
+            snapshot (bool): keep the counts of this report as the
+                baseline for the diffs of later reports
+
+        Returns:
+            dict: the report
+        """
+        with self._lock:
+            result = {'Collections': self._get_collection_sizes()}
+
+            counts = count_objects()
+            ledger = Counter(dict(
+                (name, count) for (name, count) in counts.iteritems()
+                if name.split('.', 1)[0] in LEDGER_PACKAGES))
+            result['Objects'] = dict(counts.most_common(limit))
+            result['LedgerObjects'] = dict(ledger.most_common(limit))
+            result['TotalObjects'] = sum(counts.itervalues())
+
+            if self._snapshot is not None:
+                growth = Counter(counts)
+                growth.subtract(self._snapshot)
+                changed = [(name, delta) for (name, delta)
+                           in growth.iteritems() if delta]
+                changed.sort(key=lambda item: -abs(item[1]))
+                result['Diff'] = {
+                    'Since': self._snapshot_time,
+                    'Objects': dict(changed[:limit])
+                }
+
+            result['Tracing'] = tracemalloc_imported and \
+                tracemalloc.is_tracing()
+            if result['Tracing']:
+                result['Allocators'] = self._get_allocators(limit, snapshot)
+
+            if snapshot:
+                self._snapshot = counts
+                self._snapshot_time = time.time()
+
+            return result
+
+    def _get_collection_sizes(self):
+        sizes = {}
+        for (name, size) in self.Collections.iteritems():
+            try:
+                sizes[name] = size()
+            except:
+                logger.info('unable to get the size of %s', name,
+                            exc_info=True)
+        return sizes
+
+    def _get_allocators(self, limit, snapshot):
+        current = tracemalloc.take_snapshot()
+        if self._trace_snapshot is not None:
+            stats = current.compare_to(self._trace_snapshot, 'lineno')
+        else:
+            stats = current.statistics('lineno')
+        if snapshot:
+            self._trace_snapshot = current
+
+        return [str(stat) for stat in stats[:limit]]
@@ -0,0 +1,141 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module renders validator statistics in the OpenMetrics (Prometheus)
+text exposition format
+"""
+
+import re
+import threading
+import time
+
+from collections import OrderedDict
+
+OPENMETRICS_CONTENT_TYPE = \
+    'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsRegistry(object):
+    """
+    A registry of statistics sources that are rendered as metrics. Each
+    source is a function returning a (possibly nested) dictionary of
+    statistics, the same dictionaries served under /statistics. Numeric
+    values become samples named after the path of keys leading to them;
+    the names are computed once and remembered, and the rendered text is
+    reused for max_age seconds, so frequent scrapes stay cheap.
+    """
+
+    def __init__(self, max_age=1.0):
+        self.MaxAge = max_age
+
+        self._lock = threading.Lock()
+        self._sources = []
+        self._names = {}
+        self._rendered = {}
+
+    def register(self, prefix, source, label=None):
+        """
+        Add a source of metrics.
+
+        Args:
+            prefix (str): the prefix of the names of the metrics
+            source (function): returns the dictionary of statistics
+            label (str): if given, the keys of the top level of the
+                dictionary are the values of this label rather than part
+                of the metric names
+        """
+        self._sources.append((prefix, source, label))
+
+    def render(self, openmetrics=True):
+        """
+        Returns:
+            str: the current metrics in the OpenMetrics format, or in the
+                Prometheus text format if openmetrics is False
+        """
+        with self._lock:
+            now = time.time()
+            (rendered, expires) = self._rendered.get(openmetrics, (None, 0))
+            if rendered is not None and now < expires:
+                return rendered
+
+            rendered = self._render(openmetrics)
+            self._rendered[openmetrics] = (rendered, now + self.MaxAge)
+            return rendered
+
+    def _render(self, openmetrics):
+        families = OrderedDict()
+        for (prefix, source, label) in self._sources:
+            stats = source()
+            if label is None:
+                self._collect(families, (prefix,), stats, '')
+                continue
+
+            for (key, value) in stats.iteritems():
+                labels = '{{{0}="{1}"}}'.format(label, _escape(key))
+                self._collect(families, (prefix,), value, labels)
+
+        lines = []
+        for (name, samples) in families.iteritems():
+            lines.append('# TYPE {0} {1}'.format(
+                name, 'unknown' if openmetrics else 'untyped'))
+            for (labels, value) in samples:
+                lines.append('{0}{1} {2}'.format(name, labels, value))
+
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def _collect(self, families, path, stats, labels):
+        if isinstance(stats, dict):
+            for (key, value) in stats.iteritems():
+                self._collect(families, path + (key,), value, labels)
+            return
+
+        if isinstance(stats, bool):
+            stats = int(stats)
+        elif not isinstance(stats, (int, long, float)):
+            return
+
+        name = self._names.get(path)
+        if name is None:
+            name = '_'.join(_metric_name(p) for p in path)
+            self._names[path] = name
+
+        families.setdefault(name, []).append((labels, _format_value(stats)))
+
+
+def _metric_name(key):
+    """
+    Convert a statistics key, usually CamelCase, to a metric name.
+    """
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', str(key))
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name).lower()
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value != value:
+            return 'NaN'
+        if value in (float('inf'), float('-inf')):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"') \
+        .replace('\n', r'\n')
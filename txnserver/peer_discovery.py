@@ -0,0 +1,239 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the discovery of candidate peers from the endpoint
+registries of the validators listed in LedgerURL
+"""
+
+import logging
+
+from collections import OrderedDict
+
+from twisted.internet import defer
+from twisted.internet import reactor
+
+from txnserver.web_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+class PeerDiscovery(object):
+    """
+    Queries the endpoint registries of all the configured urls at once,
+    each in a thread of a small pool of its own, so neither a slow nor a
+    dead url blocks the reactor or the threads it shares with other
+    work. A discovery round finishes as soon as quorum urls have returned
+    endpoints, or once every url has answered, failed or timed out. The
+    fetch is given the same timeout, so a thread is not held by a dead url
+    for longer than that. The nodes returned by the urls are merged by
+    name and cached for ttl seconds.
+    """
+
+    def __init__(self, urls, fetch, quorum=1, timeout=10.0, ttl=30.0,
+                 threads=4, clock=reactor, run_in_thread=None):
+        """
+        Args:
+            urls (list): the urls to query
+            fetch (function): called as fetch(url, timeout) in a thread,
+                returns the nodes in the endpoint registry of url
+            threads (int): the maximum number of threads of the pool
+            run_in_thread (function): runs a function in a thread and
+                returns a Deferred, by default in the pool of the discovery
+        """
+        self.URLs = list(urls)
+        self.Fetch = fetch
+        self.Quorum = max(min(quorum, len(self.URLs)), 1)
+        self.Timeout = timeout
+        self.TTL = ttl
+
+        self._clock = clock
+        self._pool = None
+        if run_in_thread is None:
+            self._pool = WorkerPool('PeerDiscovery', min_threads=0,
+                                    max_threads=max(threads, 1),
+                                    queue_limit=len(self.URLs))
+            self._pool.start()
+            run_in_thread = self._pool.submit
+        self._run_in_thread = run_in_thread
+
+        self._nodes = []
+        self._discovered = None
+        self._round = None
+
+        self._rounds = 0
+        self._failures = 0
+        self._timeouts = 0
+        self._last_duration = None
+
+    @property
+    def nodes(self):
+        """
+        The nodes found by the most recent discovery round.
+        """
+        return list(self._nodes)
+
+    def refresh(self):
+        """
+        Start a discovery round unless the cached nodes are still fresh or
+        a round is already in progress.
+
+        Returns:
+            Deferred: fires with the list of nodes when the round finishes
+        """
+        if not self.URLs:
+            return defer.succeed([])
+
+        if self._discovered is not None and \
+                self._clock.seconds() - self._discovered < self.TTL:
+            return defer.succeed(self.nodes)
+
+        if self._round is None:
+            self._round = _DiscoveryRound(self)
+            self._round.start()
+
+        return self._round.wait()
+
+    def _finished(self, discovery_round):
+        self._round = None
+        self._nodes = discovery_round.Nodes.values()
+        self._discovered = self._clock.seconds()
+        self._rounds += 1
+        self._last_duration = self._discovered - discovery_round.Started
+
+        logger.info('discovered %s endpoints from %s of %s urls in %.3f '
+                    'seconds', len(self._nodes), discovery_round.Responses,
+                    len(self.URLs), self._last_duration)
+
+    def get_stats(self):
+        return {
+            'URLs': len(self.URLs),
+            'Nodes': len(self._nodes),
+            'Rounds': self._rounds,
+            'Failures': self._failures,
+            'Timeouts': self._timeouts,
+            'LastDuration': self._last_duration
+        }
+
+
+class _DiscoveryRound(object):
+    def __init__(self, discovery):
+        self.Discovery = discovery
+        self.Nodes = OrderedDict()
+        self.Responses = 0
+        self.Started = None
+
+        self._outstanding = {}
+        self._waiters = []
+        self._done = False
+
+    def start(self):
+        self.Started = self.Discovery._clock.seconds()
+        for url in self.Discovery.URLs:
+            logger.info('attempting to load peers using url %s', url)
+            timer = self.Discovery._clock.callLater(
+                self.Discovery.Timeout, self._timed_out, url)
+            self._outstanding[url] = timer
+
+            d = self.Discovery._run_in_thread(self.Discovery.Fetch, url,
+                                              self.Discovery.Timeout)
+            d.addCallbacks(self._succeeded, self._failed,
+                           callbackArgs=(url,), errbackArgs=(url,))
+
+    def wait(self):
+        d = defer.Deferred()
+        if self._done:
+            d.callback(self.Nodes.values())
+        else:
+            self._waiters.append(d)
+        return d
+
+    def _resolve(self, url):
+        """
+        Returns:
+            bool: True if url was still outstanding
+        """
+        timer = self._outstanding.pop(url, None)
+        if timer is None:
+            return False
+        if timer.active():
+            timer.cancel()
+        return True
+
+    def _succeeded(self, nodes, url):
+        if not self._resolve(url) or self._done:
+            return
+
+        # an empty registry does not count towards the quorum
+        if nodes:
+            self.Responses += 1
+            for node in nodes:
+                self.Nodes.setdefault(node.Name, node)
+        self._check_done()
+
+    def _failed(self, failure, url):
+        if not self._resolve(url) or self._done:
+            return
+
+        self.Discovery._failures += 1
+        logger.error('unable to get endpoints from LedgerURL %s: %s', url,
+                     failure.getErrorMessage())
+        self._check_done()
+
+    def _timed_out(self, url):
+        if self._outstanding.pop(url, None) is None or self._done:
+            return
+
+        self.Discovery._timeouts += 1
+        logger.warn('timed out getting endpoints from LedgerURL %s', url)
+        self._check_done()
+
+    def _check_done(self):
+        if self.Responses < self.Discovery.Quorum and self._outstanding:
+            return
+
+        self._done = True
+        for timer in self._outstanding.values():
+            if timer.active():
+                timer.cancel()
+        self._outstanding = {}
+
+        self.Discovery._finished(self)
+        (waiters, self._waiters) = (self._waiters, [])
+        for d in waiters:
+            d.callback(self.Nodes.values())
+
+
+def create_peer_discovery(config, fetch):
+    """
+    Create the peer discovery for the LedgerURL of the validator
+    configuration, for example:
+
+        "LedgerURL" : ["http://host1:8800", "http://host2:8800"],
+        "DiscoveryQuorum" : 1,
+        "DiscoveryTimeout" : 10,
+        "DiscoveryCacheTTL" : 30,
+        "DiscoveryThreads" : 4
+    """
+    # continue to support existing config files with single string values
+    urls = config.get('LedgerURL', [])
+    if isinstance(urls, basestring):
+        urls = [urls]
+
+    return PeerDiscovery(urls, fetch,
+                         quorum=config.get('DiscoveryQuorum', 1),
+                         timeout=config.get('DiscoveryTimeout', 10.0),
+                         ttl=config.get('DiscoveryCacheTTL', 30.0),
+                         threads=config.get('DiscoveryThreads', 4))
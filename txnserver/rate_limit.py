@@ -0,0 +1,260 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements admission control and rate limiting for messages
+submitted through the web api
+"""
+
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from twisted.web import http
+
+logger = logging.getLogger(__name__)
+
+TOO_MANY_REQUESTS = 429
+
+
+class RateLimited(Exception):
+    """
+    Raised when a submission is refused. Status is the http response code
+    and RetryAfter the number of seconds after which the client may try
+    again.
+    """
+
+    def __init__(self, status, retry_after, message):
+        super(RateLimited, self).__init__(message)
+        self.Status = status
+        self.RetryAfter = retry_after
+
+
+class TokenBucket(object):
+    """
+    A token bucket along the lines of gossip.token_bucket.TokenBucket,
+    except that it starts full and reports how long a refused caller has
+    to wait. A request for more tokens than the capacity is granted when
+    the bucket is full and leaves it in debt. The owner serializes access.
+    """
+
+    def __init__(self, rate, capacity):
+        self.DripRate = float(rate)
+        self.Capacity = float(capacity)
+        self.Tokens = float(capacity)
+        self.LastDrip = time.time()
+
+    def drip(self, now):
+        if now <= self.LastDrip:
+            return
+        self.Tokens = min(self.Capacity,
+                          self.Tokens + (now - self.LastDrip) * self.DripRate)
+        self.LastDrip = now
+
+    def consume(self, amount, now):
+        """
+        Take amount tokens from the bucket if it holds enough.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of
+                seconds until the bucket will hold enough
+        """
+        self.drip(now)
+        if amount <= self.Tokens or self.Tokens >= self.Capacity:
+            self.Tokens -= amount
+            return 0.0
+
+        return (min(amount, self.Capacity) - self.Tokens) / self.DripRate
+
+
+class RateLimiter(object):
+    """
+    Token buckets keyed by client address or signer. The least recently
+    used buckets are forgotten once there are more than max_keys of them.
+    A rate of 0 disables the limit; the burst defaults to two seconds
+    worth of the rate.
+    """
+
+    def __init__(self, rate, burst=None, max_keys=10000):
+        self.Rate = rate
+        self.Burst = burst or max(2 * rate, 1)
+        self.MaxKeys = max_keys
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def check(self, key, amount=1):
+        """
+        Returns:
+            float: 0 if key may submit amount more messages, otherwise the
+                number of seconds it has to wait
+        """
+        if not self.Rate:
+            return 0.0
+
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                bucket = TokenBucket(self.Rate, self.Burst)
+            self._buckets[key] = bucket
+
+            while len(self._buckets) > self.MaxKeys:
+                self._buckets.popitem(last=False)
+
+            return bucket.consume(amount, now)
+
+
+class AdmissionControl(object):
+    """
+    Decides whether submitted messages are admitted for validation: per
+    client address and per signer token bucket rate limits, plus a cap on
+    the number of validations in progress at once. A validation that finds
+    the cap reached waits for up to timeout seconds for a slot.
+    """
+
+    def __init__(self, client_rate=0, client_burst=None, signer_rate=0,
+                 signer_burst=None, max_in_flight=3, timeout=0.5):
+        self.ClientLimiter = RateLimiter(client_rate, client_burst)
+        self.SignerLimiter = RateLimiter(signer_rate, signer_burst)
+        self.MaxInFlight = max_in_flight
+        self.Timeout = timeout
+
+        self._lock = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self.reset_stats()
+
+    def admit_client(self, address, count=1):
+        """
+        Charge count messages to a client address. Raises RateLimited if
+        the client is over its rate.
+        """
+        wait = self.ClientLimiter.check(address, count)
+        if wait:
+            self._reject('ClientRate')
+            raise RateLimited(TOO_MANY_REQUESTS, wait,
+                              'client {0} exceeded its submission '
+                              'rate'.format(address))
+
+    def admit_signer(self, signer, count=1):
+        """
+        Charge count messages to a signer. Raises RateLimited if the signer
+        is over its rate.
+        """
+        wait = self.SignerLimiter.check(signer, count)
+        if wait:
+            self._reject('SignerRate')
+            raise RateLimited(TOO_MANY_REQUESTS, wait,
+                              'signer {0} exceeded its submission '
+                              'rate'.format(signer))
+
+    @contextmanager
+    def validation(self):
+        """
+        Hold one of the validation slots for the duration of the block.
+        Raises RateLimited if no slot frees up within the timeout.
+        """
+        with self._lock:
+            if self._in_flight >= self.MaxInFlight:
+                self._queued += 1
+                self._waiting += 1
+                deadline = time.time() + self.Timeout
+                while self._in_flight >= self.MaxInFlight:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._lock.wait(remaining)
+                self._waiting -= 1
+
+            if self._in_flight >= self.MaxInFlight:
+                self._rejected['InFlight'] += 1
+                raise RateLimited(http.SERVICE_UNAVAILABLE, self.Timeout,
+                                  'too many validations in progress')
+
+            self._in_flight += 1
+            self._admitted += 1
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._lock.notify()
+
+    def _reject(self, reason):
+        with self._lock:
+            self._rejected[reason] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'Admitted': self._admitted,
+                'Rejected': dict(self._rejected),
+                'Queued': self._queued,
+                'InFlight': self._in_flight,
+                'Waiting': self._waiting,
+                'MaxInFlight': self.MaxInFlight
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._admitted = 0
+            self._queued = 0
+            self._rejected = {'ClientRate': 0, 'SignerRate': 0,
+                              'InFlight': 0}
+
+
+def create_admission_control(config, write_threads=4):
+    """
+    Create the admission control for message submissions from the WebApi
+    section of the validator configuration, for example:
+
+        "WebApi" : {
+            "ClientRate" : 100,
+            "ClientBurst" : 200,
+            "SignerRate" : 50,
+            "SignerBurst" : 100,
+            "MaxInFlightValidations" : 3,
+            "AdmissionTimeout" : 0.5
+        }
+
+    Rates are in messages per second; a rate of 0, the default, disables
+    the limit. Bursts default to twice the rate.
+
+    Validations run on the threads of the write pool, so no more than
+    write_threads of them are ever in progress and a larger cap would
+    never apply; it is reduced to write_threads. By default the cap
+    leaves one write thread free for the other POST requests, such as
+    status polls and commands, while submissions queue for validation.
+    """
+    max_in_flight = config.get('MaxInFlightValidations',
+                               max(write_threads - 1, 1))
+    if max_in_flight > write_threads:
+        logger.warn('MaxInFlightValidations of %s exceeds the %s write '
+                    'threads, using %s', max_in_flight, write_threads,
+                    write_threads)
+        max_in_flight = write_threads
+
+    return AdmissionControl(
+        client_rate=config.get('ClientRate', 0),
+        client_burst=config.get('ClientBurst'),
+        signer_rate=config.get('SignerRate', 0),
+        signer_burst=config.get('SignerBurst'),
+        max_in_flight=max_in_flight,
+        timeout=config.get('AdmissionTimeout', 0.5))
@@ -0,0 +1,175 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements a monitor of the lag of the reactor event loop that
+reports callbacks blocking it
+"""
+
+import logging
+import sys
+import threading
+import traceback
+
+from twisted.internet import reactor
+from twisted.internet import task
+
+from txnserver.web_stats import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class ReactorMonitor(object):
+    """
+    Measures the lag of the reactor loop with a timer that runs every
+    interval seconds: the lag is how late the timer fires. A watchdog
+    thread notices when the timer has not run for more than threshold
+    seconds beyond its interval, which means a callback is blocking the
+    reactor, and logs the stack of the reactor thread at that moment so
+    the offending callback can be found. Each stall is logged once. With a
+    threshold of 0 only the lag is measured, there is no watchdog.
+    """
+
+    def __init__(self, interval=0.1, threshold=0.5, clock=reactor):
+        self.Interval = interval
+        self.Threshold = threshold
+
+        self._clock = clock
+        self._loop = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+        self._reactor_thread = None
+
+        # the lag measured by the most recent timer
+        self.Lag = 0.0
+
+        self._lock = threading.Lock()
+        self._expected = None
+        self._heartbeat = None
+        self._stalled = None
+        self.reset_stats()
+
+    def start(self):
+        """
+        Start monitoring, this must be called on the reactor thread.
+        """
+        self._reactor_thread = threading.current_thread().ident
+        self._heartbeat = self._clock.seconds()
+
+        self._loop = task.LoopingCall(self._tick)
+        self._loop.clock = self._clock
+        self._loop.start(self.Interval, now=True)
+
+        if not self.Threshold:
+            return
+
+        self._stopped.clear()
+        self._watchdog = threading.Thread(target=self._watch,
+                                          name='ReactorMonitor')
+        self._watchdog.daemon = True
+        self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._watchdog is not None:
+            self._watchdog.join(1.0)
+            self._watchdog = None
+
+        if self._loop is not None and self._loop.running:
+            self._loop.stop()
+        self._loop = None
+
+    def _tick(self):
+        now = self._clock.seconds()
+        lag = 0.0
+        if self._expected is not None:
+            lag = max(now - self._expected, 0.0)
+        self._expected = now + self.Interval
+        self.Lag = lag
+
+        with self._lock:
+            self._lag.add(lag)
+            self._heartbeat = now
+            stalled = self._stalled
+            self._stalled = None
+
+        if stalled is not None:
+            logger.warn('reactor resumed after being blocked for %.3f '
+                        'seconds', now - stalled)
+
+    def _watch(self):
+        while not self._stopped.wait(self.Threshold / 2.0):
+            self.check(self._clock.seconds())
+
+    def check(self, now):
+        """
+        Log the stack of the reactor thread if the reactor has been
+        blocked for longer than the threshold. Called from the watchdog
+        thread.
+
+        Returns:
+            bool: True if a new stall was detected
+        """
+        with self._lock:
+            if self._heartbeat is None or self._stalled is not None:
+                return False
+
+            blocked = now - self._heartbeat - self.Interval
+            if blocked < self.Threshold:
+                return False
+
+            self._stalled = self._heartbeat + self.Interval
+            self._slow_callbacks += 1
+
+        frame = sys._current_frames().get(self._reactor_thread)
+        if frame is None:
+            stack = 'stack unavailable\n'
+        else:
+            stack = ''.join(traceback.format_stack(frame))
+
+        logger.warn('reactor blocked for more than %.3f seconds; reactor '
+                    'thread stack:\n%s', blocked, stack)
+        return True
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'Lag': self._lag.get_stats(),
+                'SlowCallbacks': self._slow_callbacks,
+                'Blocked': self._stalled is not None,
+                'Threshold': self.Threshold
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._lag = LatencyHistogram()
+            self._slow_callbacks = 0
+
+
+def create_reactor_monitor(config):
+    """
+    Create the reactor monitor from the ReactorMonitor section of the
+    validator configuration, for example:
+
+        "ReactorMonitor" : {
+            "Interval" : 0.1,
+            "Threshold" : 0.5
+        }
+
+    A Threshold of 0 disables the watchdog, the lag is still measured for
+    the health reports of the web api.
+    """
+    return ReactorMonitor(config.get('Interval', 0.1),
+                          config.get('Threshold', 0.5))
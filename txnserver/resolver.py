@@ -0,0 +1,231 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements a caching resolver of the host names of nodes
+"""
+
+import logging
+import socket
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from twisted.internet import defer
+from twisted.internet import reactor
+from twisted.internet.abstract import isIPAddress
+from twisted.internet.error import DNSLookupError
+
+logger = logging.getLogger(__name__)
+
+
+class Resolver(object):
+    """
+    Resolves host names to IPv4 addresses and caches the answers for ttl
+    seconds. Failed lookups are cached as well, for negative_ttl seconds,
+    so an unresolvable peer does not cost a lookup every time it is seen.
+
+    There are three ways in:
+        resolve -- for the reactor thread, returns a Deferred and looks up
+            names with the resolver of the reactor, which does not block it
+        resolve_all -- for startup, looks up many names in parallel threads
+            and blocks until they are all answered
+        gethostbyname -- for other threads, blocks like the function of the
+            socket module
+    """
+
+    def __init__(self, ttl=300.0, negative_ttl=30.0, clock=reactor,
+                 resolve=None, lookup=socket.gethostbyname):
+        """
+        Args:
+            resolve (function): looks up a name without blocking and returns
+                a Deferred, the resolve method of the reactor by default
+            lookup (function): looks up a name, blocking
+        """
+        self.TTL = ttl
+        self.NegativeTTL = negative_ttl
+
+        self._clock = clock
+        self._resolve = resolve or reactor.resolve
+        self._lookup = lookup
+
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._pending = {}
+
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._failures = 0
+
+    def _get_cached(self, host):
+        """
+        Returns:
+            tuple: whether the host is cached and its address, None if the
+                cached lookup failed
+        """
+        with self._lock:
+            entry = self._cache.get(host)
+            if entry is None or entry[1] <= self._clock.seconds():
+                self._misses += 1
+                return (False, None)
+
+            if entry[0] is None:
+                self._negative_hits += 1
+            else:
+                self._hits += 1
+            return (True, entry[0])
+
+    def _set_cached(self, host, address):
+        with self._lock:
+            if address is None:
+                self._failures += 1
+                expires = self._clock.seconds() + self.NegativeTTL
+            else:
+                expires = self._clock.seconds() + self.TTL
+            self._cache[host] = (address, expires)
+
+    def gethostbyname(self, host):
+        """
+        Look up a host name, blocking.
+
+        Raises:
+            socket.gaierror: if the host name cannot be resolved
+        """
+        if isIPAddress(host):
+            return host
+
+        (cached, address) = self._get_cached(host)
+        if cached:
+            if address is None:
+                raise socket.gaierror(
+                    socket.EAI_NONAME,
+                    'unable to resolve {0} (cached)'.format(host))
+            return address
+
+        try:
+            address = self._lookup(host)
+        except socket.error:
+            self._set_cached(host, None)
+            raise
+
+        self._set_cached(host, address)
+        return address
+
+    def resolve(self, host):
+        """
+        Look up a host name without blocking, on the reactor thread.
+        Concurrent requests for the same name share one lookup.
+
+        Returns:
+            Deferred: fires with the address, or fails with DNSLookupError
+        """
+        if isIPAddress(host):
+            return defer.succeed(host)
+
+        (cached, address) = self._get_cached(host)
+        if cached:
+            if address is None:
+                return defer.fail(DNSLookupError(
+                    'unable to resolve {0} (cached)'.format(host)))
+            return defer.succeed(address)
+
+        d = defer.Deferred()
+        if host in self._pending:
+            self._pending[host].append(d)
+            return d
+
+        self._pending[host] = [d]
+        self._resolve(host).addCallbacks(
+            self._resolved, self._resolve_failed,
+            callbackArgs=(host,), errbackArgs=(host,))
+        return d
+
+    def _resolved(self, address, host):
+        self._set_cached(host, address)
+        for d in self._pending.pop(host, []):
+            d.callback(address)
+
+    def _resolve_failed(self, failure, host):
+        logger.info('unable to resolve %s; %s', host,
+                    failure.getErrorMessage())
+        self._set_cached(host, None)
+        for d in self._pending.pop(host, []):
+            d.errback(failure)
+
+    def resolve_many(self, hosts):
+        """
+        Look up host names concurrently without blocking.
+
+        Returns:
+            Deferred: fires with a dictionary that maps each host name to
+                its address, or None if it could not be resolved
+        """
+        hosts = list(set(hosts))
+        lookups = [self.resolve(host).addErrback(lambda failure: None)
+                   for host in hosts]
+        return defer.gatherResults(lookups).addCallback(
+            lambda addresses: dict(zip(hosts, addresses)))
+
+    def resolve_all(self, hosts, threads=16):
+        """
+        Look up host names in parallel threads, blocking until all of them
+        are answered. Meant for startup, before the reactor runs.
+
+        Returns:
+            dict: maps each host name to its address, or None if it could
+                not be resolved
+        """
+        hosts = list(set(hosts))
+        if not hosts:
+            return {}
+
+        def lookup(host):
+            try:
+                return self.gethostbyname(host)
+            except socket.error as e:
+                logger.warn('unable to resolve %s; %s', host, e)
+                return None
+
+        pool = ThreadPool(min(threads, len(hosts)))
+        try:
+            return dict(zip(hosts, pool.map(lookup, hosts)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'Entries': len(self._cache),
+                'Hits': self._hits,
+                'NegativeHits': self._negative_hits,
+                'Misses': self._misses,
+                'Failures': self._failures
+            }
+
+
+def create_resolver(config):
+    """
+    Create the resolver from the Resolver section of the validator
+    configuration, for example:
+
+        "Resolver" : {
+            "TTL" : 300,
+            "NegativeTTL" : 30
+        }
+    """
+    return Resolver(ttl=config.get('TTL', 300.0),
+                    negative_ttl=config.get('NegativeTTL', 30.0))
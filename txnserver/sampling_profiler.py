@@ -0,0 +1,186 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements a statistical profiler that samples the stacks of
+all the threads of the validator
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+def collapse_stack(frame, thread_name):
+    """
+    Format a stack in the collapsed format of flamegraph.pl: the thread
+    name followed by the frames from the outermost in, separated by
+    semicolons.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        names.append('{0}:{1}'.format(module, code.co_name))
+        frame = frame.f_back
+
+    names.append(thread_name.replace(' ', '_'))
+    names.reverse()
+    return ';'.join(names)
+
+
+class SamplingProfiler(object):
+    """
+    A profiler that records the stacks of all threads every interval
+    seconds from a background thread. Unlike cProfile it does not hook
+    every function call, so it can be left running on a loaded validator
+    and turned on and off at runtime.
+
+    Every flush_interval seconds, and when the profiler is stopped, the
+    counts of the sampled stacks are written to a new file in directory
+    in the collapsed stack format, ready for flamegraph.pl.
+    """
+
+    def __init__(self, directory, name, interval=0.01, flush_interval=60.0):
+        self.Directory = directory
+        self.Name = name
+        self.Interval = interval
+        self.FlushInterval = flush_interval
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._counts = Counter()
+
+        self._samples = 0
+        self._files = []
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        logger.info('starting sampling profiler, writing to %s',
+                    self.Directory)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='SamplingProfiler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and write the samples collected since the last
+        flush.
+        """
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        logger.info('stopped sampling profiler')
+
+    def _run(self):
+        next_flush = time.time() + self.FlushInterval
+        while not self._stopped.wait(self.Interval):
+            self.sample()
+            if time.time() >= next_flush:
+                self.flush()
+                next_flush = time.time() + self.FlushInterval
+
+        self.flush()
+
+    def sample(self):
+        """
+        Record the current stack of every thread but the calling one.
+        """
+        me = threading.current_thread().ident
+        names = dict((t.ident, t.name) for t in threading.enumerate())
+
+        stacks = []
+        for (ident, frame) in sys._current_frames().iteritems():
+            if ident == me:
+                continue
+            stacks.append(collapse_stack(
+                frame, names.get(ident, 'thread-{0}'.format(ident))))
+
+        with self._lock:
+            self._counts.update(stacks)
+            self._samples += 1
+
+    def flush(self):
+        """
+        Write the stacks sampled since the last flush to a new file.
+
+        Returns:
+            str: the name of the file, or None if there was nothing to
+                write
+        """
+        with self._lock:
+            (counts, self._counts) = (self._counts, Counter())
+        if not counts:
+            return None
+
+        filename = os.path.join(
+            self.Directory, '{0}-{1}-{2}.collapsed'.format(
+                self.Name, time.strftime('%Y%m%d-%H%M%S'), len(self._files)))
+        try:
+            with open(filename, 'w') as f:
+                for (stack, count) in sorted(counts.iteritems()):
+                    f.write('{0} {1}\n'.format(stack, count))
+        except IOError as e:
+            logger.warn('unable to write profile %s; %s', filename, e)
+            return None
+
+        with self._lock:
+            self._files.append(filename)
+        return filename
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'Running': self.running,
+                'Samples': self._samples,
+                'Files': len(self._files),
+                'LastFile': self._files[-1] if self._files else None
+            }
+
+
+def create_sampling_profiler(config):
+    """
+    Create the sampling profiler from the validator configuration. The
+    samples are written to the DataDirectory, for example:
+
+        "SamplingProfiler" : {
+            "Interval" : 0.01,
+            "FlushInterval" : 60
+        }
+    """
+    profiler_config = config.get('SamplingProfiler', {})
+    return SamplingProfiler(
+        config.get('DataDirectory', '/tmp'),
+        config.get('NodeName', str(os.getpid())),
+        interval=profiler_config.get('Interval', 0.01),
+        flush_interval=profiler_config.get('FlushInterval', 60.0))
@@ -0,0 +1,214 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module maintains the speculative ledger state used to pre-validate
+transactions submitted through the web api.
+"""
+
+import copy
+import itertools
+import logging
+import threading
+
+from journal import global_store_manager
+
+logger = logging.getLogger(__name__)
+
+# transactions accepted through the web api are replayed on rebuilds of
+# the overlay for this many generations; one that has not reached the
+# ledger by then was lost and is dropped
+SUBMITTED_GENERATIONS = 2
+
+
+class SpeculativeHead(object):
+    """
+    A BlockStore overlay on top of the most recently committed block with
+    every locally pending transaction, and every transaction accepted
+    through the web api, applied to it.
+
+    The overlay is only rebuilt when the committed head changes or the
+    pending transactions no longer extend the ones already applied, that
+    is when one of them was dropped. Otherwise transactions that became
+    pending since the last request are applied incrementally, so checking
+    a submitted transaction costs a single check_valid regardless of the
+    size of the pending backlog.
+    """
+
+    def __init__(self, ledger):
+        self.Ledger = ledger
+
+        self._lock = threading.RLock()
+        self._block_id = None
+        self._store_map = None
+        self._pending_count = 0
+        self._pending_last = None
+        self._applied = set()
+
+        # transactions accepted through the web api that have not yet
+        # shown up in the ledger, mapped to the rebuild generation in
+        # which they were submitted
+        self._submitted = {}
+        self._generation = 0
+
+    def check_valid(self, txn):
+        """
+        Check the validity of a transaction against the speculative state.
+        Exceptions raised by the transaction family validity check are
+        propagated to the caller.
+
+        Args:
+            txn: the transaction to check; it is not modified
+
+        Returns:
+            bool: False if there is no speculative store for the
+                transaction family, True if the transaction is valid
+        """
+        with self._lock:
+            self._refresh()
+            store = self._get_transaction_store(txn.TransactionTypeName)
+            if store is None:
+                return False
+
+            txn.check_valid(store)
+            return True
+
+    def apply(self, txn):
+        """
+        Apply a transaction that was accepted through the web api so that
+        subsequent submissions are validated against it.
+        """
+        with self._lock:
+            self._refresh()
+            self._submitted[txn.Identifier] = (txn, self._generation)
+            self._apply(txn)
+
+    def invalidate(self):
+        """
+        Force the overlay to be rebuilt on the next request.
+        """
+        with self._lock:
+            self._block_id = None
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'HeadBlockID': self._block_id,
+                'Generation': self._generation,
+                'AppliedTransactions': len(self._applied),
+                'SubmittedTransactions': len(self._submitted)
+            }
+
+    def _refresh(self):
+        block_id = self.Ledger.MostRecentCommittedBlockID
+        pending = self.Ledger.PendingTransactions
+
+        if block_id != self._block_id:
+            self._rebuild(block_id)
+
+        try:
+            txn_ids = self._get_pending_tail(pending)
+            if txn_ids is None:
+                self._rebuild(block_id)
+                txn_ids = list(pending)
+            self._apply_pending(txn_ids)
+        except RuntimeError:
+            # the pending list changed underneath us, start over on
+            # the next request rather than risk a partial replay
+            logger.debug('pending transactions changed during refresh')
+            self._block_id = None
+
+    def _get_pending_tail(self, pending):
+        """
+        Return the ids of the transactions that became pending since the
+        last refresh, or None if the pending transactions no longer extend
+        the ones applied.
+        """
+        count = len(pending)
+        if count < self._pending_count:
+            return None
+        if self._pending_count == 0:
+            return list(pending)
+
+        # pending transactions are kept in arrival order, so the last one
+        # applied must still be found just before the new ones; if one was
+        # dropped, whatever took its place shifted it
+        txn_ids = list(itertools.islice(reversed(pending),
+                                        count - self._pending_count + 1))
+        txn_ids.reverse()
+        if txn_ids[0] != self._pending_last:
+            return None
+        return txn_ids[1:]
+
+    def _rebuild(self, block_id):
+        self._generation += 1
+        self._block_id = block_id
+        self._pending_count = 0
+        self._pending_last = None
+        self._applied = set()
+        self._store_map = None
+
+        real_store_map = self.Ledger.GlobalStoreMap.get_block_store(block_id)
+        if real_store_map is None:
+            logger.info('no store map for block %s', block_id)
+            return
+
+        self._store_map = global_store_manager.BlockStore(real_store_map)
+
+        # replay transactions that were accepted through the web api but
+        # that have not reached the ledger yet; anything the ledger knows
+        # about is either pending (and replayed below) or finished
+        submitted = self._submitted
+        self._submitted = {}
+        for txn_id, (txn, generation) in submitted.iteritems():
+            if txn_id in self.Ledger.TransactionStore:
+                continue
+            if self._generation - generation > SUBMITTED_GENERATIONS:
+                continue
+            self._submitted[txn_id] = (txn, generation)
+            self._apply(txn)
+
+        logger.debug('rebuilt speculative state on block %s', block_id)
+
+    def _apply_pending(self, txn_ids):
+        for txn_id in txn_ids:
+            self._submitted.pop(txn_id, None)
+            if txn_id in self._applied:
+                continue
+            if txn_id not in self.Ledger.TransactionStore:
+                continue
+            self._apply(self.Ledger.TransactionStore[txn_id])
+
+        if txn_ids:
+            self._pending_count += len(txn_ids)
+            self._pending_last = txn_ids[-1]
+
+    def _apply(self, txn):
+        self._applied.add(txn.Identifier)
+
+        store = self._get_transaction_store(txn.TransactionTypeName)
+        if store is None:
+            return
+
+        if txn.is_valid(store):
+            mytxn = copy.copy(txn)
+            mytxn.apply(store)
+
+    def _get_transaction_store(self, txn_type):
+        if self._store_map is None:
+            return None
+        if txn_type not in self._store_map.TransactionStores:
+            return None
+        return self._store_map.get_transaction_store(txn_type)
@@ -0,0 +1,162 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements bulk and long polling transaction status queries
+for the web api
+"""
+
+import logging
+
+from twisted.internet import defer
+from twisted.internet import reactor
+from twisted.internet import task
+
+from journal import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def get_transaction_status(ledger, txnids):
+    """
+    Look up the status of a list of transactions in one pass over the
+    transaction store.
+
+    Returns:
+        dict: maps each transaction id to a dictionary with the 'Status'
+            of the transaction and, once it is committed, the 'InBlock'
+            that contains it
+    """
+    store = ledger.TransactionStore
+
+    result = {}
+    for txnid in txnids:
+        if txnid not in store:
+            result[txnid] = {'Status': transaction.Status.unknown}
+            continue
+
+        txn = store[txnid]
+        if txn.Status == transaction.Status.committed:
+            result[txnid] = {'Status': txn.Status, 'InBlock': txn.InBlock}
+        else:
+            result[txnid] = {'Status': txn.Status}
+
+    return result
+
+
+class StatusPoll(object):
+    """
+    A status request that waits for any of its transactions to change
+    state, relative to the statuses the client already knows.
+    """
+
+    def __init__(self, txnids, statuses, timeout, cbor_encoding):
+        self.TransactionIDs = txnids
+        self.Statuses = statuses
+        self.Timeout = timeout
+        self.CBOR = cbor_encoding
+
+    def changed(self, statuses):
+        for txnid in self.TransactionIDs:
+            if statuses[txnid] != self.Statuses.get(txnid):
+                return True
+        return False
+
+
+class StatusWatcher(object):
+    """
+    Completes long polling status requests. The outstanding requests are
+    checked on the reactor at a fixed interval, but only when the ledger
+    head or the set of pending transactions appears to have changed, so
+    idle clients cost nothing more than the timer.
+    """
+
+    def __init__(self, ledger, interval=0.25, clock=reactor):
+        self.Ledger = ledger
+        self.Interval = interval
+        self.Clock = clock
+
+        self._polls = {}
+        self._signature = None
+        self._ticks = 0
+        self._loop = task.LoopingCall(self._check)
+        self._loop.clock = clock
+
+    def watch(self, poll):
+        """
+        Wait for the transactions in poll to change state.
+
+        Returns:
+            Deferred: fires with the current statuses of the transactions
+                when any of them changes or the poll times out
+        """
+        d = defer.Deferred(lambda _: self._remove(poll))
+        timer = self.Clock.callLater(poll.Timeout, self._complete, poll)
+        self._polls[poll] = (d, timer)
+
+        if not self._loop.running:
+            self._signature = self._get_signature()
+            self._loop.start(self.Interval, now=False)
+
+        return d
+
+    def cancel(self, poll):
+        """
+        Drop a poll whose client has gone away.
+        """
+        if poll in self._polls:
+            self._polls[poll][0].cancel()
+
+    def _get_signature(self):
+        return (self.Ledger.MostRecentCommittedBlockID,
+                len(self.Ledger.PendingTransactions))
+
+    def _check(self):
+        # a transaction may be dropped while another one arrives, which
+        # leaves the signature unchanged, so check anyway once a second
+        self._ticks += 1
+        signature = self._get_signature()
+        if signature == self._signature and \
+                self._ticks * self.Interval < 1.0:
+            return
+
+        self._signature = signature
+        self._ticks = 0
+
+        for poll in self._polls.keys():
+            statuses = get_transaction_status(self.Ledger,
+                                              poll.TransactionIDs)
+            if poll.changed(statuses):
+                self._complete(poll, statuses)
+
+    def _complete(self, poll, statuses=None):
+        if poll not in self._polls:
+            return
+
+        (d, _) = self._remove(poll)
+        if statuses is None:
+            statuses = get_transaction_status(self.Ledger,
+                                              poll.TransactionIDs)
+        d.callback(statuses)
+
+    def _remove(self, poll):
+        (d, timer) = self._polls.pop(poll)
+        if timer.active():
+            timer.cancel()
+
+        if not self._polls and self._loop.running:
+            self._loop.stop()
+
+        return (d, timer)
@@ -16,15 +16,18 @@
 import logging
 import random
 import signal
-import socket
 import os
 import cProfile
 
 from twisted.internet import reactor
 
-from sawtooth.exceptions import MessageException
 from txnserver.endpoint_registry_client import EndpointRegistryClient
 from txnserver.config import parse_listen_directives
+from txnserver.peer_discovery import create_peer_discovery
+from txnserver.reactor_monitor import create_reactor_monitor
+from txnserver.resolver import create_resolver
+from txnserver.sampling_profiler import create_sampling_profiler
+from txnserver.verify_pool import create_verify_pool
 from gossip import node, signed_object, token_bucket
 from gossip.messages import connect_message, shutdown_message
 from gossip.topology import random_walk, barabasi_albert
@@ -45,6 +48,13 @@ class Validator(object):
         self.status = 'stopped'
         self.Config = config
 
+        # Fork the processes that verify messages submitted to the web api
+        # first, before any thread is started or socket bound, so they do
+        # not inherit locks held by other threads or listening sockets
+        self.VerifyPool = create_verify_pool(self.Config.get('WebApi', {}))
+        if self.VerifyPool is not None:
+            self.VerifyPool.start()
+
         # Parse the listen directives from the configuration so
         # we know what to bind gossip protocol to
         listen_directives = parse_listen_directives(self.Config)
@@ -80,16 +90,41 @@ class Validator(object):
             if 'HttpPort' in endpoint_cfg:
                 self._endpoint_http_port = int(endpoint_cfg['HttpPort'])
 
+        # Resolve the hosts needed at startup in parallel, the lookups that
+        # follow are answered from the cache of the resolver
+        self.Resolver = create_resolver(self.Config.get('Resolver', {}))
+        self.Resolver.resolve_all(
+            [self._gossip_host, self._endpoint_host] +
+            [nodedata["Host"] for nodedata in self.Config.get("Nodes", [])])
+
         # Finally, if the endpoint host is 'localhost', we need to convert it
         # because to another host, obviously 'localhost' won't mean "us"
         if self._endpoint_host == 'localhost':
-            self._endpoint_host = socket.gethostbyname(self._endpoint_host)
+            self._endpoint_host = \
+                self.Resolver.gethostbyname(self._endpoint_host)
 
+        # Profile is 'cprofile' for deterministic profiling of the whole
+        # run, dumped at shutdown; any other true value starts the sampling
+        # profiler, which can also be turned on and off at runtime
         self.profile = self.Config.get('Profile', False)
+        self.SamplingProfiler = create_sampling_profiler(self.Config)
 
-        if self.profile:
+        if self.profile == 'cprofile':
             self.pr = cProfile.Profile()
             self.pr.enable()
+        elif self.profile:
+            self.SamplingProfiler.start()
+
+        # measure the lag of the reactor and watch for callbacks that
+        # block it
+        self.ReactorMonitor = create_reactor_monitor(
+            self.Config.get('ReactorMonitor', {}))
+        reactor.callWhenRunning(self.ReactorMonitor.start)
+
+        # query the endpoint registries of the LedgerURLs concurrently, off
+        # the reactor thread
+        self.PeerDiscovery = create_peer_discovery(self.Config,
+                                                   self.get_endpoint_nodes)
 
         self.windows_service = windows_service
 
@@ -123,7 +158,8 @@ class Validator(object):
         databases, and 3) shutdown twisted. We need time for each to finish.
         """
         self.status = 'stopping'
-        if self.profile:
+        self.SamplingProfiler.stop()
+        if self.profile == 'cprofile':
             self.pr.create_stats()
             loc = os.path.join(self.Config.get('DataDirectory', '/tmp'),
                                '{0}.cprofile'.format(
@@ -146,6 +182,7 @@ class Validator(object):
         reactor.callLater(1.0, self.handle_shutdown)
 
     def handle_shutdown(self):
+        self.ReactorMonitor.stop()
         reactor.stop()
         self.status = 'stopped'
 
@@ -183,7 +220,8 @@ class Validator(object):
     def initialize_node_map(self):
         self.NodeMap = {}
         for nodedata in self.Config.get("Nodes", []):
-            addr = (socket.gethostbyname(nodedata["Host"]), nodedata["Port"])
+            addr = (self.Resolver.gethostbyname(nodedata["Host"]),
+                    nodedata["Port"])
             nd = node.Node(address=addr,
                            identifier=nodedata["Identifier"],
                            name=nodedata["ShortName"])
@@ -193,7 +231,7 @@ class Validator(object):
         # Create the local ledger instance
         name = self.Config['NodeName']
         addr = \
-            (socket.gethostbyname(self._gossip_host), self._gossip_port)
+            (self.Resolver.gethostbyname(self._gossip_host), self._gossip_port)
         endpoint_addr = (self._endpoint_host, self._endpoint_port)
         signingkey = signed_object.generate_signing_key(
             wifstr=self.Config.get('SigningKey'))
@@ -281,42 +319,29 @@ class Validator(object):
         is constructed, pick from it those specified in the Peers configuration
         variable. If that is not enough, then pick more at random from the
         list.
+
+        The LedgerURLs are queried in the background; nodes discovered by a
+        round that is still in progress are picked up by the next call, which
+        the callers make every couple of seconds until enough peers connect.
         """
 
-        # Continue to support existing config files with single
-        # string values.
-        if isinstance(self.Config.get('LedgerURL'), basestring):
-            urls = [self.Config.get('LedgerURL')]
-        else:
-            urls = self.Config.get('LedgerURL', [])
-
-        # We randomize the url list here so that we avoid the
-        # condition of a small number of validators referencing
-        # each other's empty EndpointRegistries forever.
-        random.shuffle(urls)
-        for url in urls:
-            logger.info('attempting to load peers using url %s', url)
-            try:
-                peers = self.get_endpoint_nodes(url)
-                # If the Endpoint Registry is empty, try the next
-                # url in the shuffled list
-                if len(peers) == 0:
-                    continue
-                for peer in peers:
-                    self.NodeMap[peer.Name] = peer
-                break
-            except MessageException as e:
-                logger.error("Unable to get endpoints from LedgerURL: %s",
-                             str(e))
+        # All the urls are queried at once and their endpoints merged, so a
+        # small number of validators referencing each other's empty
+        # EndpointRegistries does not hide the rest of the network.
+        self.PeerDiscovery.refresh().addCallback(self._add_discovered_nodes)
 
         # We may also be able to rediscover peers via the persistence layer.
+        # Their hosts are resolved without blocking the reactor, like the
+        # discovered nodes they are picked up by the next call.
         if self.Ledger.Restore:
+            epinfos = []
             for blockid in self.Ledger.GlobalStoreMap.persistmap_keys():
                 blk = self.Ledger.GlobalStoreMap.get_block_store(blockid)
                 sto = blk.get_transaction_store('/EndpointRegistryTransaction')
-                for key in sto:
-                    nd = self._endpoint_info_to_node(sto[key])
-                    self.NodeMap[nd.Name] = nd
+                epinfos.extend(sto[key] for key in sto)
+            self.Resolver.resolve_many(
+                [epinfo["Host"] for epinfo in epinfos]).addCallback(
+                    self._add_restored_nodes, epinfos)
 
         # Build a list of nodes that we can use for the initial connection
         minpeercount = self.Config.get("InitialConnectivity", 1)
@@ -330,6 +355,17 @@ class Validator(object):
 
         return peerset
 
+    def _add_discovered_nodes(self, nodes):
+        for nd in nodes:
+            self.NodeMap[nd.Name] = nd
+
+    def _add_restored_nodes(self, addresses, epinfos):
+        for epinfo in epinfos:
+            address = addresses.get(epinfo["Host"])
+            if address is not None:
+                nd = self._endpoint_info_to_node(epinfo, address)
+                self.NodeMap[nd.Name] = nd
+
     def _connect_to_peers(self):
         min_peer_count = self.Config.get("InitialConnectivity", 1)
         current_peer_count = len(self.Ledger.peer_list())
@@ -458,17 +494,18 @@ class Validator(object):
                     node.Name)
         self.Ledger.handle_message(msg)
 
-    def get_endpoint_nodes(self, url):
-        client = EndpointRegistryClient(url)
+    def get_endpoint_nodes(self, url, timeout=30):
+        client = EndpointRegistryClient(url, timeout=timeout)
 
         nodes = []
         for epinfo in client.get_endpoint_list(domain=self.EndpointDomain):
             nodes.append(self._endpoint_info_to_node(epinfo))
         return nodes
 
-    @staticmethod
-    def _endpoint_info_to_node(epinfo):
-        addr = (socket.gethostbyname(epinfo["Host"]), epinfo["Port"])
+    def _endpoint_info_to_node(self, epinfo, address=None):
+        if address is None:
+            address = self.Resolver.gethostbyname(epinfo["Host"])
+        addr = (address, epinfo["Port"])
         nd = node.Node(address=addr,
                        identifier=epinfo["NodeIdentifier"],
                        name=epinfo["Name"])
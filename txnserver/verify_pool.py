@@ -0,0 +1,169 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements a process pool that decodes submitted messages and
+verifies their signatures on all cores
+"""
+
+import logging
+import multiprocessing
+import pickle
+import threading
+import time
+
+from twisted.internet import reactor
+
+from txnserver.web_stats import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+def verify_message(msg_class, minfo):
+    """
+    Decode a message and verify the signatures of the message and of the
+    transaction it encloses. Runs in the pool processes.
+
+    Returns:
+        str: the pickled message; the originators and identifiers
+            recovered from the signatures are cached on the objects and so
+            travel with it
+    """
+    msg = msg_class(minfo)
+
+    # recovering the originators verifies the signatures, which is the
+    # expensive part of accepting a message
+    _ = msg.OriginatorID
+    _ = msg.Identifier
+
+    txn = getattr(msg, 'Transaction', None)
+    if txn is not None:
+        _ = txn.OriginatorID
+        _ = txn.Identifier
+
+    return pickle.dumps(msg, pickle.HIGHEST_PROTOCOL)
+
+
+class VerifyPool(object):
+    """
+    A pool of processes that decode and verify submitted messages, so that
+    signature verification is not limited to the one core the validator
+    process can use while holding the GIL. Callers block in their own
+    (worker pool) thread until the results are ready.
+    """
+
+    def __init__(self, processes, timeout=30):
+        self.Processes = processes
+        self.Timeout = timeout
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def start(self):
+        """
+        Start the processes. This should happen before any other thread is
+        started or socket opened, since the processes are forked from the
+        calling process and inherit its state.
+        """
+        self._pool = multiprocessing.Pool(self.Processes)
+        reactor.addSystemEventTrigger('before', 'shutdown', self.stop)
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def verify(self, msg_class, minfo):
+        """
+        Decode and verify one message.
+
+        Returns:
+            str: the pickled message
+        """
+        result = self.verify_many([(msg_class, minfo)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def verify_many(self, requests):
+        """
+        Decode and verify several messages in parallel.
+
+        Args:
+            requests (list): (message class, decoded request) tuples
+
+        Returns:
+            list: for each request the pickled message, or the exception
+                raised while decoding or verifying it
+        """
+        started = time.time()
+        pending = [self._pool.apply_async(verify_message, request)
+                   for request in requests]
+
+        results = []
+        for result in pending:
+            try:
+                results.append(result.get(self.Timeout))
+            except Exception as e:
+                results.append(e)
+
+        failed = len([r for r in results if isinstance(r, Exception)])
+        with self._lock:
+            self._verified += len(results) - failed
+            self._failed += failed
+            self._time.add(time.time() - started)
+
+        return results
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'Processes': self.Processes,
+                'Verified': self._verified,
+                'Failed': self._failed,
+                'VerifyTime': self._time.get_stats()
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._verified = 0
+            self._failed = 0
+            self._time = LatencyHistogram()
+
+
+def create_verify_pool(config):
+    """
+    Create the verification pool from the WebApi section of the validator
+    configuration, for example:
+
+        "WebApi" : {
+            "VerifyProcesses" : 4,
+            "VerifyTimeout" : 30
+        }
+
+    The pool is disabled unless VerifyProcesses is set. A request thread
+    blocks while its messages are verified, so WriteThreads limits how
+    many single message submissions are verified at once; the messages of
+    a batch are spread over all the processes.
+
+    Returns:
+        VerifyPool: the pool, or None if it is disabled
+    """
+    processes = config.get('VerifyProcesses', 0)
+    if not processes:
+        return None
+
+    return VerifyPool(processes, config.get('VerifyTimeout', 30))
@@ -17,13 +17,16 @@
 This module implements the Web server supporting the web api
 """
 
+import functools
 import logging
+import math
 import os
+import pickle
+import time
 import traceback
-import copy
 
+from twisted.internet import defer
 from twisted.internet import reactor
-from twisted.internet import threads
 from twisted.web import http, server
 from twisted.web.error import Error
 from twisted.web.resource import Resource
@@ -36,11 +39,41 @@ from gossip.common import dict2json
 from gossip.common import cbor2dict
 from gossip.common import dict2cbor
 from gossip.common import pretty_print_dict
-from journal import global_store_manager
 from journal import transaction
 from journal.messages import transaction_message
 from txnintegration.utils import PlatformStats
+from txnserver.chain_index import ChainIndex
+from txnserver.chain_index import HEADER_FIELDS
 from txnserver.config import parse_listen_directives
+from txnserver.endpoint_index import EndpointIndex
+from txnserver.memory_debug import MemoryInspector
+from txnserver.metrics import MetricsRegistry
+from txnserver.metrics import OPENMETRICS_CONTENT_TYPE
+from txnserver.metrics import PROMETHEUS_CONTENT_TYPE
+from txnserver.rate_limit import create_admission_control
+from txnserver.rate_limit import RateLimited
+from txnserver.rate_limit import TOO_MANY_REQUESTS
+from txnserver.speculative_head import SpeculativeHead
+from txnserver.txn_status import get_transaction_status
+from txnserver.txn_status import StatusPoll
+from txnserver.txn_status import StatusWatcher
+from txnserver.web_cache import LRUCache
+from txnserver.web_cache import ResponseCache
+from txnserver.web_encoding import choose_encoding
+from txnserver.web_encoding import compress
+from txnserver.web_events import EVENT_TYPES
+from txnserver.web_events import EventFilter
+from txnserver.web_events import EventNotifier
+from txnserver.web_health import HealthMonitor
+from txnserver.web_pool import create_worker_pools
+from txnserver.web_request import ApiRequest
+from txnserver.web_request import DEFAULT_MAXIMUM_BODY_SIZE
+from txnserver.web_request import describe_body
+from txnserver.web_stats import HttpStats
+from txnserver.web_stream import ChunkedStream
+from txnserver.web_stream import get_page
+from txnserver.web_stream import ListStream
+from txnserver.web_stream import StoreStream
 
 from sawtooth.exceptions import InvalidTransactionError
 
@@ -55,6 +88,67 @@ class RootPage(Resource):
         self.Ledger = validator.Ledger
         self.Validator = validator
         self.ps = PlatformStats()
+        self.SpeculativeHead = SpeculativeHead(self.Ledger)
+
+        web_config = validator.Config.get('WebApi', {})
+        self.ReadPool, self.WritePool = create_worker_pools(web_config)
+        self.RetryAfter = web_config.get('RetryAfter', 1)
+        self.HttpStats = HttpStats()
+        self.Admission = create_admission_control(
+            web_config, self.WritePool.ThreadPool.max)
+        # the validator owns the verification processes, which may be
+        # disabled
+        self.VerifyPool = getattr(validator, 'VerifyPool', None)
+
+        self.ResponseCache = ResponseCache(
+            web_config.get('ResponseCacheSize', 16 * 1024 * 1024))
+        self.CompressionThreshold = web_config.get('CompressionThreshold',
+                                                   1024)
+        self.CompressionLevel = web_config.get('CompressionLevel', 6)
+
+        self.ChainIndex = ChainIndex(self.Ledger)
+        self.ChainIndex.add_listener(self._on_chain_update)
+        self.EndpointIndex = EndpointIndex(self.Ledger, self.ChainIndex)
+
+        self.DefaultPageSize = web_config.get('DefaultPageSize', 1000)
+        self.MaximumPageSize = web_config.get('MaximumPageSize', 10000)
+        self.MaximumBatchSize = web_config.get('MaximumBatchSize',
+                                               self.MaximumPageSize)
+        self.SortedKeyCache = LRUCache(
+            web_config.get('SortedKeyCacheSize', 1000000))
+        # bounded by the number of cached block states
+        self.BlockStoreCache = LRUCache(
+            web_config.get('BlockStoreCacheSize', 100))
+
+        self.StatusWatcher = StatusWatcher(self.Ledger)
+        self.MaximumStatusWait = web_config.get('MaximumStatusWait', 30)
+
+        self.EventNotifier = EventNotifier(self.Ledger, self.ChainIndex)
+
+        # the validator owns the reactor monitor
+        self.ReactorMonitor = getattr(validator, 'ReactorMonitor', None)
+
+        self.Health = HealthMonitor(
+            functools.partial(self._hdl_status_request, [], {}, False),
+            [self.ReadPool, self.WritePool],
+            reactor_monitor=self.ReactorMonitor,
+            interval=web_config.get('HealthInterval', 1.0),
+            busy_lag=web_config.get('HealthBusyLag', 1.0))
+        self.Resolver = getattr(validator, 'Resolver', None)
+
+        self.MemoryInspector = MemoryInspector({
+            'TransactionStore': lambda: len(self.Ledger.TransactionStore),
+            'BlockStore': lambda: len(self.Ledger.BlockStore),
+            'PendingTransactions':
+                lambda: len(self.Ledger.PendingTransactions),
+            'NodeMap': lambda: len(self.Ledger.NodeMap),
+            'ResponseCache': lambda: len(self.ResponseCache),
+            'SortedKeyCache': lambda: len(self.SortedKeyCache),
+            'BlockStoreCache': lambda: len(self.BlockStoreCache)
+        })
+
+        self.Metrics = MetricsRegistry(web_config.get('MetricsMaxAge', 1.0))
+        self._register_metrics()
 
         self.GetPageMap = {
             'block': self._handle_blk_request,
@@ -62,11 +156,15 @@ class RootPage(Resource):
             'store': self._handle_store_request,
             'transaction': self._handle_txn_request,
             'status': self._hdl_status_request,
+            'debug': self._handle_debug_request,
+            'endpoints': self._handle_endpoint_request,
         }
 
         self.PostPageMap = {
             'default': self._msg_forward,
             'forward': self._msg_forward,
+            'batch': self._msg_batch,
+            'transaction': self._handle_txn_status_request,
             'initiate': self._msg_initiate,
             'command': self._do_command,
             'echo': self._msg_echo
@@ -76,11 +174,70 @@ class RootPage(Resource):
             os.path.dirname(os.path.abspath(__file__)), "static_content")
         self.static_content = File(static_dir)
 
+    def _register_metrics(self):
+        self.Metrics.register('sawtooth', self._get_ledger_stats,
+                              label='domain')
+        self.Metrics.register('sawtooth_peer', self._get_peer_stats,
+                              label='peer')
+        self.Metrics.register('sawtooth_platform', self._get_platform_stats)
+        self.Metrics.register('sawtooth_webapi_pool', self._get_pool_stats,
+                              label='pool')
+        self.Metrics.register('sawtooth_webapi_cache',
+                              self.ResponseCache.get_stats)
+        self.Metrics.register('sawtooth_webapi_store_cache',
+                              self.BlockStoreCache.get_stats)
+        self.Metrics.register('sawtooth_webapi_chain',
+                              self.ChainIndex.get_stats)
+        self.Metrics.register('sawtooth_webapi_endpoints',
+                              self.EndpointIndex.get_stats)
+        self.Metrics.register('sawtooth_webapi_events',
+                              self.EventNotifier.get_stats)
+        self.Metrics.register('sawtooth_webapi_http',
+                              self.HttpStats.get_stats, label='route')
+        self.Metrics.register('sawtooth_webapi_admission',
+                              self.Admission.get_stats)
+        self.Metrics.register('sawtooth_webapi_health',
+                              self.Health.get_stats)
+        if self.ReactorMonitor is not None:
+            self.Metrics.register('sawtooth_reactor',
+                                  self.ReactorMonitor.get_stats)
+        if self.Resolver is not None:
+            self.Metrics.register('sawtooth_resolver',
+                                  self.Resolver.get_stats)
+
+    def _get_ledger_stats(self):
+        return dict((domain, stats.get_stats())
+                    for domain, stats in self.Ledger.StatDomains.iteritems())
+
+    def _get_peer_stats(self):
+        result = {}
+        for peer in self.Ledger.NodeMap.itervalues():
+            result[peer.Name] = peer.Stats.get_stats()
+            result[peer.Name]['IsPeer'] = peer.is_peer
+        return result
+
+    def _get_platform_stats(self):
+        self.ps.get_stats()
+        return self.ps.get_data_as_dict()
+
+    def start(self):
+        """
+        Start the worker pools used to service requests.
+        """
+        self.ReadPool.start()
+        self.WritePool.start()
+        reactor.callWhenRunning(self.ChainIndex.start)
+        reactor.callWhenRunning(self.Health.start)
+
     def error_response(self, request, response, *msgargs):
         """
         Generate a common error response for broken requests
         """
-        request.setResponseCode(response)
+        if response == TOO_MANY_REQUESTS:
+            # not in the twisted table of response messages
+            request.setResponseCode(response, 'Too Many Requests')
+        else:
+            request.setResponseCode(response)
 
         msg = msgargs[0].format(*msgargs[1:])
         if response > 400:
@@ -118,6 +275,13 @@ class RootPage(Resource):
 
         test_only = (request.method == 'HEAD')
 
+        # the key has to be built before the handler consumes the
+        # request arguments
+        cache_key = None
+        if not test_only and \
+                self._is_immutable(prefix, list(components), request.args):
+            cache_key = self.ResponseCache.make_key(request)
+
         try:
             response = self.GetPageMap[prefix](components, request.args,
                                                test_only)
@@ -126,21 +290,35 @@ class RootPage(Resource):
 
             cbor = (request.getHeader('Accept') == 'application/cbor')
 
+            if isinstance(response, ChunkedStream):
+                request.responseHeaders.addRawHeader(
+                    b"content-type",
+                    b"application/cbor" if cbor else b"application/json")
+                return response
+
             if cbor:
-                request.responseHeaders.addRawHeader(b"content-type",
-                                                     b"application/cbor")
-                return dict2cbor(response)
+                content_type = b"application/cbor"
+                result = dict2cbor(response)
+            else:
+                content_type = b"application/json"
+                pretty = 'p' in request.args
+                if pretty:
+                    result = pretty_print_dict(response) + '\n'
+                else:
+                    result = dict2json(response)
 
             request.responseHeaders.addRawHeader(b"content-type",
-                                                 b"application/json")
+                                                 content_type)
 
-            pretty = 'p' in request.args
-            if pretty:
-                result = pretty_print_dict(response) + '\n'
-            else:
-                result = dict2json(response)
+            if cache_key is not None:
+                cached = self.ResponseCache.add_response(cache_key, result,
+                                                         content_type)
+                encoding = self._choose_encoding(request, len(result))
+                if encoding is not None:
+                    cached = self._add_variant(cache_key, cached, encoding)
+                return self._render_etag(request, cached)
 
-            return result
+            return self._compress_response(request, result)
 
         except Error as e:
             return self.error_response(
@@ -157,8 +335,10 @@ class RootPage(Resource):
 
     def do_post(self, request):
         """
-        Handle two types of HTTP POST requests:
+        Handle four types of HTTP POST requests:
          - gossip messages.  relayed to the gossip network as is
+         - batches of gossip messages (/batch)
+         - transaction status queries (/transaction/status)
          - validator command and control (/command)
         """
 
@@ -190,8 +370,8 @@ class RootPage(Resource):
                             request.path, traceback.format_exc(20))
                 return self.error_response(
                     request, http.BAD_REQUEST,
-                    'unable to decode incoming request {0}',
-                    data)
+                    'unable to decode incoming request, {0}',
+                    describe_body(data))
 
             # process /command
             try:
@@ -212,153 +392,241 @@ class RootPage(Resource):
                 return self.error_response(request, http.BAD_REQUEST,
                                            'error processing http request {0}',
                                            request.path)
-        else:
-            try:
-                if encoding == 'application/json':
-                    minfo = json2dict(data)
-                elif encoding == 'application/cbor':
-                    minfo = cbor2dict(data)
-                else:
-                    return self.error_response(request, http.BAD_REQUEST,
-                                               'unknown message encoding, {0}',
-                                               encoding)
-                typename = minfo.get('__TYPE__', '**UNSPECIFIED**')
-                if typename not in self.Ledger.MessageHandlerMap:
+
+        try:
+            if encoding == 'application/json':
+                minfo = json2dict(data)
+            elif encoding == 'application/cbor':
+                minfo = cbor2dict(data)
+            else:
+                return self.error_response(request, http.BAD_REQUEST,
+                                           'unknown message encoding, {0}',
+                                           encoding)
+            if prefix == 'batch':
+                if not isinstance(minfo, list):
                     return self.error_response(
                         request, http.BAD_REQUEST,
-                        'received request for unknown message type, {0}',
-                        typename)
+                        'batch request must contain a list of messages')
+                if len(minfo) > self.MaximumBatchSize:
+                    return self.error_response(
+                        request, http.REQUEST_ENTITY_TOO_LARGE,
+                        'batch request for more than {0} messages',
+                        self.MaximumBatchSize)
+            elif prefix in ('default', 'forward'):
+                decoded = self._decode_submissions([minfo])[0]
+                if isinstance(decoded, Exception):
+                    raise decoded
+                (msg, copy_message) = decoded
+            elif prefix != 'transaction':
+                msg = self._decode_message(minfo)
+                copy_message = functools.partial(self._decode_message, minfo)
 
-                msg = self.Ledger.MessageHandlerMap[typename][0](minfo)
+        except Error as e:
+            return self.error_response(request, int(e.status), '{0}',
+                                       e.message)
 
-            except:
-                logger.info('exception while decoding http request %s; %s',
-                            request.path, traceback.format_exc(20))
-                return self.error_response(
-                    request, http.BAD_REQUEST,
-                    'unabled to decode incoming request {0}',
-                    data)
+        except:
+            logger.info('exception while decoding http request %s; %s',
+                        request.path, traceback.format_exc(20))
+            return self.error_response(
+                request, http.BAD_REQUEST,
+                'unable to decode incoming request, {0}',
+                describe_body(data))
+
+        # charge the client for the messages before doing any expensive
+        # work on them
+        if prefix != 'transaction':
+            try:
+                self.Admission.admit_client(
+                    request.getClientIP(),
+                    len(minfo) if prefix == 'batch' else 1)
+            except RateLimited as e:
+                return self._rate_limited(request, e)
 
+        if prefix not in ('batch', 'transaction'):
             # determine if the message contains a valid transaction before
             # we send the message to the network
+            try:
+                self._validate_message(msg, copy_message)
+            except RateLimited as e:
+                return self._rate_limited(request, e)
+            except Error as e:
+                return self.error_response(request, int(e.status), '{0}',
+                                           e.message)
 
-            # we need to start with a copy of the message due to cases
-            # where side effects of the validity check may impact objects
-            # related to msg
-            mymsg = copy.deepcopy(msg)
+        # and finally execute the associated method
+        # and send back the results
+        try:
+            if prefix in ('batch', 'transaction'):
+                response = self.PostPageMap[prefix](request, components,
+                                                    minfo)
+            else:
+                response = self.PostPageMap[prefix](request, components,
+                                                    msg).dump()
 
-            if hasattr(mymsg, 'Transaction') and mymsg.Transaction is not None:
-                mytxn = mymsg.Transaction
-                logger.info('starting local validation '
-                            'for txn id: %s type: %s',
-                            mytxn.Identifier,
-                            mytxn.TransactionTypeName)
-                block_id = self.Ledger.MostRecentCommittedBlockID
-
-                real_store_map = self.Ledger.GlobalStoreMap.get_block_store(
-                    block_id)
-                temp_store_map = \
-                    global_store_manager.BlockStore(real_store_map)
-                if not temp_store_map:
-                    logger.info('no store map for block %s', block_id)
-                    return self.error_response(
-                        request, http.BAD_REQUEST,
-                        'unable to validate enclosed transaction {0}',
-                        data)
+            request.responseHeaders.addRawHeader("content-type", encoding)
+            if isinstance(response, StatusPoll):
+                return response
 
-                transaction_type = mytxn.TransactionTypeName
-                if transaction_type not in temp_store_map.TransactionStores:
-                    logger.info('transaction type %s not in global store map',
-                                transaction_type)
-                    return self.error_response(
-                        request, http.BAD_REQUEST,
-                        'unable to validate enclosed transaction {0}',
-                        data)
-
-                # clone a copy of the ledger's message queue so we can
-                # temporarily play forward all locally submitted yet
-                # uncommitted transactions
-                my_queue = copy.deepcopy(self.Ledger.MessageQueue)
-
-                # apply any enqueued messages
-                while len(my_queue) > 0:
-                    qmsg = my_queue.pop()
-                    if qmsg and \
-                       qmsg.MessageType in self.Ledger.MessageHandlerMap:
-                        if (hasattr(qmsg, 'Transaction') and
-                                qmsg.Transaction is not None):
-                            my_store = temp_store_map.get_transaction_store(
-                                qmsg.Transaction.TransactionTypeName)
-                            if qmsg.Transaction.is_valid(my_store):
-                                myqtxn = copy.copy(qmsg.Transaction)
-                                myqtxn.apply(my_store)
-
-                # apply any local pending transactions
-                for txn_id in self.Ledger.PendingTransactions.iterkeys():
-                    pend_txn = self.Ledger.TransactionStore[txn_id]
-                    my_store = temp_store_map.get_transaction_store(
-                        pend_txn.TransactionTypeName)
-                    if pend_txn and pend_txn.is_valid(my_store):
-                        my_pend_txn = copy.copy(pend_txn)
-                        logger.debug('applying pending transaction '
-                                     '%s to temp store', txn_id)
-                        my_pend_txn.apply(my_store)
-
-                # determine validity of the POSTed transaction against our
-                # new temporary state
-                my_store = temp_store_map.get_transaction_store(
-                    mytxn.TransactionTypeName)
-                try:
-                    mytxn.check_valid(my_store)
-                except InvalidTransactionError as e:
-                    logger.info('submitted transaction fails transaction '
-                                'family validation check: %s; %s',
-                                request.path, mymsg.dump())
-                    return self.error_response(
-                        request, http.BAD_REQUEST,
-                        "enclosed transaction failed transaction "
-                        "family validation check: {}".format(str(e)),
-                        data)
-                except:
-                    logger.info('submitted transaction is '
-                                'not valid %s; %s; %s',
-                                request.path, mymsg.dump(),
-                                traceback.format_exc(20))
-                    return self.error_response(
-                        request, http.BAD_REQUEST,
-                        "enclosed transaction is not valid",
-                        data)
+            if encoding == 'application/json':
+                result = dict2json(response)
+            else:
+                result = dict2cbor(response)
 
-                logger.info('transaction %s is valid',
-                            msg.Transaction.Identifier)
+            return result
 
-            # and finally execute the associated method
-            # and send back the results
+        except Error as e:
+            return self.error_response(
+                request, int(e.status),
+                'exception while processing request {0}; {1}',
+                request.path, str(e))
+
+        except:
+            logger.info('exception while processing http request %s; %s',
+                        request.path, traceback.format_exc(20))
+            return self.error_response(request, http.BAD_REQUEST,
+                                       'error processing http request {0}',
+                                       request.path)
+
+    def _get_message_class(self, minfo):
+        typename = minfo.get('__TYPE__', '**UNSPECIFIED**')
+        if typename not in self.Ledger.MessageHandlerMap:
+            raise Error(http.BAD_REQUEST,
+                        'received request for unknown message type, '
+                        '{0}'.format(typename))
+
+        return self.Ledger.MessageHandlerMap[typename][0]
+
+    def _decode_message(self, minfo):
+        """
+        Build a gossip message object from its decoded dictionary form.
+        """
+        return self._get_message_class(minfo)(minfo)
+
+    def _decode_submissions(self, minfos):
+        """
+        Decode signed messages submitted for the network. With a
+        verification pool the messages are decoded and their signatures
+        verified in the pool processes, in parallel; the messages come back
+        with the recovered originators and identifiers already cached.
+
+        Returns:
+            list: for each request either a (msg, copy_message) tuple,
+                where copy_message is a function returning an independent
+                copy of msg, or the exception raised while decoding it
+        """
+        results = []
+        for minfo in minfos:
             try:
-                response = self.PostPageMap[prefix](request, components, msg)
+                results.append(self._get_message_class(minfo))
+            except Exception as e:
+                results.append(e)
+
+        if self.VerifyPool is None:
+            for (index, msg_class) in enumerate(results):
+                if isinstance(msg_class, Exception):
+                    continue
+                try:
+                    results[index] = (msg_class(minfos[index]),
+                                      functools.partial(msg_class,
+                                                        minfos[index]))
+                except Exception as e:
+                    results[index] = e
+            return results
+
+        requests = [(index, (msg_class, minfos[index]))
+                    for (index, msg_class) in enumerate(results)
+                    if not isinstance(msg_class, Exception)]
+        verified = self.VerifyPool.verify_many([r for (_, r) in requests])
+        for ((index, _), data) in zip(requests, verified):
+            if isinstance(data, Exception):
+                logger.info('unable to verify submitted message; %s',
+                            data)
+                results[index] = Error(http.BAD_REQUEST,
+                                       'unable to verify message signature')
+            else:
+                results[index] = (pickle.loads(data),
+                                  functools.partial(pickle.loads, data))
 
-                request.responseHeaders.addRawHeader("content-type", encoding)
-                if encoding == 'application/json':
-                    result = dict2json(response.dump())
-                else:
-                    result = dict2cbor(response.dump())
+        return results
 
-                return result
+    def _validate_message(self, msg, copy_message):
+        """
+        Check the transaction enclosed in a message, if there is one,
+        against the speculative ledger state. Raises Error if the message
+        should not be sent to the network.
 
-            except Error as e:
-                return self.error_response(
-                    request, int(e.status),
-                    'exception while processing request {0}; {1}',
-                    request.path, str(e))
+        Args:
+            msg: the submitted message
+            copy_message (function): returns an independent copy of msg
+        """
+        if not hasattr(msg, 'Transaction') or msg.Transaction is None:
+            return
 
-            except:
-                logger.info('exception while processing http request %s; %s',
-                            request.path, traceback.format_exc(20))
-                return self.error_response(request, http.BAD_REQUEST,
-                                           'error processing http request {0}',
-                                           request.path)
+        try:
+            signer = msg.Transaction.OriginatorID
+        except:
+            logger.info('unable to recover transaction signer; %s',
+                        traceback.format_exc(20))
+            raise Error(http.BAD_REQUEST, 'enclosed transaction is not valid')
+
+        # raises RateLimited if the signer is over its rate or too many
+        # validations are already running
+        self.Admission.admit_signer(signer)
+        with self.Admission.validation():
+            self._check_transaction(msg, copy_message)
+
+    def _check_transaction(self, msg, copy_message):
+        # the validity check may have side effects on the objects it is
+        # given, so it works on a second message built from the request
+        # rather than on msg; decoding again costs a fraction of a deepcopy
+        mymsg = copy_message()
+        mytxn = mymsg.Transaction
+
+        logger.info('starting local validation for txn id: %s type: %s',
+                    mytxn.Identifier, mytxn.TransactionTypeName)
+
+        # validate against the speculative state, which already reflects
+        # all locally submitted yet uncommitted transactions
+        try:
+            if not self.SpeculativeHead.check_valid(mytxn):
+                logger.info('no speculative store for transaction type %s',
+                            mytxn.TransactionTypeName)
+                raise Error(http.BAD_REQUEST,
+                            'unable to validate enclosed transaction')
+        except Error:
+            raise
+        except InvalidTransactionError as e:
+            logger.info('submitted transaction fails transaction '
+                        'family validation check: %s', mymsg.dump())
+            raise Error(http.BAD_REQUEST,
+                        'enclosed transaction failed transaction family '
+                        'validation check: {0}'.format(str(e)))
+        except:
+            logger.info('submitted transaction is not valid %s; %s',
+                        mymsg.dump(), traceback.format_exc(20))
+            raise Error(http.BAD_REQUEST, 'enclosed transaction is not valid')
+
+        logger.info('transaction %s is valid', msg.Transaction.Identifier)
 
     def final(self, message, request):
+        if isinstance(message, ChunkedStream):
+            cbor = (request.getHeader('Accept') == 'application/cbor')
+            message.start(request, cbor)
+            return
+
+        if isinstance(message, StatusPoll):
+            d = self.StatusWatcher.watch(message)
+            d.addCallback(self._encode_status_poll, message)
+            d.addCallback(self.final, request)
+            d.addErrback(self._status_poll_errback, request)
+            request.notifyFinish().addErrback(
+                lambda _: self.StatusWatcher.cancel(message))
+            return
+
+        # with a length the connection can be kept alive without chunking
+        if request.method != 'HEAD':
+            request.setHeader('Content-Length', str(len(message)))
         request.write(message)
         try:
             request.finish()
@@ -367,14 +635,241 @@ class RootPage(Resource):
 
     def render_GET(self, request):
         # pylint: disable=invalid-name
-        d = threads.deferToThread(self.do_get, request)
-        d.addCallback(self.final, request)
-        d.addErrback(self.errback, request)
-        return server.NOT_DONE_YET
+        timer = self.HttpStats.start_request(
+            request, self._get_route(request, self.GetPageMap, 'static'))
+
+        # liveness and status are answered from a snapshot on the reactor
+        # so they never queue behind ledger work in a busy pool
+        if request.path.rstrip('/') == '/healthz':
+            return self._render_snapshot(request, self.Health.get_health())
+        if request.path.rstrip('/') == '/status':
+            return self._render_snapshot(request, self.Health.get_status())
+        if request.path.startswith('/debug') and \
+                request.getClientIP() != '127.0.0.1':
+            return self.error_response(request, http.NOT_ALLOWED,
+                                       '{0} not authorized for debugging',
+                                       request.getClientIP())
+        if request.path.rstrip('/') == '/events':
+            return self._render_events(request)
+        if request.path.rstrip('/') == '/metrics':
+            return self._defer_to_pool(self.ReadPool, self._render_metrics,
+                                       request, timer)
+
+        result = self._render_cached(request, timer)
+        if result is not None:
+            return result
+
+        return self._defer_to_pool(self.ReadPool, self.do_get, request, timer)
 
     def render_POST(self, request):
         # pylint: disable=invalid-name
-        d = threads.deferToThread(self.do_post, request)
+        timer = self.HttpStats.start_request(
+            request, self._get_route(request, self.PostPageMap, 'default'))
+
+        # status queries only read the ledger, so keep them from queueing
+        # behind transaction submissions
+        if request.path.rstrip('/') == '/transaction/status':
+            return self._defer_to_pool(self.ReadPool, self.do_post, request,
+                                       timer)
+
+        return self._defer_to_pool(self.WritePool, self.do_post, request,
+                                   timer)
+
+    def _get_route(self, request, page_map, default):
+        """
+        The name under which the statistics of a request are recorded: the
+        method and the first component of the path.
+        """
+        prefix = request.path.lstrip('/').split('/', 1)[0]
+        if prefix not in page_map and \
+                prefix not in ('events', 'metrics', 'healthz'):
+            prefix = default
+        return '{0} /{1}'.format(request.method, prefix)
+
+    def _encode_status_poll(self, statuses, poll):
+        if poll.CBOR:
+            return dict2cbor(statuses)
+        return dict2json(statuses)
+
+    def _status_poll_errback(self, failure, request):
+        # the poll is cancelled when the client disconnects
+        if failure.check(defer.CancelledError):
+            return None
+        return self.errback(failure, request)
+
+    def _render_events(self, request):
+        """
+        Stream server sent events for block commits, transaction commits
+        and dropped transactions until the client disconnects. The events
+        may be filtered with the request arguments:
+            event -- the event types to send
+            store -- the transaction families (store names) of interest
+            id -- the transaction ids of interest
+        """
+        for event_type in request.args.get('event', []):
+            if event_type not in EVENT_TYPES:
+                return self.error_response(request, http.BAD_REQUEST,
+                                           'unknown event type {0}',
+                                           event_type)
+
+        if request.method == 'HEAD':
+            return ''
+
+        request.setHeader('Content-Type', 'text/event-stream')
+        request.setHeader('Cache-Control', 'no-cache')
+        self.EventNotifier.subscribe(request,
+                                     EventFilter.from_args(request.args))
+        return server.NOT_DONE_YET
+
+    def _render_snapshot(self, request, result):
+        request.setHeader('Cache-Control', 'no-cache')
+        if request.getHeader('Accept') == 'application/cbor':
+            request.setHeader('Content-Type', 'application/cbor')
+            return dict2cbor(result)
+
+        request.setHeader('Content-Type', 'application/json')
+        return dict2json(result)
+
+    def _render_metrics(self, request):
+        """
+        Render the ledger, peer, platform and web api statistics for a
+        Prometheus scrape, in the OpenMetrics format if the client
+        accepts it and in the older Prometheus text format otherwise.
+        """
+        accept = request.getHeader('Accept') or ''
+        openmetrics = 'application/openmetrics-text' in accept
+
+        request.setHeader('Content-Type',
+                          OPENMETRICS_CONTENT_TYPE if openmetrics
+                          else PROMETHEUS_CONTENT_TYPE)
+        if request.method == 'HEAD':
+            return ''
+        return self.Metrics.render(openmetrics)
+
+    def _render_cached(self, request, timer):
+        """
+        Answer a GET request from the response cache directly on the
+        reactor thread. Returns None if the response is not cached.
+        """
+        if request.method != 'GET':
+            return None
+
+        # the chain index follows the ledger in the reactor thread pool and
+        # clears the cache on a fork switch, see start
+        key = self.ResponseCache.make_key(request)
+
+        cached = None
+        encoding = choose_encoding(request.getHeader('Accept-Encoding'))
+        if encoding is not None:
+            cached = self.ResponseCache.get(
+                self.ResponseCache.variant_key(key, encoding))
+
+        if cached is None:
+            cached = self.ResponseCache.get(key)
+            if cached is None:
+                return None
+
+            # compress the cached response in the read pool rather than
+            # on the reactor, the compressed variant is cached for the
+            # requests that follow
+            if self._choose_encoding(request, len(cached.body)) is not None:
+                return self._defer_to_pool(
+                    self.ReadPool,
+                    functools.partial(self._render_variant, key, cached,
+                                      encoding),
+                    request, timer)
+
+        request.responseHeaders.addRawHeader(b"content-type",
+                                             cached.content_type)
+        return self._render_etag(request, cached)
+
+    def _render_variant(self, key, cached, encoding, request):
+        variant = self._add_variant(key, cached, encoding)
+        request.responseHeaders.addRawHeader(b"content-type",
+                                             cached.content_type)
+        return self._render_etag(request, variant)
+
+    def _choose_encoding(self, request, size):
+        """
+        Pick the content coding for a response body of the given size, or
+        None if it should be sent uncompressed.
+        """
+        if size < self.CompressionThreshold:
+            return None
+        return choose_encoding(request.getHeader('Accept-Encoding'))
+
+    def _add_variant(self, key, cached, encoding):
+        body = compress(cached.body, encoding, self.CompressionLevel)
+        return self.ResponseCache.add_variant(key, cached, encoding, body)
+
+    def _compress_response(self, request, body):
+        encoding = self._choose_encoding(request, len(body))
+        if encoding is None:
+            return body
+
+        request.setHeader('Content-Encoding', encoding)
+        request.setHeader('Vary', 'Accept-Encoding')
+        return compress(body, encoding, self.CompressionLevel)
+
+    def _render_etag(self, request, cached):
+        request.setHeader('ETag', cached.etag)
+        request.setHeader('Vary', 'Accept-Encoding')
+        if cached.encoding is not None:
+            request.setHeader('Content-Encoding', cached.encoding)
+        if request.getHeader('If-None-Match') == cached.etag:
+            request.setResponseCode(http.NOT_MODIFIED)
+            return ''
+
+        return cached.body
+
+    def _is_immutable(self, prefix, components, args):
+        """
+        Determine if the response to a GET request can no longer change
+        and so may be cached: blocks (which are identified by their
+        content), committed transactions and the state associated with
+        an explicitly named block.
+        """
+        if prefix == 'block':
+            return len(components) > 0
+        if prefix == 'store':
+            return 'blockid' in args
+        if prefix == 'transaction' and components:
+            txnid = components[0]
+            if txnid not in self.Ledger.TransactionStore:
+                return False
+            txn = self.Ledger.TransactionStore[txnid]
+            return txn.Status == transaction.Status.committed
+
+        return False
+
+    def _on_chain_update(self, rolled_back, committed):
+        """
+        Drop cached responses if the ledger switched to a different fork,
+        since transactions that were committed may no longer be.
+        """
+        if rolled_back:
+            logger.info('fork switch detected, clearing response cache')
+            self.ResponseCache.clear()
+
+    def _rate_limited(self, request, limited):
+        request.setHeader('Retry-After',
+                          str(max(int(math.ceil(limited.RetryAfter)), 1)))
+        return self.error_response(request, limited.Status, '{0}',
+                                   str(limited))
+
+    def _defer_to_pool(self, pool, func, request, timer):
+        """
+        Run the request handler in one of the web api worker pools, or
+        fail fast if that pool has no room left.
+        """
+        if pool.saturated():
+            pool.reject()
+            request.setHeader('Retry-After', str(self.RetryAfter))
+            return self.error_response(request, http.SERVICE_UNAVAILABLE,
+                                       '{0} pool is saturated', pool.Name)
+
+        timer.Queued = time.time()
+        d = pool.submit(timer.run, func, request)
         d.addCallback(self.final, request)
         d.addErrback(self.errback, request)
         return server.NOT_DONE_YET
@@ -383,7 +878,7 @@ class RootPage(Resource):
         """
         Forward a signed message through the gossip network.
         """
-        self.Ledger.handle_message(msg)
+        self._handle_message(msg)
         return msg
 
     def _msg_initiate(self, request, components, msg):
@@ -400,9 +895,97 @@ class RootPage(Resource):
             msg.Transaction.sign_from_node(self.Ledger.LocalNode)
         msg.sign_from_node(self.Ledger.LocalNode)
 
-        self.Ledger.handle_message(msg)
+        self._handle_message(msg)
         return msg
 
+    def _msg_batch(self, request, components, minfos):
+        """
+        Validate and forward a list of signed messages. Each message is
+        checked against the speculative state after the messages before
+        it in the batch have been applied, and the status of every message
+        is returned in order. Batches of more than MaximumBatchSize messages
+        are refused by do_post before any of them is decoded.
+        """
+        results = []
+        for decoded in self._decode_submissions(minfos):
+            result = {'Status': 'accepted'}
+            try:
+                if isinstance(decoded, Exception):
+                    raise decoded
+                (msg, copy_message) = decoded
+                result['Identifier'] = msg.Identifier
+                self._validate_message(msg, copy_message)
+                self._handle_message(msg)
+            except Error as e:
+                result['Status'] = 'rejected'
+                result['Error'] = e.message
+            except RateLimited as e:
+                result['Status'] = 'rejected'
+                result['Error'] = str(e)
+            except:
+                logger.info('exception while decoding batched message; %s',
+                            traceback.format_exc(20))
+                result['Status'] = 'rejected'
+                result['Error'] = 'unable to decode message'
+
+            results.append(result)
+
+        return results
+
+    def _handle_txn_status_request(self, request, components, minfo):
+        """
+        Return the status of a list of transactions. The request is either
+        a list of transaction ids or a dictionary with the ids under
+        'TransactionIDs' and optionally:
+            Wait -- the number of seconds to wait for one of the
+                transactions to change state before responding
+            Statuses -- the statuses the client already knows, changes are
+                detected relative to these rather than to the state at the
+                time of the request
+        """
+        if components != ['status']:
+            raise Error(http.NOT_FOUND,
+                        'unknown transaction request {0}'.format(
+                            request.path))
+
+        if isinstance(minfo, list):
+            minfo = {'TransactionIDs': minfo}
+        if not isinstance(minfo, dict) or \
+                not isinstance(minfo.get('TransactionIDs'), list):
+            raise Error(http.BAD_REQUEST,
+                        'status request must contain a list of transaction '
+                        'ids')
+
+        txnids = minfo['TransactionIDs']
+        if len(txnids) > self.MaximumPageSize:
+            raise Error(http.REQUEST_ENTITY_TOO_LARGE,
+                        'status request for more than {0} '
+                        'transactions'.format(self.MaximumPageSize))
+
+        statuses = get_transaction_status(self.Ledger, txnids)
+
+        wait = min(float(minfo.get('Wait', 0)), self.MaximumStatusWait)
+        if wait <= 0:
+            return statuses
+
+        known = minfo.get('Statuses', statuses)
+        poll = StatusPoll(txnids, known, wait,
+                          request.getHeader('Content-Type') ==
+                          'application/cbor')
+        if poll.changed(statuses):
+            return statuses
+
+        return poll
+
+    def _handle_message(self, msg):
+        """
+        Hand a message to the ledger and record any enclosed transaction
+        in the speculative state used to validate later submissions.
+        """
+        self.Ledger.handle_message(msg)
+        if hasattr(msg, 'Transaction') and msg.Transaction is not None:
+            self.SpeculativeHead.apply(msg.Transaction)
+
     def _msg_echo(self, request, components, msg):
         """
         Sign and echo a message
@@ -411,8 +994,15 @@ class RootPage(Resource):
 
     def _do_command(self, request, components, cmd):
         """
-        Process validator control commands
+        Process validator control commands:
+            start -- start a validator that was started with --delay-start
+            profile -- turn the sampling profiler on or off according to
+                'state' ('on' or 'off'), or report its state; only
+                allowed from the local host
         """
+        if cmd['action'] == 'profile':
+            return self._do_profile_command(request, cmd)
+
         if cmd['action'] == 'start':
             if self.Validator.delaystart is True:
                 self.Validator.delaystart = False
@@ -427,6 +1017,28 @@ class RootPage(Resource):
 
         return cmd
 
+    def _do_profile_command(self, request, cmd):
+        if request.getClientIP() != '127.0.0.1':
+            raise Error(http.NOT_ALLOWED,
+                        '{0} not authorized for profiling'.format(
+                            request.getClientIP()))
+
+        profiler = getattr(self.Validator, 'SamplingProfiler', None)
+        if profiler is None:
+            raise Error(http.NOT_FOUND, 'no sampling profiler')
+
+        state = cmd.get('state')
+        if state == 'on':
+            profiler.start()
+        elif state == 'off':
+            profiler.stop()
+        elif state is not None:
+            raise Error(http.BAD_REQUEST,
+                        'unknown profiler state {0}'.format(state))
+
+        cmd['profiler'] = profiler.get_stats()
+        return cmd
+
     def _handle_store_request(self, path_components, args, test_only):
         """
         Handle a store request. There are four types of requests:
@@ -435,15 +1047,25 @@ class RootPage(Resource):
             store name, key == '*' -- return a complete dump of all keys in the
                 store
             store name, key != '*' -- return the data associated with the key
+
+        A dump of all keys may specify additional parameters:
+            limit, after -- return at most limit entries with keys that sort
+                after the key given in after, along with the cursor for
+                the next page and the block the page was read from
+            stream -- if 1, write the dump to the client incrementally
+            domain -- return only the entries whose Domain field starts
+                with domain, such as the endpoints of a validator domain
         """
         if not self.Ledger.GlobalStore:
             raise Error(http.BAD_REQUEST, 'no global store')
 
-        block_id = self.Ledger.MostRecentCommittedBlockID
         if 'blockid' in args:
             block_id = args.get('blockid').pop(0)
+            storemap = self._get_historical_block_store(block_id)
+        else:
+            block_id = self.Ledger.MostRecentCommittedBlockID
+            storemap = self.Ledger.GlobalStoreMap.get_block_store(block_id)
 
-        storemap = self.Ledger.GlobalStoreMap.get_block_store(block_id)
         if not storemap:
             raise Error(http.BAD_REQUEST,
                         'no store map for block <{0}>'.format(block_id))
@@ -463,8 +1085,42 @@ class RootPage(Resource):
 
         key = path_components[0]
         if key == '*':
+            domain = None
+            if 'domain' in args:
+                domain = args.get('domain').pop(0)
             if 'delta' in args and args.get('delta').pop(0) == '1':
+                if domain is not None:
+                    raise Error(http.BAD_REQUEST,
+                                'domain is not supported with delta')
                 return store.dump(True)
+            if domain is not None:
+                keys = self._get_domain_keys(
+                    store, self._get_sorted_keys(block_id, store_name, store),
+                    domain)
+            if 'stream' in args and args.get('stream').pop(0) == '1':
+                if domain is None:
+                    keys = self._get_sorted_keys(block_id, store_name, store)
+                return StoreStream(store, keys)
+            if 'limit' in args or 'after' in args:
+                limit = self.DefaultPageSize
+                if 'limit' in args:
+                    limit = int(args.get('limit').pop(0))
+                if limit <= 0:
+                    raise Error(http.BAD_REQUEST,
+                                'invalid page limit {0}'.format(limit))
+                after = None
+                if 'after' in args:
+                    after = args.get('after').pop(0)
+                if domain is None:
+                    keys = self._get_sorted_keys(block_id, store_name, store)
+                page = get_page(store, keys, min(limit, self.MaximumPageSize),
+                                after)
+                # let the client request the remaining pages from the same
+                # block even if a new one is committed in the meantime
+                page['BlockID'] = block_id
+                return page
+            if domain is not None:
+                return dict((k, store[k]) for k in keys)
             return store.compose()
 
         if key not in store:
@@ -472,6 +1128,67 @@ class RootPage(Resource):
 
         return store[key]
 
+    def _get_historical_block_store(self, block_id):
+        """
+        Return the state associated with a block. Fetching the state of an
+        older block may mean reading and unpickling it from the global
+        store map, so the states of committed blocks, which do not change,
+        are cached. Every cached state counts as one entry, as sizing it
+        would mean walking the keys of all its stores.
+        """
+        storemap = self.BlockStoreCache.get(block_id)
+        if storemap is not None:
+            return storemap
+
+        storemap = self.Ledger.GlobalStoreMap.get_block_store(block_id)
+        if storemap and block_id in self.Ledger.BlockStore:
+            self.BlockStoreCache.put(block_id, storemap, 1)
+
+        return storemap
+
+    @staticmethod
+    def _get_domain_keys(store, keys, domain):
+        """
+        Return the keys of the entries of a store whose Domain field starts
+        with domain. Entries without a Domain field are in the root domain.
+        """
+        result = []
+        for key in keys:
+            value = store[key]
+            if isinstance(value, dict) and \
+                    value.get('Domain', '/').startswith(domain):
+                result.append(key)
+        return result
+
+    def _get_sorted_keys(self, block_id, store_name, store):
+        """
+        Return the sorted keys of a store. The stores of committed blocks
+        do not change so their sorted keys are cached.
+        """
+        if block_id not in self.Ledger.BlockStore:
+            return sorted(store.keys())
+
+        keys = self.SortedKeyCache.get((block_id, store_name))
+        if keys is None:
+            keys = sorted(store.keys())
+            self.SortedKeyCache.put((block_id, store_name), keys, len(keys))
+
+        return keys
+
+    def _handle_endpoint_request(self, path_components, args, test_only):
+        """
+        Handle an endpoint request, which returns the host, port and
+        identifier of the committed endpoints whose Domain starts with the
+        domain parameter, all of them by default.
+        """
+        if path_components:
+            raise Error(http.BAD_REQUEST, 'unknown endpoint request')
+
+        domain = '/'
+        if 'domain' in args:
+            domain = args.get('domain').pop(0)
+        return self.EndpointIndex.get_endpoints(domain)
+
     def _handle_blk_request(self, path_components, args, test_only):
         """
         Handle a block request. There are three types of requests:
@@ -484,14 +1201,29 @@ class RootPage(Resource):
                 oldest)
 
         Blocks are returned newest to oldest.
+
+        With an empty path and any of the parameters below, the headers of
+        a range of committed blocks are returned instead, oldest first:
+            from, to -- the heights of the first and last blocks of the
+                range (the genesis block has height 0), by default the
+                whole chain; at most MaximumPageSize headers are returned
+            fields -- comma separated header fields to return, of
+                Identifier, BlockNum, PreviousBlockID, TransactionCount and
+                CommitTime; by default all of them
+            stream -- if 1, stream the whole range rather than one page
         """
 
+        if not path_components and \
+                ('from' in args or 'to' in args or 'fields' in args or
+                 'stream' in args):
+            return self._get_block_headers(args)
+
         if not path_components:
             count = 0
             if 'blockcount' in args:
                 count = int(args.get('blockcount').pop(0))
 
-            block_ids = self.Ledger.committed_block_ids(count)
+            block_ids = self.ChainIndex.get_block_ids(count)
             return block_ids
 
         block_id = path_components.pop(0)
@@ -511,6 +1243,33 @@ class RootPage(Resource):
 
         return binfo[field]
 
+    def _get_block_headers(self, args):
+        start = 0
+        if 'from' in args:
+            start = max(int(args.get('from').pop(0)), 0)
+
+        end = None
+        if 'to' in args:
+            end = int(args.get('to').pop(0))
+
+        fields = None
+        if 'fields' in args:
+            fields = [f.strip() for f in args.get('fields').pop(0).split(',')
+                      if f.strip()]
+            unknown = [f for f in fields if f not in HEADER_FIELDS]
+            if unknown:
+                raise Error(http.BAD_REQUEST,
+                            'unknown block header fields {0}'.format(
+                                ', '.join(unknown)))
+
+        if 'stream' in args and args.get('stream').pop(0) == '1':
+            return ListStream(self.ChainIndex.iter_headers(start, end,
+                                                           fields))
+
+        last = start + self.MaximumPageSize - 1
+        end = last if end is None else min(end, last)
+        return self.ChainIndex.get_headers(start, end, fields)
+
     def _handle_txn_request(self, path_components, args, test_only):
         """
         Handle a transaction request. There are four types of requests:
@@ -527,20 +1286,31 @@ class RootPage(Resource):
         The request may specify additional parameters:
             blockcount -- the number of blocks (newest to oldest) from which to
                 pull txns
+            since_block -- pull txns from the block with this height (the
+                genesis block has height 0) and newer
+            offset, limit -- skip offset txns and return at most limit txns
 
         Transactions are returned from oldest to newest.
         """
         if len(path_components) == 0:
-            blkcount = 0
-            if 'blockcount' in args:
+            since_block = 0
+            if 'since_block' in args:
+                since_block = max(int(args.get('since_block').pop(0)), 0)
+            elif 'blockcount' in args:
                 blkcount = int(args.get('blockcount').pop(0))
+                if blkcount > 0:
+                    since_block = max(self.ChainIndex.height - blkcount, 0)
 
-            txnids = []
-            blockids = self.Ledger.committed_block_ids(blkcount)
-            while blockids:
-                blockid = blockids.pop()
-                txnids.extend(self.Ledger.BlockStore[blockid].TransactionIDs)
-            return txnids
+            offset = 0
+            if 'offset' in args:
+                offset = max(int(args.get('offset').pop(0)), 0)
+
+            limit = None
+            if 'limit' in args:
+                limit = max(int(args.get('limit').pop(0)), 0)
+
+            return self.ChainIndex.get_transaction_ids(offset, limit,
+                                                       since_block)
 
         txnid = path_components.pop(0)
 
@@ -573,6 +1343,37 @@ class RootPage(Resource):
 
         return tinfo[field]
 
+    def _handle_debug_request(self, path_components, args, test_only):
+        """
+        Handle a debugging request, only allowed from the local host:
+            memory -- report object counts by type, the sizes of the
+                ledger collections and, with tracemalloc, the top
+                allocators
+
+        A memory request may specify additional parameters:
+            limit -- the number of types and allocators to list
+            snapshot -- if 1, report later differences relative to this
+                report
+            trace -- on or off, start or stop tracing allocations
+        """
+        if path_components != ['memory']:
+            raise Error(http.NOT_FOUND, 'unknown debug request')
+
+        if 'trace' in args:
+            trace = args.get('trace').pop(0)
+            if trace not in ('on', 'off'):
+                raise Error(http.BAD_REQUEST,
+                            'unknown trace state {0}'.format(trace))
+            if not self.MemoryInspector.set_tracing(trace == 'on'):
+                raise Error(http.NOT_FOUND, 'tracemalloc is not available')
+
+        limit = 25
+        if 'limit' in args:
+            limit = max(int(args.get('limit').pop(0)), 1)
+
+        snapshot = 'snapshot' in args and args.get('snapshot').pop(0) == '1'
+        return self.MemoryInspector.report(limit, snapshot)
+
     def _handle_stat_request(self, path_components, args, testonly):
         if not path_components:
             raise Error(http.BAD_REQUEST, 'missing stat family')
@@ -592,6 +1393,44 @@ class RootPage(Resource):
         if source == 'platform':
             result['platform'] = self.ps.get_data_as_dict()
             return result
+        if source == 'webpool':
+            result['webpool'] = self._get_pool_stats()
+            return result
+        if source == 'webcache':
+            result['webcache'] = self.ResponseCache.get_stats()
+            return result
+        if source == 'storecache':
+            result['storecache'] = self.BlockStoreCache.get_stats()
+            return result
+        if source == 'chain':
+            result['chain'] = self.ChainIndex.get_stats()
+            return result
+        if source == 'endpoints':
+            result['endpoints'] = self.EndpointIndex.get_stats()
+            return result
+        if source == 'events':
+            result['events'] = self.EventNotifier.get_stats()
+            return result
+        if source == 'admission':
+            result['admission'] = self.Admission.get_stats()
+            return result
+        if source == 'reactor':
+            if self.ReactorMonitor is None:
+                raise Error(http.NOT_FOUND, 'no reactor monitor')
+            result['reactor'] = self.ReactorMonitor.get_stats()
+            if 'reset' in args:
+                self.ReactorMonitor.reset_stats()
+            return result
+        if source == 'resolver':
+            if self.Resolver is None:
+                raise Error(http.NOT_FOUND, 'no resolver')
+            result['resolver'] = self.Resolver.get_stats()
+            return result
+        if source == 'http':
+            result['http'] = self.HttpStats.get_stats()
+            if 'reset' in args:
+                self.HttpStats.reset_stats()
+            return result
         if source == 'all':
             for domain in self.Ledger.StatDomains.iterkeys():
                 result[domain] = self.Ledger.StatDomains[domain].get_stats()
@@ -599,6 +1438,18 @@ class RootPage(Resource):
                 result[peer.Name] = peer.Stats.get_stats()
                 result[peer.Name]['IsPeer'] = peer.is_peer
             result['platform'] = self.ps.get_data_as_dict()
+            result['webpool'] = self._get_pool_stats()
+            result['webcache'] = self.ResponseCache.get_stats()
+            result['storecache'] = self.BlockStoreCache.get_stats()
+            result['chain'] = self.ChainIndex.get_stats()
+            result['endpoints'] = self.EndpointIndex.get_stats()
+            result['events'] = self.EventNotifier.get_stats()
+            result['http'] = self.HttpStats.get_stats()
+            result['admission'] = self.Admission.get_stats()
+            if self.ReactorMonitor is not None:
+                result['reactor'] = self.ReactorMonitor.get_stats()
+            if self.Resolver is not None:
+                result['resolver'] = self.Resolver.get_stats()
             return result
 
         if 'ledger' in args:
@@ -617,6 +1468,15 @@ class RootPage(Resource):
 
         return result
 
+    def _get_pool_stats(self):
+        result = {
+            'read': self.ReadPool.get_stats(),
+            'write': self.WritePool.get_stats()
+        }
+        if self.VerifyPool is not None:
+            result['verify'] = self.VerifyPool.get_stats()
+        return result
+
     def _hdl_status_request(self, pathcomponents, args, testonly):
         result = dict()
         result['Status'] = self.Validator.status
@@ -634,9 +1494,16 @@ class RootPage(Resource):
 class ApiSite(Site):
     """
     Override twisted.web.server.Site in order to remove the server header from
-    each response.
+    each response, and to limit the size of request bodies.
     """
 
+    requestFactory = ApiRequest
+
+    def __init__(self, resource,
+                 maximum_body_size=DEFAULT_MAXIMUM_BODY_SIZE, **kwargs):
+        Site.__init__(self, resource, **kwargs)
+        self.MaximumBodySize = maximum_body_size
+
     def getResourceFor(self, request):
         """
         Remove the server header from the response.
@@ -652,7 +1519,14 @@ def initialize_web_server(config, validator):
 
     if 'http' in listen_directives:
         root = RootPage(validator)
-        site = ApiSite(root)
+        root.start()
+        # close idle persistent connections rather than holding them for
+        # the twisted default of twelve hours
+        web_config = validator.Config.get('WebApi', {})
+        site = ApiSite(root,
+                       maximum_body_size=web_config.get(
+                           'MaximumBodySize', DEFAULT_MAXIMUM_BODY_SIZE),
+                       timeout=web_config.get('IdleTimeout', 60))
         interface = listen_directives['http'].host
         if interface is None:
             interface = ''
@@ -0,0 +1,145 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the caches used by the web api
+"""
+
+import hashlib
+import threading
+
+from collections import namedtuple
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    A thread safe least recently used cache bounded by the total size of
+    the cached values rather than by the number of entries.
+    """
+
+    def __init__(self, max_size):
+        self.MaxSize = max_size
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return default
+
+            self._hits += 1
+            (value, size) = self._entries.pop(key)
+            self._entries[key] = (value, size)
+            return value
+
+    def put(self, key, value, size):
+        """
+        Add a value to the cache. Values larger than the whole cache are
+        silently dropped.
+        """
+        if size > self.MaxSize:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+
+            self._entries[key] = (value, size)
+            self._size += size
+
+            while self._size > self.MaxSize:
+                (_, (_, evicted)) = self._entries.popitem(last=False)
+                self._size -= evicted
+                self._evictions += 1
+
+    def remove(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._size = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'Entries': len(self._entries),
+                'Size': self._size,
+                'MaxSize': self.MaxSize,
+                'Hits': self._hits,
+                'Misses': self._misses,
+                'Evictions': self._evictions
+            }
+
+    def reset_stats(self):
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+CachedResponse = namedtuple('CachedResponse',
+                            ['body', 'content_type', 'etag', 'encoding'])
+
+
+class ResponseCache(LRUCache):
+    """
+    A cache of encoded response bodies for web api requests whose result
+    can no longer change, keyed by path, arguments and encoding. Bodies
+    compressed with a content coding are cached as variants of the
+    uncompressed response.
+    """
+
+    @staticmethod
+    def make_key(request):
+        args = tuple(sorted((k, tuple(v)) for k, v in request.args.items()))
+        return (request.path, args, request.getHeader('Accept'))
+
+    @staticmethod
+    def make_etag(body):
+        return '"{0}"'.format(hashlib.sha1(body).hexdigest())
+
+    @staticmethod
+    def variant_key(key, encoding):
+        return (key, encoding)
+
+    def add_response(self, key, body, content_type):
+        response = CachedResponse(body, content_type, self.make_etag(body),
+                                  None)
+        self.put(key, response, len(body))
+        return response
+
+    def add_variant(self, key, response, encoding, body):
+        """
+        Cache body, the body of response compressed with the content
+        coding encoding. The variant gets its own entity tag.
+        """
+        etag = '{0}-{1}"'.format(response.etag[:-1], encoding)
+        variant = CachedResponse(body, response.content_type, etag, encoding)
+        self.put(self.variant_key(key, encoding), variant, len(body))
+        return variant
@@ -0,0 +1,93 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements content encoding (compression) negotiation for the
+web api
+"""
+
+import zlib
+
+# in order of preference when the client accepts several equally
+SUPPORTED_ENCODINGS = ['gzip', 'deflate']
+
+
+def parse_accept_encoding(header):
+    """
+    Parse an Accept-Encoding header.
+
+    Returns:
+        dict: maps each content coding to its quality value
+    """
+    result = {}
+    if not header:
+        return result
+
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in parts[1:]:
+            (name, _, value) = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        result[coding] = quality
+
+    return result
+
+
+def choose_encoding(header):
+    """
+    Pick the content coding to use for a response.
+
+    Args:
+        header (str): the Accept-Encoding header of the request
+
+    Returns:
+        str: the preferred supported coding, or None if the response
+            should not be compressed
+    """
+    accepted = parse_accept_encoding(header)
+    best = None
+    best_quality = 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best = coding
+            best_quality = quality
+
+    return best
+
+
+def compress(body, encoding, level=6):
+    """
+    Compress a response body with the given content coding.
+    """
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(level, zlib.DEFLATED,
+                                      16 + zlib.MAX_WBITS)
+    elif encoding == 'deflate':
+        # the http deflate coding is the zlib format
+        compressor = zlib.compressobj(level)
+    else:
+        raise ValueError('unsupported content encoding {0}'.format(encoding))
+
+    return compressor.compress(body) + compressor.flush()
@@ -0,0 +1,273 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the server sent event stream (/events) of the
+web api
+"""
+
+import json
+import logging
+import threading
+
+from twisted.internet import reactor
+from twisted.internet import task
+from twisted.internet.interfaces import IPushProducer
+from zope.interface import implementer
+
+logger = logging.getLogger(__name__)
+
+BLOCK_COMMIT = 'block-commit'
+TRANSACTION_COMMIT = 'transaction-commit'
+TRANSACTION_DROP = 'transaction-drop'
+
+EVENT_TYPES = [BLOCK_COMMIT, TRANSACTION_COMMIT, TRANSACTION_DROP]
+
+
+class EventFilter(object):
+    """
+    The events a subscriber asked for. An empty list for any of the
+    criteria matches everything.
+    """
+
+    def __init__(self, event_types=None, stores=None, txnids=None):
+        self.EventTypes = set(event_types or [])
+        self.Stores = set(stores or [])
+        self.TransactionIDs = set(txnids or [])
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        Build a filter from the event, store and id request arguments.
+        """
+        return cls(args.get('event'), args.get('store'), args.get('id'))
+
+    def matches(self, event_type, event):
+        if self.EventTypes and event_type not in self.EventTypes:
+            return False
+
+        if event_type == BLOCK_COMMIT:
+            return not self.TransactionIDs
+
+        if self.TransactionIDs and \
+                event['TransactionID'] not in self.TransactionIDs:
+            return False
+        if self.Stores and event.get('Store') not in self.Stores:
+            return False
+        return True
+
+
+class EventNotifier(object):
+    """
+    Publishes block commit, transaction commit and transaction drop events
+    to the subscribers of the /events stream.
+
+    The notifier runs on the reactor while there are subscribers. Commits
+    come from the chain index, which hands over the blocks added by each
+    of its background updates; drops are found by comparing the pending
+    transactions against the previous check, which is only done when the
+    ledger appears to have changed and the index has caught up with it,
+    so a transaction in a block the index has not seen yet is not taken
+    for a drop.
+    """
+
+    def __init__(self, ledger, chain_index, interval=0.1,
+                 heartbeat=15.0, queue_limit=1000, clock=reactor):
+        self.Ledger = ledger
+        self.ChainIndex = chain_index
+        self.Interval = interval
+        self.Heartbeat = heartbeat
+        self.QueueLimit = queue_limit
+
+        self._lock = threading.Lock()
+        self._committed = []
+        self._subscribers = set()
+        self._pending = None
+        self._signature = None
+        self._since_check = 0.0
+        self._since_write = 0.0
+
+        self._loop = task.LoopingCall(self._check)
+        self._loop.clock = clock
+
+        self.ChainIndex.add_listener(self._on_chain_update)
+        self.reset_stats()
+
+    def subscribe(self, request, event_filter):
+        """
+        Start streaming the events that match event_filter to request
+        until the client disconnects.
+        """
+        subscriber = _EventSubscriber(request, event_filter, self.QueueLimit)
+        request.registerProducer(subscriber, True)
+        request.write(': connected\n\n')
+        request.notifyFinish().addBoth(
+            lambda _: self._subscribers.discard(subscriber))
+
+        if not self._subscribers:
+            with self._lock:
+                self._committed = []
+            self._pending = set(self.Ledger.PendingTransactions.iterkeys())
+            self._signature = self._get_signature()
+
+        self._subscribers.add(subscriber)
+        if not self._loop.running:
+            self._loop.start(self.Interval, now=False)
+
+    def _on_chain_update(self, rolled_back, committed):
+        # the chain index may be updated from any thread, the events are
+        # published on the next check
+        if self._subscribers:
+            with self._lock:
+                self._committed.extend(committed)
+
+    def _get_signature(self):
+        return (self.Ledger.MostRecentCommittedBlockID,
+                len(self.Ledger.PendingTransactions))
+
+    def _check(self):
+        if not self._subscribers:
+            self._loop.stop()
+            return
+
+        self._since_check += self.Interval
+        self._since_write += self.Interval
+
+        # a transaction may be dropped while another one arrives, which
+        # leaves the signature unchanged, so check anyway once a second
+        signature = self._get_signature()
+        if (signature != self._signature or self._since_check >= 1.0) and \
+                self.ChainIndex.head == signature[0]:
+            self._signature = signature
+            self._since_check = 0.0
+            with self._lock:
+                committed = self._committed
+                self._committed = []
+
+            events = self._get_events(committed)
+            if events:
+                self._publish(events)
+                self._since_write = 0.0
+
+        if self._since_write >= self.Heartbeat:
+            self._since_write = 0.0
+            for subscriber in list(self._subscribers):
+                subscriber.send(': heartbeat\n\n')
+
+    def _get_events(self, committed):
+        events = []
+        committed_txns = set()
+        for blkid in committed:
+            if blkid not in self.Ledger.BlockStore:
+                continue
+
+            block = self.Ledger.BlockStore[blkid]
+            events.append((BLOCK_COMMIT, {
+                'BlockID': blkid,
+                'BlockNum': block.BlockNum,
+                'TransactionCount': len(block.TransactionIDs)
+            }))
+            for txnid in block.TransactionIDs:
+                committed_txns.add(txnid)
+                events.append((TRANSACTION_COMMIT, {
+                    'TransactionID': txnid,
+                    'BlockID': blkid,
+                    'Store': self._get_store_name(txnid)
+                }))
+
+        pending = set(self.Ledger.PendingTransactions.iterkeys())
+        for txnid in self._pending - pending - committed_txns:
+            events.append((TRANSACTION_DROP, {
+                'TransactionID': txnid,
+                'Store': self._get_store_name(txnid)
+            }))
+        self._pending = pending
+
+        return events
+
+    def _get_store_name(self, txnid):
+        if txnid not in self.Ledger.TransactionStore:
+            return None
+        return self.Ledger.TransactionStore[txnid].TransactionTypeName
+
+    def _publish(self, events):
+        for (event_type, event) in events:
+            self._events += 1
+            message = 'event: {0}\ndata: {1}\n\n'.format(
+                event_type, json.dumps(event))
+            for subscriber in list(self._subscribers):
+                if subscriber.Filter.matches(event_type, event):
+                    if not subscriber.send(message):
+                        self._subscribers.discard(subscriber)
+                        self._dropped += 1
+
+    def get_stats(self):
+        return {
+            'Subscribers': len(self._subscribers),
+            'Events': self._events,
+            'DroppedSubscribers': self._dropped
+        }
+
+    def reset_stats(self):
+        self._events = 0
+        self._dropped = 0
+
+
+@implementer(IPushProducer)
+class _EventSubscriber(object):
+    def __init__(self, request, event_filter, queue_limit):
+        self.Filter = event_filter
+        self._request = request
+        self._queue_limit = queue_limit
+        self._queue = []
+        self._paused = False
+
+    def send(self, message):
+        """
+        Write a message, or queue it while the connection is not accepting
+        data. A subscriber that falls too far behind is disconnected.
+
+        Returns:
+            bool: False if the subscriber was disconnected
+        """
+        if not self._paused:
+            self._request.write(message)
+            return True
+
+        self._queue.append(message)
+        if len(self._queue) > self._queue_limit:
+            logger.info('disconnecting slow event subscriber')
+            self._queue = []
+            self._request.unregisterProducer()
+            self._request.finish()
+            return False
+
+        return True
+
+    def pauseProducing(self):
+        # pylint: disable=invalid-name
+        self._paused = True
+
+    def resumeProducing(self):
+        # pylint: disable=invalid-name
+        self._paused = False
+        queue, self._queue = self._queue, []
+        for message in queue:
+            self._request.write(message)
+
+    def stopProducing(self):
+        # pylint: disable=invalid-name
+        self._paused = True
+        self._queue = []
@@ -0,0 +1,139 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the liveness and status snapshot served by the web
+api directly on the reactor
+"""
+
+import logging
+import traceback
+
+from twisted.internet import reactor
+from twisted.internet import task
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor(object):
+    """
+    Keeps a snapshot of the validator status together with the lag of the
+    reactor loop and the saturation of the web api worker pools. The
+    snapshot is refreshed every interval seconds on the reactor, so
+    requests for it are answered without touching the ledger or waiting
+    for a worker thread.
+
+    The reactor lag is the one measured by the reactor monitor of the
+    validator, if there is one. The validator is reported as busy, rather
+    than unhealthy, when the lag exceeds busy_lag seconds or a pool is
+    saturated.
+    """
+
+    def __init__(self, status_source, pools, reactor_monitor=None,
+                 interval=1.0, busy_lag=1.0, clock=reactor):
+        """
+        Args:
+            status_source (function): returns the status dictionary
+            pools (list): the WorkerPools whose saturation is reported
+            reactor_monitor (ReactorMonitor): the source of the lag of
+                the reactor loop
+        """
+        self.StatusSource = status_source
+        self.Pools = pools
+        self.ReactorMonitor = reactor_monitor
+        self.Interval = interval
+        self.BusyLag = busy_lag
+
+        self._clock = clock
+        self._loop = None
+
+        self._status = {}
+        self._pools = {}
+        self._refreshed = None
+
+    def start(self):
+        self._loop = task.LoopingCall(self.refresh)
+        self._loop.clock = self._clock
+        self._loop.start(self.Interval, now=True)
+
+    def stop(self):
+        if self._loop is not None and self._loop.running:
+            self._loop.stop()
+        self._loop = None
+
+    @property
+    def ReactorLag(self):
+        if self.ReactorMonitor is None:
+            return None
+        return self.ReactorMonitor.Lag
+
+    def refresh(self):
+        now = self._clock.seconds()
+
+        self._pools = {}
+        for pool in self.Pools:
+            stats = pool.get_stats()
+            outstanding = stats['QueueDepth'] + stats['Active']
+            self._pools[pool.Name] = {
+                'QueueDepth': stats['QueueDepth'],
+                'Active': stats['Active'],
+                'QueueLimit': stats['QueueLimit'],
+                'Saturation': float(outstanding) / max(stats['QueueLimit'],
+                                                       1),
+                'Saturated': outstanding >= stats['QueueLimit']
+            }
+
+        # keep serving the previous status if it cannot be collected
+        try:
+            self._status = self.StatusSource()
+        except:
+            logger.warn('unable to refresh validator status; %s',
+                        traceback.format_exc(20))
+
+        self._refreshed = now
+
+    def get_health(self):
+        """
+        Returns:
+            dict: the liveness report
+        """
+        lag = self.ReactorLag
+        busy = (lag is not None and lag > self.BusyLag) or \
+            any(p['Saturated'] for p in self._pools.itervalues())
+        age = None
+        if self._refreshed is not None:
+            age = self._clock.seconds() - self._refreshed
+
+        return {
+            'Status': 'busy' if busy else 'ok',
+            'ReactorLag': lag,
+            'SnapshotAge': age,
+            'Pools': dict(self._pools)
+        }
+
+    def get_status(self):
+        """
+        Returns:
+            dict: the most recent status snapshot with the liveness report
+                under 'Health'
+        """
+        result = dict(self._status)
+        result['Health'] = self.get_health()
+        return result
+
+    def get_stats(self):
+        return {
+            'ReactorLag': self.ReactorLag
+        }
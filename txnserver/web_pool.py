@@ -0,0 +1,155 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the bounded thread pools used by the web api
+"""
+
+import logging
+import threading
+import time
+
+from twisted.internet import reactor
+from twisted.internet import threads
+from twisted.python import threadpool
+
+from txnserver.web_stats import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool(object):
+    """
+    A dedicated thread pool with a bounded queue. Work is refused, rather
+    than queued, once the number of outstanding requests reaches the queue
+    limit so that callers can shed load instead of piling up behind slow
+    requests.
+    """
+
+    def __init__(self, name, min_threads=1, max_threads=4, queue_limit=64):
+        self.Name = name
+        self.QueueLimit = queue_limit
+        self.ThreadPool = threadpool.ThreadPool(min_threads, max_threads,
+                                                name)
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self.reset_stats()
+
+    def start(self):
+        """
+        Start the worker threads once the reactor is running and stop them
+        when it shuts down.
+        """
+        reactor.callWhenRunning(self.ThreadPool.start)
+        reactor.addSystemEventTrigger('during', 'shutdown',
+                                      self.ThreadPool.stop)
+
+    def saturated(self):
+        """
+        Returns:
+            bool: True if no more work should be submitted to the pool
+        """
+        with self._lock:
+            return self._queued + self._active >= self.QueueLimit
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run func in the pool.
+
+        Returns:
+            Deferred: fires with the result of func
+        """
+        with self._lock:
+            self._queued += 1
+        return threads.deferToThreadPool(reactor, self.ThreadPool, self._run,
+                                         time.time(), func, *args, **kwargs)
+
+    def reject(self):
+        """
+        Record a request refused because the pool was saturated.
+        """
+        with self._lock:
+            self._rejected += 1
+
+    def _run(self, submitted, func, *args, **kwargs):
+        started = time.time()
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait.add(started - submitted)
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._service.add(time.time() - started)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'MinThreads': self.ThreadPool.min,
+                'MaxThreads': self.ThreadPool.max,
+                'QueueLimit': self.QueueLimit,
+                'QueueDepth': self._queued,
+                'Active': self._active,
+                'Completed': self._completed,
+                'Rejected': self._rejected,
+                'WaitTime': self._wait.get_stats(),
+                'ServiceTime': self._service.get_stats()
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._completed = 0
+            self._rejected = 0
+            self._wait = LatencyHistogram()
+            self._service = LatencyHistogram()
+
+
+def create_worker_pools(config):
+    """
+    Create the read (GET) and write (POST) pools for the web api from the
+    WebApi section of the validator configuration, for example:
+
+        "WebApi" : {
+            "ReadThreads" : [2, 10],
+            "ReadQueueLimit" : 200,
+            "WriteThreads" : [1, 4],
+            "WriteQueueLimit" : 100
+        }
+
+    Keeping the lanes separate lets cheap reads avoid queueing behind
+    expensive transaction validations.
+
+    Returns:
+        tuple: (read pool, write pool)
+    """
+    read_threads = config.get('ReadThreads', [2, 10])
+    write_threads = config.get('WriteThreads', [1, 4])
+
+    read_pool = WorkerPool('WebApiRead',
+                           min_threads=read_threads[0],
+                           max_threads=read_threads[1],
+                           queue_limit=config.get('ReadQueueLimit', 200))
+    write_pool = WorkerPool('WebApiWrite',
+                            min_threads=write_threads[0],
+                            max_threads=write_threads[1],
+                            queue_limit=config.get('WriteQueueLimit', 100))
+
+    return read_pool, write_pool
@@ -0,0 +1,163 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the handling of request bodies for the web api
+"""
+
+import hashlib
+import logging
+
+from twisted.web.server import Request
+
+logger = logging.getLogger(__name__)
+
+# the most a body is allowed to grow without a Content-Length header
+# before any of it is stored
+DEFAULT_MAXIMUM_BODY_SIZE = 10 * 1024 * 1024
+
+# the most allocated for a body before any of it arrives, so a client
+# cannot hold memory by only sending headers with a large Content-Length
+INITIAL_BODY_SIZE = 64 * 1024
+
+
+class BodyBuffer(object):
+    """
+    A file-like buffer holding the body of a request. The body is copied
+    into a bytearray as it arrives, rather than growing a string buffer or
+    spilling large bodies to a temporary file. When the length of the body
+    is known up front, up to INITIAL_BODY_SIZE bytes are allocated at once
+    and the buffer doubles from there as the body arrives, without growing
+    past the declared length.
+    """
+
+    def __init__(self, length=None):
+        self._length = length
+        self._buffer = bytearray(min(length or 0, INITIAL_BODY_SIZE))
+        self._size = 0
+        self._position = 0
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        end = self._size + len(data)
+        if end > len(self._buffer):
+            self._grow(end)
+        self._buffer[self._size:end] = data
+        self._size = end
+
+    def _grow(self, needed):
+        size = max(needed, 2 * len(self._buffer))
+        if self._length is not None and needed <= self._length:
+            size = min(size, self._length)
+        self._buffer.extend(bytearray(size - len(self._buffer)))
+
+    def view(self):
+        """
+        Returns:
+            memoryview: the body, without copying it
+        """
+        return memoryview(self._buffer)[:self._size]
+
+    def getvalue(self):
+        return self.view().tobytes()
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += self._size
+        self._position = max(0, min(offset, self._size))
+
+    def tell(self):
+        return self._position
+
+    def read(self, size=-1):
+        end = self._size if size < 0 else min(self._size,
+                                              self._position + size)
+        data = self.view()[self._position:end].tobytes()
+        self._position = end
+        return data
+
+    def close(self):
+        self._buffer = bytearray()
+        self._size = 0
+        self._position = 0
+
+
+class ApiRequest(Request):
+    """
+    A request whose body is held in a BodyBuffer and limited to the
+    MaximumBodySize of the site. A body declared larger than the limit is
+    refused as soon as the headers arrive; one that grows past it without
+    a Content-Length is refused as soon as it does. Either way the
+    connection is closed rather than reading the rest of the body.
+    """
+
+    BodyTooLarge = False
+
+    def _maximum_body_size(self):
+        site = getattr(self.channel, 'site', None)
+        return getattr(site, 'MaximumBodySize', DEFAULT_MAXIMUM_BODY_SIZE)
+
+    def gotLength(self, length):
+        if length is not None and length > self._maximum_body_size():
+            self.content = BodyBuffer()
+            self._refuse_body(length)
+            return
+
+        self.content = BodyBuffer(length)
+
+    def handleContentChunk(self, data):
+        if self.BodyTooLarge:
+            return
+
+        if len(self.content) + len(data) > self._maximum_body_size():
+            self._refuse_body(len(self.content) + len(data))
+            return
+
+        self.content.write(data)
+
+    def requestReceived(self, command, path, version):
+        if self.BodyTooLarge:
+            return
+        Request.requestReceived(self, command, path, version)
+
+    def _refuse_body(self, length):
+        logger.warn('refusing request body of at least %s bytes from %s',
+                    length, self.getClientIP())
+
+        self.BodyTooLarge = True
+        self.content.close()
+
+        # the request never reaches a resource; answer directly and stop
+        # reading from the connection, the way the channel handles
+        # malformed requests
+        transport = self.channel.transport
+        transport.write('HTTP/1.1 413 Request Entity Too Large\r\n'
+                        'Content-Length: 0\r\n'
+                        'Connection: close\r\n\r\n')
+        self.channel.dataReceived = lambda *args: None
+        transport.loseConnection()
+
+
+def describe_body(data, prefix=32):
+    """
+    Summarize a request body for error messages and logs without echoing
+    all of it.
+    """
+    return '{0} bytes, sha256 {1}, starting {2!r}'.format(
+        len(data), hashlib.sha256(data).hexdigest()[:16], data[:prefix])
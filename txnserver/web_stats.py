@@ -0,0 +1,192 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements the request statistics of the web api
+"""
+
+import threading
+import time
+
+
+class LatencyHistogram(object):
+    """
+    A histogram of durations in the style of an HDR histogram. Durations
+    are counted in microsecond ticks; every power of two range of ticks is
+    split into the same number of linear buckets, so percentiles have the
+    same relative precision (within about 6%) from microseconds to hours
+    while the number of buckets stays small.
+
+    The histogram is not thread safe, its owner serializes access.
+    """
+
+    SignificantBits = 5
+    Unit = 1e-6
+
+    def __init__(self):
+        self.Count = 0
+        self.Total = 0.0
+        self.Maximum = 0.0
+        self._buckets = {}
+
+    def add(self, value):
+        self.Count += 1
+        self.Total += value
+        self.Maximum = max(self.Maximum, value)
+
+        ticks = int(value / self.Unit)
+        shift = max(ticks.bit_length() - self.SignificantBits, 0)
+        bucket = (ticks >> shift) << shift
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent):
+        """
+        Returns:
+            float: the duration below which percent of the values fall,
+                rounded up to the end of its bucket
+        """
+        if self.Count == 0:
+            return 0.0
+
+        threshold = self.Count * percent / 100.0
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= threshold:
+                shift = max(bucket.bit_length() - self.SignificantBits, 0)
+                upper = (bucket + (1 << shift)) * self.Unit
+                return min(upper, self.Maximum)
+
+        return self.Maximum
+
+    def get_stats(self):
+        average = self.Total / self.Count if self.Count else 0.0
+        return {
+            'Count': self.Count,
+            'Average': average,
+            'P50': self.percentile(50),
+            'P90': self.percentile(90),
+            'P99': self.percentile(99),
+            'Maximum': self.Maximum
+        }
+
+
+class RouteStats(object):
+    """
+    The counters and latency histograms of one route.
+    """
+
+    def __init__(self):
+        self.Requests = 0
+        self.Errors = 0
+        self.BytesIn = 0
+        self.BytesOut = 0
+        self.Latency = LatencyHistogram()
+        self.QueueWait = LatencyHistogram()
+        self.HandlerTime = LatencyHistogram()
+
+    def get_stats(self):
+        return {
+            'Requests': self.Requests,
+            'Errors': self.Errors,
+            'BytesIn': self.BytesIn,
+            'BytesOut': self.BytesOut,
+            'Latency': self.Latency.get_stats(),
+            'QueueWait': self.QueueWait.get_stats(),
+            'HandlerTime': self.HandlerTime.get_stats()
+        }
+
+
+class HttpStats(object):
+    """
+    Request statistics of the web api, by method and route prefix, for
+    example 'GET /block'. The total latency of a request runs from the
+    time it is rendered until it is finished; requests served by a worker
+    pool also report the time spent waiting for a thread separately from
+    the time spent in the handler.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def start_request(self, request, route):
+        """
+        Start timing a request, the statistics are recorded when it
+        finishes.
+
+        Returns:
+            RequestTimer: the timer of the request
+        """
+        timer = RequestTimer(request, route)
+        request.notifyFinish().addBoth(self._finished, timer)
+        return timer
+
+    def _finished(self, reason, timer):
+        latency = time.time() - timer.Started
+        failed = reason is not None or timer.Request.code >= 400
+
+        length = timer.Request.getHeader('Content-Length')
+        bytes_in = int(length) if length and length.isdigit() else 0
+
+        with self._lock:
+            route = self._routes.get(timer.Route)
+            if route is None:
+                route = RouteStats()
+                self._routes[timer.Route] = route
+
+            route.Requests += 1
+            route.Errors += 1 if failed else 0
+            route.BytesIn += bytes_in
+            route.BytesOut += timer.Request.sentLength
+            route.Latency.add(latency)
+            if timer.Dequeued is not None:
+                route.QueueWait.add(timer.Dequeued - timer.Queued)
+            if timer.Handled is not None:
+                route.HandlerTime.add(timer.Handled - timer.Dequeued)
+
+    def get_stats(self):
+        with self._lock:
+            return dict((name, route.get_stats())
+                        for name, route in self._routes.iteritems())
+
+    def reset_stats(self):
+        with self._lock:
+            self._routes = {}
+
+
+class RequestTimer(object):
+    """
+    Timestamps of the stages of one request.
+    """
+
+    def __init__(self, request, route):
+        self.Request = request
+        self.Route = route
+        self.Started = time.time()
+        self.Queued = None
+        self.Dequeued = None
+        self.Handled = None
+
+    def run(self, func, *args, **kwargs):
+        """
+        Run the handler of the request in a worker thread, recording how
+        long it waited for the thread and how long the handler took.
+        """
+        self.Dequeued = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.Handled = time.time()
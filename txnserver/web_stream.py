@@ -0,0 +1,190 @@
+# Copyright 2016 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ------------------------------------------------------------------------------
+
+"""
+This module implements incremental (chunked) responses for the web api
+"""
+
+import bisect
+import itertools
+import json
+import logging
+import traceback
+
+import cbor
+
+from twisted.internet.interfaces import IPullProducer
+from zope.interface import implementer
+
+logger = logging.getLogger(__name__)
+
+
+def get_page(store, keys, limit, after=None):
+    """
+    Return one page of a store.
+
+    Args:
+        store: the transaction store
+        keys (list): the sorted keys of the store
+        limit (int): the maximum number of entries in the page
+        after (str): return entries with keys that sort after this one
+
+    Returns:
+        dict: the entries of the page under 'Store' and, if there are
+            more entries, the cursor for the next page under 'Next'
+    """
+    start = 0
+    if after is not None:
+        start = bisect.bisect_right(keys, after)
+
+    page = keys[start:start + limit]
+    result = {'Store': dict((k, store[k]) for k in page)}
+    if page and start + limit < len(keys):
+        result['Next'] = page[-1]
+
+    return result
+
+
+class ChunkedStream(object):
+    """
+    A response that is written to the client in chunks as the connection
+    accepts them, so it is never encoded in memory at once. Subclasses
+    generate the encoded chunks.
+    """
+
+    def chunks(self, cbor_encoding):
+        raise NotImplementedError
+
+    def start(self, request, cbor_encoding):
+        """
+        Write the response to request, one chunk each time the connection
+        asks for more data, and finish the request when done.
+        """
+        producer = _ChunkProducer(request, self.chunks(cbor_encoding))
+        request.registerProducer(producer, False)
+
+
+class StoreStream(ChunkedStream):
+    """
+    A dump of a transaction store that is written to the client in chunks
+    of entries.
+    """
+
+    def __init__(self, store, keys, chunk_size=500):
+        self.Store = store
+        self.Keys = keys
+        self.ChunkSize = chunk_size
+
+    def chunks(self, cbor_encoding):
+        """
+        Generate the encoded response. JSON is written as a single object,
+        CBOR as an indefinite length map.
+        """
+        if cbor_encoding:
+            yield '\xbf'
+        else:
+            yield '{'
+
+        separator = ''
+        for start in xrange(0, len(self.Keys), self.ChunkSize):
+            parts = []
+            for key in self.Keys[start:start + self.ChunkSize]:
+                if cbor_encoding:
+                    parts.append(cbor.dumps(key))
+                    parts.append(cbor.dumps(self.Store[key]))
+                else:
+                    parts.append('{0}{1}: {2}'.format(
+                        separator, json.dumps(key),
+                        json.dumps(self.Store[key])))
+                    separator = ', '
+            yield ''.join(parts)
+
+        if cbor_encoding:
+            yield '\xff'
+        else:
+            yield '}'
+
+
+class ListStream(ChunkedStream):
+    """
+    A list that is written to the client in chunks of items. The items
+    may be generated lazily.
+    """
+
+    def __init__(self, items, chunk_size=500):
+        self.Items = items
+        self.ChunkSize = chunk_size
+
+    def chunks(self, cbor_encoding):
+        """
+        Generate the encoded response. JSON is written as a single array,
+        CBOR as an indefinite length array.
+        """
+        if cbor_encoding:
+            yield '\x9f'
+        else:
+            yield '['
+
+        separator = ''
+        items = iter(self.Items)
+        while True:
+            chunk = list(itertools.islice(items, self.ChunkSize))
+            if not chunk:
+                break
+
+            if cbor_encoding:
+                yield ''.join(cbor.dumps(item) for item in chunk)
+            else:
+                yield separator + ', '.join(json.dumps(item)
+                                            for item in chunk)
+                separator = ', '
+
+        if cbor_encoding:
+            yield '\xff'
+        else:
+            yield ']'
+
+
+@implementer(IPullProducer)
+class _ChunkProducer(object):
+    def __init__(self, request, chunks):
+        self._request = request
+        self._chunks = chunks
+
+    def resumeProducing(self):
+        # pylint: disable=invalid-name
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._finish()
+            return
+        except:
+            logger.warn('store stream failed; %s', traceback.format_exc(20))
+            self._finish()
+            return
+
+        self._request.write(chunk)
+
+    def stopProducing(self):
+        # pylint: disable=invalid-name
+        # the client went away before the stream was complete
+        self._chunks = iter([])
+
+    def _finish(self):
+        self._request.unregisterProducer()
+        try:
+            self._request.finish()
+        except RuntimeError:
+            logger.error("No connection when request.finish called")